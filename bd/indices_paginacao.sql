@@ -0,0 +1,13 @@
+-- Execução única nos bancos criados antes dos índices compostos de bd/schema.sql.
+--
+-- As listagens por município e por situação paginam por chave: filtro na coluna, 'id > cursor',
+-- ORDER BY id e LIMIT n + 1. Com o índice só na coluna filtrada, cada página reúne e ordena todas as
+-- linhas que casam; com (coluna, id) o Postgres lê as linhas já na ordem do 'id' e para na página.
+-- CONCURRENTLY não bloqueia as cargas e consultas (e não pode rodar dentro de uma transação).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_autuacoes_municipio_chave_id ON public.autuacoes_ibama (municipio_chave, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_embargos_municipio_chave_id ON public.termos_embargo (municipio_chave, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ctf_situacao_cadastro_id ON public.cadastro_tecnico_federal (situacao_cadastro, id);
+
+-- Os índices de uma coluna ficam redundantes: o composto atende também a igualdade em municipio_chave
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_autuacoes_municipio_chave;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_embargos_municipio_chave;
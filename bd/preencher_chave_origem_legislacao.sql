@@ -0,0 +1,17 @@
+-- Execução única, antes da primeira carga de 'legislacao_ambiental' pelo pipeline do ETL.
+--
+-- As normas cadastradas manualmente não têm chave_origem. Sem ela, a carga não reconhece essas
+-- linhas: as normas seriam inseridas de novo (com o título já usado) em vez de atualizadas, e os
+-- embeddings já gerados se perderiam. A chave natural do catálogo é o título sem espaços nas pontas,
+-- como o ETL calcula. Em títulos repetidos só a linha de menor id recebe a chave; as demais ficam
+-- com chave nula e a carga não as remove (remover_sem_chave é False para a legislação).
+UPDATE public.legislacao_ambiental AS l
+SET chave_origem = btrim(l.titulo)
+WHERE l.chave_origem IS NULL
+  AND l.id = (SELECT min(d.id) FROM public.legislacao_ambiental AS d WHERE btrim(d.titulo) = btrim(l.titulo))
+  AND NOT EXISTS (SELECT 1 FROM public.legislacao_ambiental AS c WHERE c.chave_origem = btrim(l.titulo));
+
+-- Em seguida, gere o CSV do catálogo a partir da tabela e carregue-o:
+--   python scripts_etl/exportar_legislacao.py
+--   python scripts_etl/pipeline.py legislacao_ambiental
+-- Como hash_linha ainda está nulo, a primeira carga regrava todas as normas (sem tocar no embedding).
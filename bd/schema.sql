@@ -8,9 +8,16 @@ CREATE TABLE public.autuacoes_ibama (
   descricao_infracao TEXT,
   municipio TEXT,
   uf TEXT,
+  municipio_chave TEXT, -- Município normalizado pelo ETL (sem acentos, maiúsculo, com UF), ex.: 'SAO PAULO/SP'
+  chave_origem TEXT UNIQUE, -- Chave natural da linha no arquivo do IBAMA (usada no upsert incremental)
+  hash_linha TEXT, -- Hash do conteúdo da linha, para detectar alterações entre cargas
   created_at TIMESTAMPTZ DEFAULT now() NOT NULL
 );
 
+-- Índice para a busca por município: igualdade na chave normalizada e páginas em ordem de 'id'
+-- (id > cursor ORDER BY id LIMIT n lê só as linhas da página, sem ordenar todas as do município)
+CREATE INDEX idx_autuacoes_municipio_chave_id ON public.autuacoes_ibama (municipio_chave, id);
+
 -- Adiciona um comentário à tabela para documentação
 COMMENT ON TABLE public.autuacoes_ibama IS 'Armazena dados históricos de autuações ambientais emitidas pelo IBAMA.';
 
@@ -26,6 +33,8 @@ CREATE TABLE public.legislacao_ambiental (
   link_oficial TEXT,
   palavras_chave TEXT[], -- Usamos um array de texto para as palavras-chave
   embedding VECTOR(384), -- Coluna para busca semântica. O tamanho (384) depende do modelo de embedding que usaremos.
+  chave_origem TEXT UNIQUE, -- Título da norma no catálogo curado (usado no upsert incremental)
+  hash_linha TEXT, -- Hash do conteúdo da linha, para detectar alterações entre cargas
   created_at TIMESTAMPTZ DEFAULT now() NOT NULL
 );
 
@@ -55,10 +64,21 @@ CREATE TABLE public.termos_embargo (
     justificativa TEXT,
     municipio TEXT,
     uf TEXT,
-    wkt_geometria TEXT, -- Coluna para dados geoespaciais futuros
+    municipio_chave TEXT, -- Município normalizado pelo ETL (sem acentos, maiúsculo, com UF), ex.: 'SAO PAULO/SP'
+    wkt_geometria TEXT, -- Polígono da área embargada (WKT, como publicado pelo IBAMA)
+    wkb_geometria BYTEA, -- Mesma geometria em WKB, gerada pelo ETL; a API a busca só para os embargos candidatos do índice espacial
+    bbox_xmin DOUBLE PRECISION, -- Retângulo envolvente da geometria (longitude/latitude), carregado no índice espacial da API
+    bbox_ymin DOUBLE PRECISION,
+    bbox_xmax DOUBLE PRECISION,
+    bbox_ymax DOUBLE PRECISION,
+    chave_origem TEXT UNIQUE, -- Chave natural da linha no arquivo do IBAMA (usada no upsert incremental)
+    hash_linha TEXT, -- Hash do conteúdo da linha, para detectar alterações entre cargas
     created_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
+-- Índice para a busca por município: igualdade na chave normalizada e páginas em ordem de 'id'
+CREATE INDEX idx_embargos_municipio_chave_id ON public.termos_embargo (municipio_chave, id);
+
 -- Adiciona um comentário para documentação
 COMMENT ON TABLE public.termos_embargo IS 'Armazena dados históricos de Termos de Embargo emitidos pelo IBAMA.';
 
@@ -71,8 +91,118 @@ CREATE TABLE public.cadastro_tecnico_federal (
     situacao_cadastro TEXT,
     data_situacao_cadastral DATE,
     uf TEXT,
+    chave_origem TEXT UNIQUE, -- CNPJ normalizado (usado no upsert incremental)
+    hash_linha TEXT, -- Hash do conteúdo da linha, para detectar alterações entre cargas
     created_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
+-- Índice para a listagem por situação cadastral, paginada em ordem de 'id'
+CREATE INDEX idx_ctf_situacao_cadastro_id ON public.cadastro_tecnico_federal (situacao_cadastro, id);
+
+-- Adiciona um comentário para documentação
+COMMENT ON TABLE public.cadastro_tecnico_federal IS 'Relação de PJs inscritas no CTF/APP, com seu status cadastral.';
+
+
+-- Tabela de controle com a versão de cada dataset, atualizada ao final de cada execução do ETL
+CREATE TABLE public.versoes_dataset (
+    tabela TEXT PRIMARY KEY,
+    versao BIGINT NOT NULL,
+    atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Adiciona um comentário para documentação
+COMMENT ON TABLE public.versoes_dataset IS 'Versão de cada dataset carregado pelo ETL; usada pela API para invalidar caches.';
+
+-- Tabelas editadas à mão (sem ETL) publicam uma nova versão a cada alteração, para a API recarregar
+-- os dados em memória. A versão segue o formato do ETL: instante da alteração em milissegundos
+CREATE OR REPLACE FUNCTION public.publicar_versao_tabela()
+RETURNS trigger LANGUAGE plpgsql SECURITY DEFINER AS $$
+BEGIN
+    INSERT INTO public.versoes_dataset (tabela, versao, atualizado_em)
+    VALUES (TG_TABLE_NAME, (extract(epoch FROM clock_timestamp()) * 1000)::BIGINT, now())
+    ON CONFLICT (tabela) DO UPDATE SET versao = EXCLUDED.versao, atualizado_em = EXCLUDED.atualizado_em;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_termos_glossario_versao
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.termos_glossario
+FOR EACH STATEMENT EXECUTE FUNCTION public.publicar_versao_tabela();
+
+
+-- Metadados da última execução de cada carga, usados no download condicional (ETag/Last-Modified/hash)
+CREATE TABLE public.execucoes_etl (
+    tabela TEXT PRIMARY KEY,
+    url TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    hash_conteudo TEXT, -- SHA-256 do arquivo baixado
+    linhas BIGINT, -- Linhas novas ou alteradas na última execução
+    executado_em TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
 -- Adiciona um comentário para documentação
-COMMENT ON TABLE public.cadastro_tecnico_federal IS 'Relação de PJs inscritas no CTF/APP, com seu status cadastral.';
\ No newline at end of file
+COMMENT ON TABLE public.execucoes_etl IS 'Última execução de cada carga do ETL; permite pular o download quando a fonte não mudou.';
+
+
+-- Agregados pré-calculados pelo ETL (por UF / município / ano / mês) de autuações e embargos.
+-- Dimensão nula = "todos" (ex.: uf='PA' e o resto nulo é o total do estado)
+CREATE TABLE public.estatisticas_agregadas (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    tabela TEXT NOT NULL, -- Dataset de origem ('autuacoes_ibama' ou 'termos_embargo')
+    versao BIGINT NOT NULL, -- Versão do dataset (versoes_dataset) a que os números se referem
+    uf TEXT,
+    municipio_chave TEXT,
+    ano INTEGER,
+    mes INTEGER,
+    quantidade BIGINT NOT NULL,
+    quantidade_com_valor BIGINT NOT NULL, -- Registros com valor preenchido (base da média)
+    valor_total NUMERIC,
+    valor_medio NUMERIC,
+    valor_maximo NUMERIC
+);
+
+CREATE INDEX idx_estatisticas_agregadas_versao ON public.estatisticas_agregadas (tabela, versao);
+
+-- Adiciona um comentário para documentação
+COMMENT ON TABLE public.estatisticas_agregadas IS 'Contagem, soma, média e máximo por UF, município, ano e mês, recalculados a cada carga.';
+
+
+-- Maiores autuados/embargados por escopo (UF e/ou ano; nulo = todos), calculados junto com os agregados
+CREATE TABLE public.ranking_documentos (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    tabela TEXT NOT NULL,
+    versao BIGINT NOT NULL,
+    uf TEXT,
+    ano INTEGER,
+    posicao INTEGER NOT NULL,
+    cpf_cnpj TEXT NOT NULL,
+    nome TEXT,
+    quantidade BIGINT NOT NULL,
+    valor_total NUMERIC -- Nulo nos datasets sem valor (embargos), ordenados pela quantidade
+);
+
+CREATE INDEX idx_ranking_documentos_versao ON public.ranking_documentos (tabela, versao);
+
+-- Adiciona um comentário para documentação
+COMMENT ON TABLE public.ranking_documentos IS 'Top N de CPFs/CNPJs por valor de multas (autuações) ou quantidade (embargos).';
+
+
+-- Lista dos municípios distintos presentes nas autuações e embargos, carregada em memória pela API
+CREATE MATERIALIZED VIEW public.municipios_chaves AS
+SELECT municipio_chave, min(municipio) AS municipio, min(uf) AS uf
+FROM (
+    SELECT municipio_chave, municipio, uf FROM public.autuacoes_ibama
+    UNION ALL
+    SELECT municipio_chave, municipio, uf FROM public.termos_embargo
+) AS m
+WHERE municipio_chave IS NOT NULL
+GROUP BY municipio_chave;
+
+CREATE UNIQUE INDEX idx_municipios_chaves ON public.municipios_chaves (municipio_chave);
+
+-- Função chamada pelo ETL (via RPC) ao final de cada carga para atualizar a view
+CREATE OR REPLACE FUNCTION public.atualizar_municipios_chaves()
+RETURNS void LANGUAGE sql SECURITY DEFINER AS $$
+    REFRESH MATERIALIZED VIEW CONCURRENTLY public.municipios_chaves;
+$$;
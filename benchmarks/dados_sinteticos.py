@@ -0,0 +1,141 @@
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+from servicos.normalizacao import digito_verificador, chave_municipio
+
+MUNICIPIOS = [
+    ("Belém", "PA"), ("Marabá", "PA"), ("Altamira", "PA"), ("São Félix do Xingu", "PA"), ("Manaus", "AM"),
+    ("Lábrea", "AM"), ("Porto Velho", "RO"), ("Cuiabá", "MT"), ("Sinop", "MT"), ("Colniza", "MT"),
+    ("Rio Branco", "AC"), ("Palmas", "TO"), ("São Paulo", "SP"), ("Belém", "PB"), ("Campo Grande", "MS"),
+]
+SITUACOES_CTF = ["Ativa", "Inativa", "Suspensa", "Cancelada"]
+PALAVRAS = [
+    "fauna", "flora", "desmatamento", "licenciamento", "queimada", "recursos", "hídricos", "unidade", "conservação",
+    "resíduos", "sólidos", "poluição", "pesca", "mineração", "reserva", "legal", "área", "preservação", "permanente",
+    "infração", "sanção", "administrativa", "florestal", "biodiversidade", "agrotóxicos", "saneamento", "clima",
+]
+TIPOS_NORMA = ["Lei", "Decreto", "Resolução CONAMA", "Instrução Normativa", "Portaria"]
+
+
+@dataclass
+class DadosSinteticos:
+    tabelas: Dict[str, List[Dict[str, Any]]]
+    # Valores existentes, usados para montar as requisições dos cenários
+    documentos: List[str] = field(default_factory=list)
+    documentos_ausentes: List[str] = field(default_factory=list)  # válidos, mas sem nenhum registro
+    cnpjs_ctf: List[str] = field(default_factory=list)
+    termos_glossario: List[str] = field(default_factory=list)
+    termos_legislacao: List[str] = field(default_factory=list)
+
+
+def _documento(aleatorio: random.Random) -> str:
+    # CPF ou CNPJ com dígitos verificadores corretos, como a API exige
+    if aleatorio.random() < 0.5:
+        base, pesos = "".join(aleatorio.choices("0123456789", k=9)), list(range(11, 1, -1))
+    else:
+        base, pesos = "".join(aleatorio.choices("0123456789", k=12)), [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+    primeiro = digito_verificador(base, pesos[1:])
+    return base + primeiro + digito_verificador(base + primeiro, pesos)
+
+
+def _data(aleatorio: random.Random, inicio: date = date(2018, 1, 1), dias: int = 2500) -> str:
+    return (inicio + timedelta(days=aleatorio.randrange(dias))).isoformat()
+
+
+def _frase(aleatorio: random.Random, tamanho: int) -> str:
+    return " ".join(aleatorio.choices(PALAVRAS, k=tamanho))
+
+
+def gerar(tamanho: int = 50_000, semente: int = 42) -> DadosSinteticos:
+    """Gera tabelas com o formato das do Supabase: 'tamanho' autuações e proporções fixas do resto."""
+    aleatorio = random.Random(semente)
+    # Poucos documentos com muitas autuações e muitos com uma só, como nos dados do IBAMA
+    documentos = [_documento(aleatorio) for _ in range(max(1, tamanho // 4))]
+    pesos = [1.0 / (i + 1) for i in range(len(documentos))]
+    conhecidos = set(documentos)
+    ausentes = [d for d in (_documento(aleatorio) for _ in range(1000)) if d not in conhecidos]
+    agora = datetime(2025, 1, 1)
+
+    autuacoes = []
+    for i, (documento, (municipio, uf)) in enumerate(zip(
+        aleatorio.choices(documentos, weights=pesos, k=tamanho), aleatorio.choices(MUNICIPIOS, k=tamanho)
+    ), start=1):
+        autuacoes.append({
+            "id": i, "cpf_cnpj": documento, "nome_autuado": f"Autuado {documento[-4:]}",
+            "data_auto": _data(aleatorio), "valor_multa": round(aleatorio.uniform(500, 500_000), 2),
+            "descricao_infracao": _frase(aleatorio, 12), "municipio": municipio, "uf": uf,
+            "municipio_chave": chave_municipio(municipio, uf),
+            "created_at": (agora - timedelta(seconds=tamanho - i)).isoformat(),
+        })
+
+    embargos = []
+    for i in range(1, max(1, tamanho // 4) + 1):
+        municipio, uf = aleatorio.choice(MUNICIPIOS)
+        x, y = aleatorio.uniform(-60, -45), aleatorio.uniform(-12, 0)
+        embargos.append({
+            "id": i, "cpf_cnpj": aleatorio.choice(documentos), "nome_embargado": f"Embargado {i}",
+            "data_embargo": _data(aleatorio), "justificativa": _frase(aleatorio, 20), "municipio": municipio,
+            "uf": uf, "municipio_chave": chave_municipio(municipio, uf),
+            "wkt_geometria": f"POLYGON(({x} {y},{x + 0.01} {y},{x + 0.01} {y + 0.01},{x} {y + 0.01},{x} {y}))",
+            "wkb_geometria": None, "bbox_xmin": x, "bbox_ymin": y, "bbox_xmax": x + 0.01, "bbox_ymax": y + 0.01,
+        })
+
+    cnpjs = [d for d in documentos if len(d) == 14] or [_documento(aleatorio)]
+    ctf = [
+        {"id": i, "cnpj": cnpj, "razao_social": f"Empresa {cnpj[:6]} Ltda", "situacao_cadastro": aleatorio.choice(SITUACOES_CTF),
+         "data_situacao_cadastral": _data(aleatorio), "uf": aleatorio.choice(MUNICIPIOS)[1]}
+        for i, cnpj in enumerate(cnpjs[:max(1, tamanho // 4)], start=1)
+    ]
+
+    legislacao = [
+        {"id": i, "titulo": f"{aleatorio.choice(TIPOS_NORMA)} nº {1000 + i} - {_frase(aleatorio, 4)}",
+         "resumo": _frase(aleatorio, 30), "tipo_norma": aleatorio.choice(TIPOS_NORMA),
+         "link_oficial": f"https://www.planalto.gov.br/norma/{i}", "palavras_chave": aleatorio.sample(PALAVRAS, 4),
+         "embedding": None}
+        for i in range(1, 501)
+    ]
+    glossario = [
+        {"id": i, "termo": f"{palavra.upper()}-{i}", "definicao": _frase(aleatorio, 15), "categoria": "Geral"}
+        for i, palavra in enumerate(aleatorio.choices(PALAVRAS, k=300), start=1)
+    ]
+    municipios = sorted(
+        {chave_municipio(m, uf): {"municipio_chave": chave_municipio(m, uf), "municipio": m, "uf": uf} for m, uf in MUNICIPIOS}.values(),
+        key=lambda linha: linha["municipio_chave"],
+    )
+    tabelas_versionadas = ("autuacoes_ibama", "termos_embargo", "cadastro_tecnico_federal", "legislacao_ambiental", "termos_glossario")
+
+    return DadosSinteticos(
+        tabelas={
+            "autuacoes_ibama": autuacoes,
+            "termos_embargo": embargos,
+            "cadastro_tecnico_federal": ctf,
+            "legislacao_ambiental": legislacao,
+            "termos_glossario": glossario,
+            "municipios_chaves": municipios,
+            "versoes_dataset": [{"tabela": t, "versao": 1} for t in tabelas_versionadas],
+            "estatisticas_agregadas": [],
+            "ranking_documentos": [],
+        },
+        documentos=documentos,
+        documentos_ausentes=ausentes,
+        cnpjs_ctf=[linha["cnpj"] for linha in ctf],
+        termos_glossario=[linha["termo"] for linha in glossario],
+        termos_legislacao=PALAVRAS,
+    )
+
+
+def gravar_indices_documentos(dados: DadosSinteticos, pasta: str) -> None:
+    """Grava os índices de documentos da versão sintética, como o ETL faria ao publicar os dados."""
+    import pandas as pd
+
+    from config import settings
+    from servicos.documentos_conhecidos import TABELAS_INDICE, AcumuladorDocumentos
+
+    settings.INDICE_DOCUMENTOS_DIR = pasta
+    versoes = {linha["tabela"]: linha["versao"] for linha in dados.tabelas["versoes_dataset"]}
+    for tabela, coluna in TABELAS_INDICE.items():
+        acumulador = AcumuladorDocumentos(coluna)
+        acumulador.adicionar(pd.DataFrame({coluna: [linha[coluna] for linha in dados.tabelas[tabela]]}))
+        acumulador.gravar(tabela, versoes[tabela])
@@ -0,0 +1,105 @@
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict
+
+import pandas as pd
+
+from benchmarks.dados_sinteticos import MUNICIPIOS, PALAVRAS
+from scripts_etl.controle_execucao import adicionar_chave_e_hash
+from scripts_etl.datasets import EMBARGOS, INFRACOES
+from scripts_etl.estatisticas import AcumuladorEstatisticas
+from scripts_etl.pipeline import calcular_geometrias, converter_datas, reparar_encoding, shapely, transformar
+
+
+def _cpf_formatado(numero: int) -> str:
+    digitos = f"{numero:011d}"
+    return f"{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}"
+
+
+def chunk_infracoes(linhas: int, semente: int = 42) -> pd.DataFrame:
+    """Pedaço cru como sai do leitor de CSV: tudo texto, datas e decimais no formato do IBAMA."""
+    aleatorio = random.Random(semente)
+    municipios = aleatorio.choices(MUNICIPIOS, k=linhas)
+    # Parte das descrições com acentos em UTF-8 lido como latin-1, como no arquivo original
+    descricoes = [" ".join(aleatorio.choices(PALAVRAS, k=10)) for _ in range(linhas)]
+    descricoes = [d.encode("utf-8").decode("latin-1") if i % 3 == 0 else d for i, d in enumerate(descricoes)]
+    return pd.DataFrame({
+        "SEQ_AUTO_INFRACAO": [str(i) for i in range(linhas)],
+        "CPF_CNPJ_INFRATOR": [_cpf_formatado(aleatorio.randrange(10**11)) for _ in range(linhas)],
+        "NOME_INFRATOR": [f"Autuado {i % 997}" for i in range(linhas)],
+        "DAT_HORA_AUTO_INFRACAO": [
+            f"{aleatorio.randint(1, 28):02d}/{aleatorio.randint(1, 12):02d}/{aleatorio.randint(2018, 2024)} 10:30"
+            if i % 5 else f"{aleatorio.randint(2018, 2024)}-{aleatorio.randint(1, 12):02d}-{aleatorio.randint(1, 28):02d} 10:30:00"
+            for i in range(linhas)
+        ],
+        "VAL_AUTO_INFRACAO": [f"{aleatorio.uniform(500, 500000):.2f}".replace(".", ",") for _ in range(linhas)],
+        "DES_INFRACAO": descricoes,
+        "MUNICIPIO": [m for m, _ in municipios],
+        "UF": [uf for _, uf in municipios],
+    }, dtype="string[pyarrow]")
+
+
+def chunk_embargos(linhas: int, semente: int = 42) -> pd.DataFrame:
+    aleatorio = random.Random(semente)
+    poligonos = []
+    for _ in range(linhas):
+        x, y = aleatorio.uniform(-60, -45), aleatorio.uniform(-12, 0)
+        poligonos.append(f"POLYGON(({x} {y},{x + 0.01} {y},{x + 0.01} {y + 0.01},{x} {y + 0.01},{x} {y}))")
+    municipios = aleatorio.choices(MUNICIPIOS, k=linhas)
+    return pd.DataFrame({
+        "SEQ_TAD": [str(i) for i in range(linhas)],
+        "CPF_CNPJ_EMBARGADO": [f"{i:014d}" for i in range(linhas)],
+        "NOME_EMBARGADO": [f"Embargado {i % 997}" for i in range(linhas)],
+        "DAT_EMBARGO": [f"{aleatorio.randint(1, 28):02d}/{aleatorio.randint(1, 12):02d}/2022" for _ in range(linhas)],
+        "DES_TAD": [" ".join(aleatorio.choices(PALAVRAS, k=15)) for _ in range(linhas)],
+        "MUNICIPIO": [m for m, _ in municipios],
+        "UF": [uf for _, uf in municipios],
+        "GEOM_AREA_EMBARGADA": poligonos,
+    }, dtype="string[pyarrow]")
+
+
+def _medir(funcao: Callable[[], Any], repeticoes: int, linhas: int) -> Dict[str, float]:
+    funcao()  # aquecimento (caches de regex, importações tardias do pandas)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    mediana = statistics.median(tempos)
+    return {
+        "linhas": linhas,
+        "repeticoes": repeticoes,
+        "mediana_ms": round(mediana * 1000, 2),
+        "minimo_ms": round(min(tempos) * 1000, 2),
+        "linhas_por_segundo": round(linhas / mediana) if mediana else 0,
+    }
+
+
+## MICRO-BENCHMARKS DAS ETAPAS DE TRANSFORMAÇÃO DO ETL ##
+def executar(linhas: int = 50_000, repeticoes: int = 5) -> Dict[str, Dict[str, float]]:
+    bruto = chunk_infracoes(linhas)
+    transformado = transformar(INFRACOES, bruto)
+    datas = bruto["DAT_HORA_AUTO_INFRACAO"]
+    descricoes = bruto["DES_INFRACAO"]
+
+    def estatisticas():
+        acumulador = AcumuladorEstatisticas(INFRACOES.estatisticas)
+        acumulador.adicionar(transformado)
+        acumulador.estatisticas("autuacoes_ibama", 1)
+        acumulador.ranking("autuacoes_ibama", 1)
+
+    etapas = {
+        "converter_datas": lambda: converter_datas(datas, INFRACOES.formatos_data["data_auto"]),
+        "reparar_encoding": lambda: reparar_encoding(descricoes),
+        "transformar_infracoes": lambda: transformar(INFRACOES, bruto),
+        "chave_e_hash": lambda: adicionar_chave_e_hash(transformado, INFRACOES.colunas_dados, bruto["SEQ_AUTO_INFRACAO"]),
+        "estatisticas": estatisticas,
+    }
+    if shapely is not None:
+        bruto_embargos = chunk_embargos(linhas)
+        geometrias = bruto_embargos[["GEOM_AREA_EMBARGADA"]].rename(columns={"GEOM_AREA_EMBARGADA": "wkt_geometria"})
+        etapas["calcular_geometrias"] = lambda: calcular_geometrias(geometrias.copy(), "wkt_geometria")
+        etapas["transformar_embargos"] = lambda: transformar(EMBARGOS, bruto_embargos)
+
+    return {nome: _medir(funcao, repeticoes, linhas) for nome, funcao in etapas.items()}
@@ -0,0 +1,208 @@
+"""Benchmark reprodutível da API e do ETL, sem acesso ao Supabase.
+
+A API roda no próprio processo (ASGI) e o repositório conversa com um PostgREST em memória,
+com dados sintéticos e latência configurável. Exemplos:
+
+    python benchmarks/executar.py --saida resultados.json
+    python benchmarks/executar.py --latencia-ms 20 --concorrencia 64 --comparar resultados.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Credenciais fictícias: o PostgREST em memória substitui o Supabase
+os.environ.setdefault("SUPABASE_URL", "http://supabase.benchmark")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+# Codificador sem modelo: o benchmark mede o índice vetorial, não a qualidade semântica
+os.environ.setdefault("EMBEDDING_CODIFICADOR", "hash")
+
+if __name__ == "__main__":
+    # Adiciona o caminho do projeto para permitir a execução direta do script
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+import numpy as np
+
+from benchmarks import dados_sinteticos, postgrest_falso
+
+Cenario = Callable[[random.Random], str]
+
+
+def _cenarios(dados: dados_sinteticos.DadosSinteticos) -> Dict[str, Cenario]:
+    municipios = [m for m, _ in dados_sinteticos.MUNICIPIOS]
+    return {
+        "autuacoes_documento": lambda a: f"/api/autuacoes/documento/{a.choice(dados.documentos)}",
+        "embargos_documento": lambda a: f"/api/embargos/documento/{a.choice(dados.documentos)}",
+        "documento_sem_registros": lambda a: f"/api/autuacoes/documento/{a.choice(dados.documentos_ausentes)}",
+        "autuacoes_municipio": lambda a: f"/api/autuacoes/municipio/{a.choice(municipios)}?limite=50",
+        "autuacoes_recentes": lambda a: f"/api/autuacoes/recentes/?limite={a.randint(5, 50)}",
+        "legislacao_buscar": lambda a: f"/api/legislacao/buscar?termo={a.choice(dados.termos_legislacao)}",
+        "glossario": lambda a: f"/api/glossario/{a.choice(dados.termos_glossario)}",
+        "ctf_cnpj": lambda a: f"/api/ctf/cnpj/{a.choice(dados.cnpjs_ctf)}",
+        "ctf_situacao": lambda a: f"/api/ctf/situacao/{a.choice(dados_sinteticos.SITUACOES_CTF)}?limite=50",
+    }
+
+
+def _percentis(latencias: List[float]) -> Dict[str, float]:
+    valores = np.asarray(latencias) * 1000
+    p50, p95, p99 = np.percentile(valores, [50, 95, 99]) if len(valores) else (0.0, 0.0, 0.0)
+    return {"p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2), "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(valores.max()), 2) if len(valores) else 0.0}
+
+
+## CARGA CONCORRENTE SOBRE UM CENÁRIO ##
+async def _executar_cenario(cliente: httpx.AsyncClient, gerar_url: Cenario, requisicoes: int, concorrencia: int,
+                            semente: int) -> Dict[str, Any]:
+    aleatorio = random.Random(semente)
+    urls = [gerar_url(aleatorio) for _ in range(requisicoes)]
+    latencias: List[float] = []
+    status: Dict[str, int] = {}
+    proxima = iter(urls)
+
+    async def trabalhador():
+        for url in proxima:
+            inicio = time.perf_counter()
+            resposta = await cliente.get(url)
+            latencias.append(time.perf_counter() - inicio)
+            status[str(resposta.status_code)] = status.get(str(resposta.status_code), 0) + 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+    return {
+        "requisicoes": requisicoes,
+        "concorrencia": concorrencia,
+        "segundos": round(duracao, 3),
+        "requisicoes_por_segundo": round(requisicoes / duracao, 1) if duracao else 0.0,
+        **_percentis(latencias),
+        "status": status,
+    }
+
+
+async def benchmark_api(args) -> Dict[str, Any]:
+    import main
+    from servicos.cache import cache_consultas
+
+    dados = dados_sinteticos.gerar(args.tamanho, args.semente)
+    transporte = postgrest_falso.instalar(dados.tabelas, args.latencia_ms / 1000, args.variacao_ms / 1000)
+    if not args.sem_indice_documentos:
+        dados_sinteticos.gravar_indices_documentos(dados, tempfile.mkdtemp(prefix="indices_benchmark_"))
+    cenarios = _cenarios(dados)
+    escolhidos = args.cenarios or list(cenarios)
+
+    resultados = {}
+    # O lifespan abre o repositório e monta os índices em memória, como na subida real da API
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://benchmark") as cliente:
+            for numero, nome in enumerate(escolhidos):
+                if args.sem_cache:
+                    cache_consultas.limpar()
+                # Aquecimento fora da medição (índices preguiçosos, compilação de regex)
+                await _executar_cenario(cliente, cenarios[nome], min(args.requisicoes, 20), 1, args.semente + 1000)
+                if args.sem_cache:
+                    cache_consultas.limpar()
+                chamadas_antes = transporte.requisicoes
+                resultado = await _executar_cenario(
+                    cliente, cenarios[nome], args.requisicoes, args.concorrencia, args.semente + numero
+                )
+                resultado["chamadas_backend"] = transporte.requisicoes - chamadas_antes
+                resultados[nome] = resultado
+                print(f"   - {nome:<22} {resultado['requisicoes_por_segundo']:>9.1f} req/s  "
+                      f"p50 {resultado['p50_ms']:>7.2f} ms  p95 {resultado['p95_ms']:>7.2f} ms  "
+                      f"p99 {resultado['p99_ms']:>7.2f} ms  status {resultado['status']}")
+    return resultados
+
+
+def benchmark_etl(args) -> Dict[str, Any]:
+    from benchmarks import etl
+
+    resultados = etl.executar(args.linhas_etl, args.repeticoes_etl)
+    for nome, resultado in resultados.items():
+        print(f"   - {nome:<22} mediana {resultado['mediana_ms']:>9.2f} ms  {resultado['linhas_por_segundo']:>10} linhas/s")
+    return resultados
+
+
+## COMPARAÇÃO COM UM RESULTADO DE REFERÊNCIA ##
+def comparar(atual: Dict[str, Any], referencia: Dict[str, Any], tolerancia: float) -> List[str]:
+    """Lista as regressões: p95 da API ou mediana do ETL acima da referência além da tolerância."""
+    regressoes = []
+    for secao, metrica in (("api", "p95_ms"), ("etl", "mediana_ms")):
+        for nome, resultado in atual.get(secao, {}).items():
+            anterior = referencia.get(secao, {}).get(nome)
+            if not anterior or not anterior.get(metrica):
+                continue
+            variacao = resultado[metrica] / anterior[metrica] - 1
+            if variacao > tolerancia:
+                regressoes.append(
+                    f"{secao}/{nome}: {metrica} {anterior[metrica]} -> {resultado[metrica]} (+{variacao:.0%})"
+                )
+    return regressoes
+
+
+def _argumentos(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark da API e do ETL com um PostgREST em memória.")
+    parser.add_argument("--tamanho", type=int, default=50_000, help="Autuações sintéticas (as outras tabelas são proporcionais)")
+    parser.add_argument("--latencia-ms", type=float, default=5.0, help="Latência simulada de cada chamada ao PostgREST")
+    parser.add_argument("--variacao-ms", type=float, default=1.0, help="Variação aleatória (+/-) da latência")
+    parser.add_argument("--requisicoes", type=int, default=500, help="Requisições por cenário")
+    parser.add_argument("--concorrencia", type=int, default=32, help="Requisições simultâneas")
+    parser.add_argument("--cenarios", nargs="*", help="Cenários a executar (padrão: todos)")
+    parser.add_argument("--sem-cache", action="store_true", help="Esvazia o cache de consultas antes de cada cenário")
+    parser.add_argument("--sem-indice-documentos", action="store_true",
+                        help="Não gera o índice local de documentos (toda consulta por documento vai ao PostgREST)")
+    parser.add_argument("--linhas-etl", type=int, default=50_000, help="Linhas do pedaço usado nos micro-benchmarks do ETL")
+    parser.add_argument("--repeticoes-etl", type=int, default=5)
+    parser.add_argument("--sem-api", action="store_true")
+    parser.add_argument("--sem-etl", action="store_true")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="Arquivo JSON onde gravar os resultados")
+    parser.add_argument("--comparar", help="Arquivo JSON de referência; sai com código 1 se houver regressão")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Piora relativa aceita na comparação (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _argumentos(argv)
+    resultados: Dict[str, Any] = {
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "processadores": os.cpu_count(),
+            "executado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "parametros": {k: v for k, v in vars(args).items() if k not in ("saida", "comparar")},
+    }
+
+    if not args.sem_api:
+        print(f"\n--- API ({args.tamanho} autuações, latência {args.latencia_ms} ms, concorrência {args.concorrencia}) ---")
+        resultados["api"] = asyncio.run(benchmark_api(args))
+    if not args.sem_etl:
+        print(f"\n--- ETL ({args.linhas_etl} linhas por pedaço) ---")
+        resultados["etl"] = benchmark_etl(args)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
+        print(f"\nResultados gravados em '{args.saida}'.")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultados, json.load(arquivo), args.tolerancia)
+        if regressoes:
+            print("\nREGRESSÕES em relação à referência:")
+            for regressao in regressoes:
+                print(f"   - {regressao}")
+            return 1
+        print("\nNenhuma regressão em relação à referência.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+import asyncio
+import json
+import random
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+import httpx
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele as respostas usam o json padrão
+    orjson = None
+
+# Item de uma lista do PostgREST: valor entre aspas (com escapes) ou texto até a próxima vírgula
+_ITEM_LISTA = re.compile(r'"((?:[^"\\]|\\.)*)"|([^,]+)')
+
+
+def _itens_lista(texto: str) -> List[str]:
+    return [
+        re.sub(r'\\(.)', r'\1', aspas) if aspas else simples.strip()
+        for aspas, simples in _ITEM_LISTA.findall(texto)
+    ]
+
+
+def _comparavel(valor: Any) -> Any:
+    # O PostgREST compara no tipo da coluna; aqui basta comparar números como números
+    if isinstance(valor, (int, float)):
+        return valor
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return valor
+
+
+def _padrao_ilike(padrao: str) -> re.Pattern:
+    partes = [re.escape(p) for p in padrao.split("*")]
+    return re.compile("^" + ".*".join(partes) + "$", re.IGNORECASE | re.DOTALL)
+
+
+def _predicado(coluna: str, expressao: str) -> Callable[[Dict[str, Any]], bool]:
+    negado = expressao.startswith("not.")
+    if negado:
+        expressao = expressao[4:]
+    operador, _, valor = expressao.partition(".")
+
+    if operador == "eq":
+        teste = lambda v: v is not None and str(v) == valor
+    elif operador in ("gt", "gte", "lt", "lte"):
+        limite = _comparavel(valor)
+        comparacoes = {
+            "gt": lambda v: v > limite, "gte": lambda v: v >= limite,
+            "lt": lambda v: v < limite, "lte": lambda v: v <= limite,
+        }
+        teste = lambda v, c=comparacoes[operador]: v is not None and c(_comparavel(v))
+    elif operador == "in":
+        conjunto = set(_itens_lista(valor[1:-1]))
+        teste = lambda v: v is not None and str(v) in conjunto
+    elif operador == "ilike":
+        padrao = _padrao_ilike(valor[1:-1] if valor.startswith('"') else valor)
+        teste = lambda v: v is not None and bool(padrao.match(str(v)))
+    elif operador == "is":
+        teste = lambda v: v is None if valor == "null" else v is (valor == "true")
+    else:
+        raise ValueError(f"operador não suportado pelo PostgREST falso: {operador}")
+
+    return (lambda linha: not teste(linha.get(coluna))) if negado else (lambda linha: teste(linha.get(coluna)))
+
+
+def _predicado_ou(expressao: str) -> Callable[[Dict[str, Any]], bool]:
+    # or=(coluna.operador.valor,coluna.operador.valor)
+    predicados = []
+    for condicao in _itens_condicoes(expressao[1:-1]):
+        coluna, _, resto = condicao.partition(".")
+        predicados.append(_predicado(coluna, resto))
+    return lambda linha: any(p(linha) for p in predicados)
+
+
+def _itens_condicoes(texto: str) -> List[str]:
+    # Separa por vírgulas fora de aspas e parênteses
+    itens, atual, profundidade, aspas = [], [], 0, False
+    anterior = ""
+    for caractere in texto:
+        if caractere == '"' and anterior != "\\":
+            aspas = not aspas
+        elif not aspas and caractere == "(":
+            profundidade += 1
+        elif not aspas and caractere == ")":
+            profundidade -= 1
+        if caractere == "," and not aspas and profundidade == 0:
+            itens.append("".join(atual))
+            atual = []
+        else:
+            atual.append(caractere)
+        anterior = caractere
+    if atual:
+        itens.append("".join(atual))
+    return itens
+
+
+## POSTGREST EM MEMÓRIA (TRANSPORTE HTTPX) ##
+class PostgrestFalso(httpx.AsyncBaseTransport):
+    """Responde às consultas do RepositorioAsync a partir de listas em memória.
+
+    Suporta o subconjunto do PostgREST usado pela API (select, eq, gt, lte, in, ilike, is, or, order,
+    limit e Prefer: count=exact). A latência simula a ida e volta até o Supabase.
+    """
+
+    def __init__(self, tabelas: Dict[str, List[Dict[str, Any]]], latencia: float = 0.0, variacao: float = 0.0,
+                 semente: int = 0):
+        self.tabelas = tabelas
+        self.latencia = latencia
+        self.variacao = variacao
+        self.requisicoes = 0
+        self._aleatorio = random.Random(semente)
+        # Índices criados sob demanda: (tabela, coluna) -> valor -> linhas, e (tabela, "order:...") -> linhas
+        self._indices: Dict[Tuple[str, str], Any] = {}
+
+    def recarregar(self) -> None:
+        # Descarta os índices montados sob demanda, depois de alterar as listas em memória
+        self._indices.clear()
+
+    def _indice(self, tabela: str, coluna: str) -> Dict[str, List[Dict[str, Any]]]:
+        chave = (tabela, coluna)
+        if chave not in self._indices:
+            indice: Dict[str, List[Dict[str, Any]]] = {}
+            for linha in self.tabelas.get(tabela, []):
+                if linha.get(coluna) is not None:
+                    indice.setdefault(str(linha[coluna]), []).append(linha)
+            self._indices[chave] = indice
+        return self._indices[chave]
+
+    def _linhas_candidatas(self, tabela: str, filtros: List[Tuple[str, str]]) -> Optional[List[Dict[str, Any]]]:
+        # Um filtro eq/in sobre qualquer coluna usa o índice, como um índice B-tree faria no Postgres
+        for coluna, expressao in filtros:
+            if coluna != "or" and expressao.startswith("eq."):
+                return self._indice(tabela, coluna).get(expressao[3:], [])
+            if coluna != "or" and expressao.startswith("in.("):
+                indice = self._indice(tabela, coluna)
+                return [linha for valor in _itens_lista(expressao[4:-1]) for linha in indice.get(valor, [])]
+        return None
+
+    @staticmethod
+    def _ordenar(linhas: List[Dict[str, Any]], ordem: str) -> List[Dict[str, Any]]:
+        coluna, _, direcao = ordem.partition(".")
+        # Nulos por último, como no Postgres em ordem crescente
+        return sorted(
+            linhas,
+            key=lambda l: (l.get(coluna) is None, _comparavel(l.get(coluna)) if l.get(coluna) is not None else 0),
+            reverse=direcao.startswith("desc"),
+        )
+
+    def _tabela_ordenada(self, tabela: str, ordem: str) -> List[Dict[str, Any]]:
+        # Ordenação da tabela inteira guardada, como um índice na coluna do ORDER BY
+        chave = (tabela, "order:" + ordem)
+        if chave not in self._indices:
+            self._indices[chave] = self._ordenar(self.tabelas.get(tabela, []), ordem)
+        return self._indices[chave]
+
+    def consultar(self, tabela: str, parametros: List[Tuple[str, str]], contar: bool) -> Tuple[List[Dict[str, Any]], int]:
+        colunas, ordem, limite, filtros = "*", None, None, []
+        for nome, valor in parametros:
+            if nome == "select":
+                colunas = valor
+            elif nome == "order":
+                ordem = valor
+            elif nome == "limit":
+                limite = int(valor)
+            else:
+                filtros.append((nome, valor))
+
+        predicados = [_predicado_ou(v) if c == "or" else _predicado(c, v) for c, v in filtros]
+        candidatas = self._linhas_candidatas(tabela, filtros)
+        if candidatas is None:
+            candidatas = self._tabela_ordenada(tabela, ordem) if ordem else self.tabelas.get(tabela, [])
+        elif ordem:
+            candidatas = self._ordenar(candidatas, ordem)
+
+        # Percorre na ordem pedida e para no limite, a não ser que o total tenha sido pedido
+        linhas, total = [], 0
+        for linha in candidatas:
+            if all(p(linha) for p in predicados):
+                total += 1
+                if limite is None or len(linhas) < limite:
+                    linhas.append(linha)
+                elif not contar:
+                    break
+        if colunas != "*":
+            nomes = [c.strip() for c in colunas.split(",")]
+            linhas = [{c: l.get(c) for c in nomes} for l in linhas]
+        return linhas, total
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requisicoes += 1
+        if self.latencia or self.variacao:
+            await asyncio.sleep(max(0.0, self.latencia + self._aleatorio.uniform(-self.variacao, self.variacao)))
+
+        tabela = unquote(request.url.path.rstrip("/").rsplit("/", 1)[-1])
+        if tabela not in self.tabelas:
+            return httpx.Response(404, json={"code": "42P01", "message": f"relation '{tabela}' does not exist"})
+        contar = "count=exact" in request.headers.get("prefer", "")
+        try:
+            linhas, total = self.consultar(tabela, list(request.url.params.multi_items()), contar)
+        except ValueError as e:
+            return httpx.Response(400, json={"code": "PGRST100", "message": str(e)})
+
+        corpo = orjson.dumps(linhas) if orjson else json.dumps(linhas).encode()
+        cabecalhos = {"content-type": "application/json"}
+        if contar:
+            cabecalhos["content-range"] = f"0-{max(len(linhas) - 1, 0)}/{total}" if linhas else f"*/{total}"
+        return httpx.Response(200, content=corpo, headers=cabecalhos)
+
+
+def instalar(tabelas: Dict[str, List[Dict[str, Any]]], latencia: float = 0.0, variacao: float = 0.0,
+             repositorio=None) -> PostgrestFalso:
+    """Faz o repositório da API usar o PostgREST em memória no lugar do Supabase."""
+    if repositorio is None:
+        from servicos.repositorio import obter_repositorio
+        repositorio = obter_repositorio()
+    transporte = PostgrestFalso(tabelas, latencia, variacao)
+    repositorio.usar_transporte(transporte)
+    return transporte
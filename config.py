@@ -1,9 +1,108 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     SUPABASE_URL: str
     SUPABASE_KEY: str
 
+    # Pool de conexões HTTP compartilhado pela camada de acesso a dados (httpx)
+    DB_HTTP2: bool = True
+    DB_MAX_CONEXOES: int = 200
+    DB_MAX_CONEXOES_KEEPALIVE: int = 50
+    DB_KEEPALIVE_EXPIRACAO: float = 30.0
+    DB_TIMEOUT_CONEXAO: float = 5.0
+    DB_TIMEOUT_LEITURA: float = 10.0
+    DB_TIMEOUT_POOL: float = 5.0
+    DB_COALESCER_CONSULTAS: bool = True  # consultas idênticas simultâneas compartilham uma única chamada
+
+    # Controle de admissão: vagas e fila de cada classe de endpoint, e prazo total de cada requisição
+    ADMISSAO_PONTUAL_LIMITE: int = 64
+    ADMISSAO_PONTUAL_FILA: int = 256
+    ADMISSAO_VARREDURA_LIMITE: int = 8
+    ADMISSAO_VARREDURA_FILA: int = 32
+    ADMISSAO_EXPORTACAO_LIMITE: int = 2  # exportações em streaming seguram a vaga até o último byte
+    ADMISSAO_EXPORTACAO_FILA: int = 4
+    ADMISSAO_ESPERA_MAXIMA: float = 2.0  # segundos na fila antes do 503
+    ADMISSAO_RETRY_AFTER: int = 1  # segundos sugeridos ao cliente no cabeçalho Retry-After
+    API_PRAZO_REQUISICAO: float = 15.0  # segundos; depois disso o processamento é cancelado (504). 0 desliga
+
+    # Cache em memória das consultas por documento
+    CACHE_TAMANHO_MAXIMO: int = 10000
+    CACHE_TTL_SEGUNDOS: float = 600.0
+
+    # Intervalo (segundos) para revalidar as versões dos datasets publicadas pelo ETL
+    VERSAO_INTERVALO_VERIFICACAO: float = 30.0
+    # Espera (segundos) antes de tentar de novo carregar o dicionário de municípios após uma falha
+    MUNICIPIOS_ESPERA_NOVA_TENTATIVA: float = 15.0
+    # Validade (segundos) no Cache-Control das respostas com ETag; o ETag muda a cada versão publicada
+    HTTP_CACHE_MAX_AGE: int = 60
+
+    # Paginação por chave (keyset em 'id') das listagens por município e situação
+    PAGINA_TAMANHO_PADRAO: int = 50
+    PAGINA_TAMANHO_MAXIMO: int = 500
+
+    # Triagem em lote: documentos por requisição e por filtro in.(...) enviado ao PostgREST
+    TRIAGEM_MAXIMO_DOCUMENTOS: int = 5000
+    CONSULTA_LOTE_DOCUMENTOS: int = 150
+
+    # Consultas espaciais: geometrias (WKB decodificado) dos embargos mantidas em memória; o índice guarda
+    # só os retângulos envolventes e busca a geometria no banco quando o retângulo é candidato
+    ESPACIAL_CACHE_GEOMETRIAS: int = 20000
+
+    # Exportação em streaming (NDJSON/CSV): linhas por página buscada no banco e nível de compressão
+    EXPORTACAO_TAMANHO_PAGINA: int = 1000
+    EXPORTACAO_NIVEL_GZIP: int = 6
+    EXPORTACAO_NIVEL_BROTLI: int = 5
+
+    # Instrumentação: métricas em /metrics (formato Prometheus) e cabeçalho Server-Timing
+    METRICAS_ATIVAS: bool = True
+
+    # Estatísticas agregadas: tamanho dos rankings de documentos calculados pelo ETL
+    ESTATISTICAS_TAMANHO_RANKING: int = 20
+
+    # Busca semântica na legislação: codificador e índice vetorial. "hash" não tem semântica (só testes e
+    # benchmarks); sem o sentence-transformers instalado, /api/legislacao/semantica responde 503
+    EMBEDDING_CODIFICADOR: str = "sentence-transformers"
+    EMBEDDING_MODELO: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    EMBEDDING_DIMENSAO: int = 384
+    EMBEDDING_ANN_MINIMO: int = 20000  # a partir deste número de normas usa o índice aproximado (IVF)
+    EMBEDDING_ANN_SONDAS: int = 8
+
+    # Modo snapshot: o ETL grava um arquivo Arrow por tabela e a API responde a partir dele
+    SNAPSHOT_ATIVO: bool = False
+    SNAPSHOT_DIR: str = "snapshots"
+
+    # Índice local dos documentos presentes em autuações e embargos (gerado pelo ETL): responde
+    # sem ir ao banco quando o documento não tem registros. Sem o arquivo, as consultas vão ao Supabase
+    INDICE_DOCUMENTOS_ATIVO: bool = True
+    INDICE_DOCUMENTOS_DIR: str = "indices"
+    # Rejeita (400) CPF/CNPJ com dígitos verificadores incorretos antes de consultar o banco. Desligado por
+    # padrão: os arquivos do IBAMA podem ter documentos com dígitos errados, que continuam consultáveis
+    VALIDAR_DIGITOS_DOCUMENTO: bool = False
+
+    # ETL: leitura em pedaços para limitar o pico de memória
+    ETL_TAMANHO_CHUNK: int = 50000
+    ETL_TAMANHO_BLOCO_DOWNLOAD: int = 1_048_576
+    ETL_DOWNLOAD_MEMORIA_MAXIMA: int = 32 * 1_048_576
+    ETL_TIMEOUT_DOWNLOAD: float = 60.0
+    ETL_LEGISLACAO_ARQUIVO: str = "bd/legislacao_ambiental.csv"  # Catálogo curado de normas (CSV local)
+
+    # ETL: carga paralela em lotes com novas tentativas e tamanho de lote adaptativo
+    ETL_WORKERS: int = 4
+    ETL_LOTE_INICIAL: int = 500
+    ETL_LOTE_MINIMO: int = 50
+    ETL_LOTE_MAXIMO: int = 5000
+    ETL_LATENCIA_ALVO: float = 2.0  # segundos por lote
+    ETL_TENTATIVAS: int = 5
+    ETL_ESPERA_BASE: float = 0.5  # segundos, dobrando a cada nova tentativa
+    ETL_DEAD_LETTER_DIR: str = "dead_letter"
+
+    # ETL: destino da carga. "postgrest" (upsert em lotes pela API) ou "copy" (COPY direto no Postgres,
+    # com merge atômico); o destino "copy" usa a conexão DATABASE_URL, que pode ser um Postgres local
+    ETL_DESTINO: str = "postgrest"
+    DATABASE_URL: Optional[str] = None
+
     class Config:
         env_file = ".env"
 
@@ -1,12 +1,55 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import consulta_cnpj_cpf, consulta_municipio, consulta_recentes, consulta_glossario, consulta_legislacao, consulta_embargos, consulta_ctf
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
+from routers import consulta_cnpj_cpf, consulta_municipio, consulta_recentes, consulta_glossario, consulta_legislacao, consulta_embargos, consulta_ctf, consulta_dossie, consulta_triagem, consulta_estatisticas
+from servicos.admissao import MiddlewarePrazo
+from servicos.busca_legislacao import busca_legislacao
+from servicos.cache import cache_consultas
+from servicos.documentos_conhecidos import documentos_conhecidos
+from servicos.espacial import busca_espacial
+from servicos.estatisticas import estatisticas
+from servicos.glossario import glossario
+from servicos.metricas import MiddlewareMetricas, cache_consultas_eventos, registro
+from servicos.repositorio import obter_repositorio
+from servicos.versoes import versoes
+
+try:
+    import orjson  # noqa: F401
+    # Serialização JSON em Rust, bem mais rápida que o encoder padrão nas listas grandes
+    ClasseResposta = ORJSONResponse
+except ImportError:
+    ClasseResposta = JSONResponse
+
+
+# Abre o pool de conexões com o Supabase na subida da API e fecha no desligamento
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    repositorio = obter_repositorio()
+    await repositorio.iniciar()
+    await versoes.atualizar()
+    # Monta os índices em memória já na subida, e não na primeira consulta
+    indices = (
+        ("legislação", busca_legislacao), ("glossário", glossario),
+        ("embargos (espacial)", busca_espacial), ("estatísticas", estatisticas),
+        ("documentos conhecidos", documentos_conhecidos),
+    )
+    for nome, indice in indices:
+        try:
+            await indice.garantir_atualizado()
+        except Exception as e:
+            print(f"Aviso: índice de {nome} não carregado na inicialização: {e}")
+    yield
+    await repositorio.fechar()
+
 
 # Cria uma instância da aplicação FastAPI
 app = FastAPI(
     title="EcoBot API",
     description="API para fornecer dados ambientais ao chatbot EcoBot.",
-    version="1.1.0"
+    version="1.1.0",
+    lifespan=lifespan,
+    default_response_class=ClasseResposta
 )
 
 # Configuração CORS - ESSENCIAL para integração com Rasa AI
@@ -16,20 +59,49 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Permite GET, POST, PUT, DELETE, etc.
     allow_headers=["*"],  # Permite todos os headers
+    expose_headers=["Server-Timing", "ETag"],
 )
 
+# Prazo por requisição: cancela o trabalho no banco quando o cliente desiste ou o tempo acaba
+app.add_middleware(MiddlewarePrazo)
+
+# Latência, status e requisições em andamento por rota, e tempos do Supabase no cabeçalho Server-Timing.
+# Registrado por último para ficar por fora de todos os outros middlewares
+app.add_middleware(MiddlewareMetricas)
+
 # Incluir os routeadores no executor
-app.include_router(endpoint01.router)
+app.include_router(consulta_cnpj_cpf.router)
 app.include_router(consulta_municipio.router)
 app.include_router(consulta_recentes.router)
 app.include_router(consulta_glossario.router)
 app.include_router(consulta_legislacao.router)
 app.include_router(consulta_embargos.router)
 app.include_router(consulta_ctf.router)
+app.include_router(consulta_dossie.router)
+app.include_router(consulta_triagem.router)
+app.include_router(consulta_estatisticas.router)
 
 
 # **** ENDPOINT RAIZ PARA VERIFICAR SE A API ESTA ONLINE E DA A MSG DE BOAS-VINDAS ****
 @app.get("/", tags=["Status"])
-def read_root():
+async def read_root():
     return {"message": "Bem-vindo à API do EcoBot!"}
 
+
+# **** ENDPOINT DE DIAGNÓSTICO DO CACHE DE CONSULTAS E DAS VERSÕES DOS DATASETS ****
+@app.get("/status/cache", tags=["Status"])
+async def status_cache():
+    return {
+        "cache": cache_consultas.estatisticas(),
+        "consultas_coalescidas": obter_repositorio().coalescidas,
+        "versoes": await versoes.obter_todas(),
+    }
+
+
+# **** MÉTRICAS NO FORMATO DE TEXTO DO PROMETHEUS ****
+@app.get("/metrics", tags=["Status"], response_class=PlainTextResponse)
+async def metricas():
+    estatisticas_cache = cache_consultas.estatisticas()
+    for tipo in ("acertos", "falhas", "entradas"):
+        cache_consultas_eventos.definir(tipo, valor=estatisticas_cache[tipo])
+    return PlainTextResponse(registro.expor(), media_type="text/plain; version=0.0.4")
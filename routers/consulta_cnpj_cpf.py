@@ -1,6 +1,11 @@
-from fastapi import Path, HTTPException, APIRouter
-from schemas.sch_base_consultas import RespostaConsultaSchema
-from supabase_client import supabase
+from fastapi import Depends, Path, HTTPException, APIRouter
+from config import settings
+from schemas.sch_base_consultas import AutuacaoSchema, RespostaConsultaSchema
+from servicos.admissao import consultas_pontuais
+from servicos.consultas import buscar_autuacoes
+from servicos.normalizacao import documento_valido, limpar_documento
+from servicos.projecao import CamposConsulta
+from servicos.validadores_http import ValidadorVersao
 
 
 router = APIRouter(
@@ -8,21 +13,32 @@ router = APIRouter(
     tags=["Consultas de Autuações"]
 )
 
-### CONSULTA O 'cnpj' ou o 'cpf' ###
-@router.get("/{cpf_cnpj}", response_model=RespostaConsultaSchema)
-def consultar_por_documento(cpf_cnpj: str = Path(..., title="CPF ou CNPJ a ser consultado")):
+# ETag e Cache-Control pela versão dos datasets consultados (304 se o cliente já tem a resposta)
+validar_autuacoes = ValidadorVersao("autuacoes_ibama")
 
-    documento_limpo = "".join(filter(str.isdigit, cpf_cnpj))
+campos_autuacao = CamposConsulta(AutuacaoSchema)
 
-    try:
-        # Executa a consulta no Supabase
-        response = supabase.table('autuacoes_ibama').select("*").eq('cpf_cnpj', documento_limpo).execute()
+### CONSULTA O 'cnpj' ou o 'cpf' ###
+@router.get("/{cpf_cnpj}", response_model=RespostaConsultaSchema, response_model_exclude_unset=True, dependencies=[Depends(validar_autuacoes), Depends(consultas_pontuais)])
+async def consultar_por_documento(
+    cpf_cnpj: str = Path(..., title="CPF ou CNPJ a ser consultado"),
+    colunas: str = Depends(campos_autuacao)
+):
+
+    documento_limpo = limpar_documento(cpf_cnpj)
+    # Documento malformado (tamanho ou dígitos verificadores) é recusado antes de qualquer consulta
+    if not documento_valido(documento_limpo, settings.VALIDAR_DIGITOS_DOCUMENTO):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Documento '{cpf_cnpj}' inválido: informe um CPF (11 dígitos) ou CNPJ (14 dígitos) válido."
+        )
 
-        # A biblioteca do Supabase retorna os dados dentro de um atributo 'data'
-        dados = response.data
+    try:
+        # Consulta o cache e, se necessário, o Supabase
+        dados = await buscar_autuacoes(documento_limpo, colunas)
 
     except Exception as e:
         # Tratamento de erro genérico para falhas na consulta
         raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
 
-    return {"documento": documento_limpo, "autuacoes": dados}
\ No newline at end of file
+    return {"documento": documento_limpo, "autuacoes": dados}
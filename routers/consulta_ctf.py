@@ -1,53 +1,85 @@
-from typing import List
-from fastapi import APIRouter, Path, HTTPException
-from schemas.sch_base_consultas import CadastroTecnicoFederalSchema, RespostaCTFSchema
-from supabase_client import supabase
+from typing import Optional
+from fastapi import APIRouter, Depends, Path, Query, HTTPException, Request
+from config import settings
+from schemas.sch_base_consultas import CadastroTecnicoFederalSchema, PaginaCTFSchema, RespostaCTFSchema
+from servicos.admissao import consultas_exportacao, consultas_pontuais, consultas_varredura
+from servicos.consultas import buscar_ctf, buscar_pagina
+from servicos.exportacao import exportar
+from servicos.normalizacao import documento_valido, limpar_documento
+from servicos.projecao import CamposConsulta
+from servicos.repositorio import ilike
+from servicos.validadores_http import ValidadorVersao
 
 router = APIRouter(
     prefix="/api/ctf",
     tags=["Consultas de Cadastro Técnico Federal"]
 )
 
+# ETag e Cache-Control pela versão dos datasets consultados (304 se o cliente já tem a resposta)
+validar_ctf = ValidadorVersao("cadastro_tecnico_federal")
+
+campos_ctf = CamposConsulta(CadastroTecnicoFederalSchema)
+
 ### ROUTER PARA CONSULTA O CADASTRA TECNICO FEDERAL PELO 'CNPJ'  ###
-@router.get("/cnpj/{cnpj}", response_model=RespostaCTFSchema)
-def consultar_ctf_por_cnpj(
-    cnpj: str = Path(..., title="CNPJ a ser consultado")
+@router.get("/cnpj/{cnpj}", response_model=RespostaCTFSchema, response_model_exclude_unset=True, dependencies=[Depends(validar_ctf), Depends(consultas_pontuais)])
+async def consultar_ctf_por_cnpj(
+    cnpj: str = Path(..., title="CNPJ a ser consultado"),
+    colunas: str = Depends(campos_ctf)
 ):
-    cnpj_limpo = "".join(filter(str.isdigit, cnpj))
+    cnpj_limpo = limpar_documento(cnpj)
+    # O CTF só cadastra pessoas jurídicas: um CPF aqui também é entrada inválida
+    if len(cnpj_limpo) != 14 or not documento_valido(cnpj_limpo, settings.VALIDAR_DIGITOS_DOCUMENTO):
+        raise HTTPException(status_code=400, detail=f"CNPJ '{cnpj}' inválido.")
 
     try:
-        # Executa a consulta no Supabase
-        response = supabase.table('cadastro_tecnico_federal').select("*").eq('cnpj', cnpj_limpo).limit(1).single().execute()
-        dado = response.data
+        # Consulta o cache e, se necessário, o Supabase
+        dado = await buscar_ctf(cnpj_limpo, colunas)
     except Exception as e:
-        # Se não encontrar registro, retorna 404
-        if "not found" in str(e).lower() or "single" in str(e).lower():
-            raise HTTPException(
-                status_code=404,
-                detail=f"CNPJ '{cnpj_limpo}' não encontrado no Cadastro Técnico Federal."
-            )
         raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
 
+    # Se não encontrar registro, retorna 404
+    if not dado:
+        raise HTTPException(
+            status_code=404,
+            detail=f"CNPJ '{cnpj_limpo}' não encontrado no Cadastro Técnico Federal."
+        )
+
     return {"cnpj": cnpj_limpo, "cadastro": dado}
 
 
-### ROUTER PARA CONSULTA A SITUACAO CADASTRA TECNICO FEDERAL  ###
-@router.get("/situacao/{situacao}", response_model=List[CadastroTecnicoFederalSchema])
-def consultar_ctf_por_situacao(
-    situacao: str = Path(..., title="Situação cadastral a ser consultada")
+### ROUTER PARA CONSULTA A SITUACAO CADASTRA TECNICO FEDERAL, PAGINADA PELO 'id'  ###
+@router.get("/situacao/{situacao}", response_model=PaginaCTFSchema, response_model_exclude_unset=True, dependencies=[Depends(validar_ctf), Depends(consultas_varredura)])
+async def consultar_ctf_por_situacao(
+    situacao: str = Path(..., title="Situação cadastral a ser consultada"),
+    limite: int = Query(settings.PAGINA_TAMANHO_PADRAO, ge=1, le=settings.PAGINA_TAMANHO_MAXIMO, description="Tamanho da página"),
+    cursor: Optional[int] = Query(None, ge=0, description="Valor de 'next_cursor' retornado pela página anterior"),
+    contar: bool = Query(False, description="Se verdadeiro, retorna também o total de registros encontrados"),
+    colunas: str = Depends(campos_ctf)
 ):
     try:
-        response = supabase.table('cadastro_tecnico_federal').select("*").ilike('situacao_cadastro', f'%{situacao}%').execute()
-        dados = response.data
+        pagina = await buscar_pagina(
+            'cadastro_tecnico_federal', [ilike('situacao_cadastro', f'*{situacao}*')], limite, cursor, contar, colunas
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
 
-    if not dados:
+    if not pagina.itens and cursor is None:
         raise HTTPException(
             status_code=404,
             detail=f"Nenhum cadastro encontrado com a situação: '{situacao}'"
         )
 
-    return dados
+    return pagina
 
 
+### EXPORTA TODOS OS CADASTROS COM UMA SITUAÇÃO EM NDJSON OU CSV (STREAMING, SEM PAGINAÇÃO) ###
+@router.get("/situacao/{situacao}/exportar", dependencies=[Depends(consultas_exportacao)])
+async def exportar_ctf_por_situacao(
+    request: Request,
+    situacao: str = Path(..., title="Situação cadastral a ser exportada"),
+    formato: str = Query("ndjson", pattern="^(ndjson|csv)$", description="'ndjson' (um JSON por linha) ou 'csv'"),
+    colunas: str = Depends(campos_ctf)
+):
+    return exportar(
+        request, 'cadastro_tecnico_federal', [ilike('situacao_cadastro', f'*{situacao}*')], colunas, formato, "ctf_situacao"
+    )
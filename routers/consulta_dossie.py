@@ -0,0 +1,68 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Dict
+from fastapi import APIRouter, Depends, Path, HTTPException
+from config import settings
+from schemas.sch_base_consultas import RespostaDossieSchema
+from servicos.admissao import consultas_pontuais
+from servicos.consultas import buscar_autuacoes, buscar_embargos, buscar_ctf
+from servicos.normalizacao import documento_valido, limpar_documento
+from servicos.projecao import COLUNAS_AUTUACOES, COLUNAS_CTF, COLUNAS_EMBARGOS
+
+router = APIRouter(
+    prefix="/api/dossie",
+    tags=["Dossiê de Conformidade"]
+)
+
+
+# Executa a consulta de uma fonte medindo o tempo; uma falha fica registrada só nessa fonte
+async def _consultar_fonte(consulta: Awaitable[Any]) -> Dict[str, Any]:
+    inicio = time.perf_counter()
+    try:
+        dados = await consulta
+        status = "ok" if dados else "nao_encontrado"
+        erro = None
+    except Exception as e:
+        dados, status, erro = None, "erro", f"Erro ao consultar o banco de dados: {e}"
+    return {
+        "status": status,
+        "tempo_ms": round((time.perf_counter() - inicio) * 1000, 2),
+        "erro": erro,
+        "dados": dados,
+    }
+
+
+async def _fonte_nao_aplicavel() -> Dict[str, Any]:
+    return {"status": "nao_aplicavel", "tempo_ms": 0.0, "erro": None, "dados": None}
+
+
+### CONSULTA AUTUAÇÕES, EMBARGOS E CTF DE UM DOCUMENTO EM PARALELO ###
+@router.get("/{cpf_cnpj}", response_model=RespostaDossieSchema, dependencies=[Depends(consultas_pontuais)])
+async def consultar_dossie(
+    cpf_cnpj: str = Path(..., title="CPF ou CNPJ a ser consultado")
+):
+    documento_limpo = limpar_documento(cpf_cnpj)
+
+    if not documento_valido(documento_limpo, settings.VALIDAR_DIGITOS_DOCUMENTO):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Documento '{cpf_cnpj}' inválido: informe um CPF (11 dígitos) ou CNPJ (14 dígitos) válido."
+        )
+    eh_cnpj = len(documento_limpo) == 14
+
+    inicio = time.perf_counter()
+    # O CTF só cadastra pessoas jurídicas, então para CPF a fonte não se aplica
+    autuacoes, embargos, ctf = await asyncio.gather(
+        _consultar_fonte(buscar_autuacoes(documento_limpo, COLUNAS_AUTUACOES)),
+        _consultar_fonte(buscar_embargos(documento_limpo, COLUNAS_EMBARGOS)),
+        _consultar_fonte(buscar_ctf(documento_limpo, COLUNAS_CTF)) if eh_cnpj else _fonte_nao_aplicavel(),
+    )
+
+    return {
+        "documento": documento_limpo,
+        "tipo_documento": "CNPJ" if eh_cnpj else "CPF",
+        "autuacoes": autuacoes,
+        "embargos": embargos,
+        "ctf": ctf,
+        "tempo_total_ms": round((time.perf_counter() - inicio) * 1000, 2),
+    }
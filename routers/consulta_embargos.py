@@ -1,47 +1,165 @@
-from typing import List
-from fastapi import APIRouter, Path, HTTPException
-from schemas.sch_base_consultas import TermoEmbargoSchema, RespostaEmbargoSchema
-from supabase_client import supabase
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Path, Query, HTTPException, Request
+from config import settings
+from schemas.sch_base_consultas import (
+    PaginaEmbargosSchema, RespostaEmbargoSchema, RespostaEmbargosEspacialSchema, TermoEmbargoSchema
+)
+from servicos.admissao import consultas_exportacao, consultas_pontuais, consultas_varredura
+from servicos.consultas import buscar_embargos, buscar_pagina, filtros_por_municipio
+from servicos.espacial import busca_espacial
+from servicos.exportacao import exportar
+from servicos.normalizacao import documento_valido, limpar_documento
+from servicos.projecao import CamposConsulta
+from servicos.repositorio import eq, in_, obter_repositorio
+from servicos.validadores_http import ValidadorVersao
 
 router = APIRouter(
     prefix="/api/embargos",
     tags=["Consultas de Termos de Embargo"]
 )
 
+# ETag e Cache-Control pela versão dos datasets consultados (304 se o cliente já tem a resposta)
+validar_embargos = ValidadorVersao("termos_embargo")
+validar_embargos_municipio = ValidadorVersao("termos_embargo", "autuacoes_ibama")
+
+# A geometria (texto WKT, potencialmente grande) só é buscada quando pedida em ?fields=
+campos_embargo = CamposConsulta(TermoEmbargoSchema, excluir_por_padrao=("wkt_geometria",))
+
 ### CONSULTA TERMOS DE EMBARGOS ###
-@router.get("/documento/{cpf_cnpj}", response_model=RespostaEmbargoSchema)
-def consultar_embargo_por_documento(
-    cpf_cnpj: str = Path(..., title="CPF ou CNPJ a ser consultado")
+@router.get("/documento/{cpf_cnpj}", response_model=RespostaEmbargoSchema, response_model_exclude_unset=True, dependencies=[Depends(validar_embargos), Depends(consultas_pontuais)])
+async def consultar_embargo_por_documento(
+    cpf_cnpj: str = Path(..., title="CPF ou CNPJ a ser consultado"),
+    colunas: str = Depends(campos_embargo)
 ):
-    documento_limpo = "".join(filter(str.isdigit, cpf_cnpj))
+    documento_limpo = limpar_documento(cpf_cnpj)
+    if not documento_valido(documento_limpo, settings.VALIDAR_DIGITOS_DOCUMENTO):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Documento '{cpf_cnpj}' inválido: informe um CPF (11 dígitos) ou CNPJ (14 dígitos) válido."
+        )
 
     try:
-        # Executa a consulta no Supabase
-        response = supabase.table('termos_embargo').select("*").eq('cpf_cnpj', documento_limpo).execute()
-        dados = response.data
+        # Consulta o cache e, se necessário, o Supabase
+        dados = await buscar_embargos(documento_limpo, colunas)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
 
     return {"documento": documento_limpo, "embargos": dados}
 
 
-### BUSCANDO OS EMBARGOS PELO O MUNICIPIO###
-@router.get("/municipio/{nome_municipio}", response_model=List[TermoEmbargoSchema])
-def consultar_embargo_por_municipio(
-    nome_municipio: str = Path(..., title="Nome do município a ser consultado")
+### BUSCANDO OS EMBARGOS PELO O MUNICIPIO, PAGINADOS PELO 'id' ###
+@router.get("/municipio/{nome_municipio}", response_model=PaginaEmbargosSchema, response_model_exclude_unset=True, dependencies=[Depends(validar_embargos_municipio), Depends(consultas_varredura)])
+async def consultar_embargo_por_municipio(
+    nome_municipio: str = Path(..., title="Nome do município a ser consultado (com ou sem acentos, ex.: 'Belem' ou 'Belém - PA')"),
+    uf: Optional[str] = Query(None, min_length=2, max_length=2, description="UF para desambiguar municípios homônimos"),
+    limite: int = Query(settings.PAGINA_TAMANHO_PADRAO, ge=1, le=settings.PAGINA_TAMANHO_MAXIMO, description="Tamanho da página"),
+    cursor: Optional[int] = Query(None, ge=0, description="Valor de 'next_cursor' retornado pela página anterior"),
+    contar: bool = Query(False, description="Se verdadeiro, retorna também o total de registros encontrados"),
+    colunas: str = Depends(campos_embargo)
 ):
     try:
-        response = supabase.table('termos_embargo').select("*").ilike('municipio', f'%{nome_municipio}%').execute()
-        dados = response.data
+        filtros, sugestoes = await filtros_por_municipio(nome_municipio, uf)
+        pagina = await buscar_pagina('termos_embargo', filtros, limite, cursor, contar, colunas) if filtros else None
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
 
-    if not dados:
+    # O nome não corresponde a nenhum município conhecido (ou é ambíguo): devolve sugestões
+    if pagina is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"mensagem": f"Nenhum embargo encontrado para o município: {nome_municipio}", "sugestoes": sugestoes}
+        )
+
+    if not pagina.itens and cursor is None:
         raise HTTPException(
             status_code=404,
             detail=f"Nenhum embargo encontrado para o município: {nome_municipio}"
         )
 
-    return dados
+    return pagina
+
+
+### EXPORTA TODOS OS EMBARGOS DE UM MUNICÍPIO EM NDJSON OU CSV (STREAMING, SEM PAGINAÇÃO) ###
+@router.get("/municipio/{nome_municipio}/exportar", dependencies=[Depends(consultas_exportacao)])
+async def exportar_embargos_por_municipio(
+    request: Request,
+    nome_municipio: str = Path(..., title="Nome do município a ser exportado (com ou sem acentos)"),
+    uf: Optional[str] = Query(None, min_length=2, max_length=2, description="UF para desambiguar municípios homônimos"),
+    formato: str = Query("ndjson", pattern="^(ndjson|csv)$", description="'ndjson' (um JSON por linha) ou 'csv'"),
+    colunas: str = Depends(campos_embargo)
+):
+    try:
+        filtros, sugestoes = await filtros_por_municipio(nome_municipio, uf)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
+
+    if not filtros:
+        raise HTTPException(
+            status_code=404,
+            detail={"mensagem": f"Município não encontrado: {nome_municipio}", "sugestoes": sugestoes}
+        )
+
+    return exportar(request, 'termos_embargo', filtros, colunas, formato, "embargos_municipio")
+
+
+### EXPORTA TODOS OS EMBARGOS DE UMA UF EM NDJSON OU CSV (STREAMING, SEM PAGINAÇÃO) ###
+@router.get("/uf/{uf}/exportar", dependencies=[Depends(consultas_exportacao)])
+async def exportar_embargos_por_uf(
+    request: Request,
+    uf: str = Path(..., min_length=2, max_length=2, title="UF a ser exportada (ex.: 'PA')"),
+    formato: str = Query("ndjson", pattern="^(ndjson|csv)$", description="'ndjson' (um JSON por linha) ou 'csv'"),
+    colunas: str = Depends(campos_embargo)
+):
+    return exportar(request, 'termos_embargo', [eq('uf', uf.upper())], colunas, formato, f"embargos_{uf.upper()}")
+
+
+# Busca os registros dos embargos encontrados pelo índice espacial (os primeiros 'limite' pelo 'id')
+async def _resposta_espacial(ids: List[int], limite: int, colunas: str) -> dict:
+    itens = []
+    if ids:
+        resultado = await obter_repositorio().selecionar(
+            'termos_embargo', colunas=colunas, filtros=[in_('id', ids[:limite])], ordem='id.asc'
+        )
+        itens = resultado.dados
+    return {"total": len(ids), "itens": itens}
+
 
+def _exigir_indice_espacial() -> None:
+    if not busca_espacial.disponivel:
+        raise HTTPException(status_code=503, detail="Consultas espaciais indisponíveis: o pacote 'shapely' não está instalado.")
 
+
+### VERIFICA SE UMA COORDENADA ESTÁ DENTRO DE ALGUMA ÁREA EMBARGADA ###
+@router.get("/ponto", response_model=RespostaEmbargosEspacialSchema, response_model_exclude_unset=True, dependencies=[Depends(validar_embargos), Depends(consultas_pontuais)])
+async def consultar_embargo_por_ponto(
+    latitude: float = Query(..., ge=-90, le=90, description="Latitude em graus decimais (WGS84)"),
+    longitude: float = Query(..., ge=-180, le=180, description="Longitude em graus decimais (WGS84)"),
+    limite: int = Query(settings.PAGINA_TAMANHO_PADRAO, ge=1, le=settings.PAGINA_TAMANHO_MAXIMO, description="Máximo de embargos retornados"),
+    colunas: str = Depends(campos_embargo)
+):
+    _exigir_indice_espacial()
+    try:
+        ids = await busca_espacial.embargos_no_ponto(longitude, latitude)
+        return await _resposta_espacial(ids, limite, colunas)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
+
+
+### LISTA AS ÁREAS EMBARGADAS QUE INTERSECTAM UM RETÂNGULO (BOUNDING BOX) ###
+@router.get("/area", response_model=RespostaEmbargosEspacialSchema, response_model_exclude_unset=True, dependencies=[Depends(validar_embargos), Depends(consultas_pontuais)])
+async def consultar_embargo_por_area(
+    min_longitude: float = Query(..., ge=-180, le=180),
+    min_latitude: float = Query(..., ge=-90, le=90),
+    max_longitude: float = Query(..., ge=-180, le=180),
+    max_latitude: float = Query(..., ge=-90, le=90),
+    limite: int = Query(settings.PAGINA_TAMANHO_PADRAO, ge=1, le=settings.PAGINA_TAMANHO_MAXIMO, description="Máximo de embargos retornados"),
+    colunas: str = Depends(campos_embargo)
+):
+    if min_longitude > max_longitude or min_latitude > max_latitude:
+        raise HTTPException(status_code=400, detail="Os valores mínimos da área devem ser menores que os máximos.")
+    _exigir_indice_espacial()
+    try:
+        ids = await busca_espacial.embargos_na_area(min_longitude, min_latitude, max_longitude, max_latitude)
+        return await _resposta_espacial(ids, limite, colunas)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
@@ -0,0 +1,78 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Path, Query, HTTPException
+from config import settings
+from schemas.sch_base_consultas import EstatisticasSchema, RankingSchema
+from servicos.estatisticas import CONJUNTOS, estatisticas
+from servicos.municipios import municipios
+from servicos.validadores_http import ValidadorVersao
+
+router = APIRouter(
+    prefix="/api/estatisticas",
+    tags=["Estatísticas de Autuações e Embargos"]
+)
+
+# ETag e Cache-Control pela versão dos datasets consultados (304 se o cliente já tem a resposta)
+validar_estatisticas = ValidadorVersao("autuacoes_ibama", "termos_embargo")
+
+_PADRAO_CONJUNTO = "^(autuacoes|embargos)$"
+
+
+def _estatisticas_indisponiveis() -> HTTPException:
+    return HTTPException(status_code=503, detail="As estatísticas ainda não foram calculadas pelo ETL.")
+
+
+### TOTAIS PRÉ-CALCULADOS (QUANTIDADE, SOMA, MÉDIA E MÁXIMO) POR UF, MUNICÍPIO, ANO E MÊS ###
+@router.get("/{conjunto}", response_model=EstatisticasSchema, dependencies=[Depends(validar_estatisticas)])
+async def consultar_estatisticas(
+    conjunto: str = Path(..., pattern=_PADRAO_CONJUNTO, title="'autuacoes' ou 'embargos'"),
+    uf: Optional[str] = Query(None, min_length=2, max_length=2, description="UF (ex.: 'PA')"),
+    municipio: Optional[str] = Query(None, description="Nome do município (com ou sem acentos, ex.: 'Belém')"),
+    ano: Optional[int] = Query(None, ge=1900, le=2100),
+    mes: Optional[int] = Query(None, ge=1, le=12, description="Mês (exige o ano)")
+):
+    if mes is not None and ano is None:
+        raise HTTPException(status_code=400, detail="O filtro 'mes' exige o filtro 'ano'.")
+    uf = uf.upper() if uf else None
+
+    try:
+        chaves = None
+        if municipio:
+            await municipios.garantir_carregado()
+            if not municipios.disponivel:
+                raise _estatisticas_indisponiveis()
+            resolucao = municipios.resolver(municipio, uf)
+            if not resolucao.chaves:
+                raise HTTPException(
+                    status_code=404,
+                    detail={"mensagem": f"Município não encontrado: {municipio}", "sugestoes": resolucao.sugestoes}
+                )
+            chaves = resolucao.chaves
+        versao, agregado = await estatisticas.consultar(CONJUNTOS[conjunto], uf, chaves, ano, mes)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
+
+    if versao is None:
+        raise _estatisticas_indisponiveis()
+    return {"conjunto": conjunto, "uf": uf, "municipios": chaves, "ano": ano, "mes": mes, "versao": versao, **agregado}
+
+
+### MAIORES AUTUADOS (PELO VALOR DAS MULTAS) OU EMBARGADOS (PELA QUANTIDADE) ###
+@router.get("/{conjunto}/ranking", response_model=RankingSchema, dependencies=[Depends(validar_estatisticas)])
+async def consultar_ranking(
+    conjunto: str = Path(..., pattern=_PADRAO_CONJUNTO, title="'autuacoes' ou 'embargos'"),
+    uf: Optional[str] = Query(None, min_length=2, max_length=2, description="UF (ex.: 'PA')"),
+    ano: Optional[int] = Query(None, ge=1900, le=2100),
+    limite: int = Query(10, ge=1, le=settings.ESTATISTICAS_TAMANHO_RANKING)
+):
+    uf = uf.upper() if uf else None
+    try:
+        versao, itens = await estatisticas.ranking(CONJUNTOS[conjunto], uf, ano, limite)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
+
+    if versao is None:
+        raise _estatisticas_indisponiveis()
+    criterio = "valor_total" if conjunto == "autuacoes" else "quantidade"
+    return {"conjunto": conjunto, "uf": uf, "ano": ano, "criterio": criterio, "itens": itens, "versao": versao}
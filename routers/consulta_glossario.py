@@ -1,28 +1,50 @@
-from fastapi import APIRouter, Path, HTTPException
+from typing import List
+from fastapi import APIRouter, Depends, Path, Query, HTTPException
 from schemas.sch_base_consultas import GlossarioSchema # Importa do nosso arquivo de schemas
-from supabase_client import supabase
+from servicos.glossario import glossario
+from servicos.validadores_http import ValidadorVersao
 
 router = APIRouter(
     prefix="/api/glossario",
     tags=["Glossário de Termos"]
 )
 
+# ETag e Cache-Control pela versão dos datasets consultados (304 se o cliente já tem a resposta)
+validar_glossario = ValidadorVersao("termos_glossario")
+
+
+### AUTOCOMPLETAR TERMOS DO GLOSSARIO PELO PREFIXO ###
+# Declarado antes de '/{termo_busca}' para não ser capturado como um termo
+@router.get("/sugestoes", response_model=List[str], dependencies=[Depends(validar_glossario)])
+async def sugerir_termos_glossario(
+    prefix: str = Query(..., min_length=1, description="Início do termo ou sigla"),
+    limite: int = Query(10, ge=1, le=50, description="Número máximo de sugestões")
+):
+    try:
+        return await glossario.autocompletar(prefix, limite)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
+
 
 ### CONSULTA TERMO GLOSSARIO###
-@router.get("/{termo_busca}", response_model=GlossarioSchema)
-def buscar_termo_glossario(
+@router.get("/{termo_busca}", response_model=GlossarioSchema, dependencies=[Depends(validar_glossario)])
+async def buscar_termo_glossario(
     termo_busca: str = Path(..., description="Termo ou sigla a ser buscado no glossário")
 ):
     try:
-        response = supabase.table('termos_glossario').select("*").ilike('termo', termo_busca).limit(1).single().execute()
-        dado = response.data
+        # Busca no glossário em memória (sem acentos/maiúsculas e tolerante a erros de digitação)
+        dado = await glossario.buscar(termo_busca)
+        sugestoes = [] if dado else await glossario.sugestoes(termo_busca)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
 
     if not dado:
         raise HTTPException(
             status_code=404,
-            detail=f"O termo '{termo_busca}' não foi encontrado no glossário."
+            detail={
+                "mensagem": f"O termo '{termo_busca}' não foi encontrado no glossário.",
+                "sugestoes": sugestoes
+            }
         )
 
     return dado
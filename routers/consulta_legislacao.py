@@ -1,31 +1,57 @@
-from typing import List
-from fastapi import APIRouter, Query, HTTPException
-from schemas.sch_base_consultas import LegislacaoSchema
-from supabase_client import supabase
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, HTTPException
+from schemas.sch_base_consultas import LegislacaoBuscaSchema, LegislacaoSemanticaSchema
+from servicos.busca_legislacao import busca_legislacao
+from servicos.busca_semantica import CodificadorIndisponivel, busca_semantica
+from servicos.validadores_http import ValidadorVersao
 
 router = APIRouter(
     prefix="/api/legislacao",
     tags=["Legislação Ambiental"]
 )
 
-### BUSCAR OS TERMOS DE LEGISLAÇÃO ###
-@router.get("/buscar", response_model=List[LegislacaoSchema])
-def buscar_legislacao(
-    termo: str = Query(..., min_length=3, description="Termo a ser buscado no título ou resumo da legislação")
+# ETag e Cache-Control pela versão dos datasets consultados (304 se o cliente já tem a resposta)
+validar_legislacao = ValidadorVersao("legislacao_ambiental")
+
+### BUSCAR OS TERMOS DE LEGISLAÇÃO, ORDENADOS POR RELEVÂNCIA (BM25) ###
+@router.get("/buscar", response_model=List[LegislacaoBuscaSchema], dependencies=[Depends(validar_legislacao)])
+async def buscar_legislacao(
+    termo: str = Query(..., min_length=3, description="Termo a ser buscado no título, resumo ou palavras-chave da legislação"),
+    limite: int = Query(10, ge=1, le=50, description="Número máximo de normas retornadas")
 ):
     try:
-        # Busca o termo no título OU no resumo
-        response = supabase.table('legislacao_ambiental').select("*").or_(
-            f"titulo.ilike.%{termo}%,resumo.ilike.%{termo}%"
-        ).execute()
-        dados = response.data
+        # Busca no índice invertido em memória, atualizado quando o ETL publica nova versão da tabela
+        resultados = await busca_legislacao.buscar(termo, limite)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
 
-    if not dados:
+    if not resultados:
         raise HTTPException(
             status_code=404,
             detail=f"Nenhuma legislação encontrada para o termo: '{termo}'"
         )
 
-    return dados
+    return [{**norma, "score": score} for norma, score in resultados]
+
+
+### BUSCA SEMÂNTICA NA LEGISLAÇÃO (SIMILARIDADE ENTRE EMBEDDINGS) ###
+@router.get("/semantica", response_model=List[LegislacaoSemanticaSchema], dependencies=[Depends(validar_legislacao)])
+async def buscar_legislacao_semantica(
+    consulta: str = Query(..., min_length=3, description="Pergunta ou descrição em linguagem natural"),
+    limite: int = Query(10, ge=1, le=50, description="Número máximo de normas retornadas"),
+    tipo_norma: Optional[str] = Query(None, description="Filtra pelo tipo da norma (ex.: 'Lei', 'Resolução')")
+):
+    try:
+        resultados = await busca_semantica.buscar(consulta, limite, tipo_norma)
+    except CodificadorIndisponivel as e:
+        raise HTTPException(status_code=503, detail=f"Busca semântica indisponível: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
+
+    if not resultados:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Nenhuma legislação encontrada para a consulta: '{consulta}'"
+        )
+
+    return [{**norma, "similaridade": similaridade} for norma, similaridade in resultados]
@@ -1,28 +1,49 @@
-from typing import List
-from fastapi import APIRouter, Path, HTTPException
-from schemas.sch_base_consultas import AutuacaoSchema
-from supabase_client import supabase
+from typing import Optional
+from fastapi import APIRouter, Depends, Path, Query, HTTPException
+from config import settings
+from schemas.sch_base_consultas import AutuacaoSchema, PaginaAutuacoesSchema
+from servicos.admissao import consultas_varredura
+from servicos.consultas import buscar_pagina, filtros_por_municipio
+from servicos.projecao import CamposConsulta
+from servicos.validadores_http import ValidadorVersao
 
 router = APIRouter(
     prefix="/api/autuacoes/municipio",
     tags=["Consultas de Autuações por Município"]
 )
 
-### BUSCA TODAS AS AUTUÇÕES REGISTRADA EM UM DETERMINADO MUNICIPIO ###
-@router.get("/{nome_municipio}", response_model=List[AutuacaoSchema] )
-def consultar_por_municipio(
-    nome_municipio: str = Path(..., title="Nome do município a ser consultado")
+# ETag e Cache-Control pela versão dos datasets consultados (304 se o cliente já tem a resposta)
+validar_autuacoes_municipio = ValidadorVersao("autuacoes_ibama", "termos_embargo")
+
+campos_autuacao = CamposConsulta(AutuacaoSchema)
+
+### BUSCA AS AUTUÇÕES REGISTRADA EM UM DETERMINADO MUNICIPIO, PAGINADAS PELO 'id' ###
+@router.get("/{nome_municipio}", response_model=PaginaAutuacoesSchema, response_model_exclude_unset=True, dependencies=[Depends(validar_autuacoes_municipio), Depends(consultas_varredura)])
+async def consultar_por_municipio(
+    nome_municipio: str = Path(..., title="Nome do município a ser consultado (com ou sem acentos, ex.: 'Belem' ou 'Belém - PA')"),
+    uf: Optional[str] = Query(None, min_length=2, max_length=2, description="UF para desambiguar municípios homônimos"),
+    limite: int = Query(settings.PAGINA_TAMANHO_PADRAO, ge=1, le=settings.PAGINA_TAMANHO_MAXIMO, description="Tamanho da página"),
+    cursor: Optional[int] = Query(None, ge=0, description="Valor de 'next_cursor' retornado pela página anterior"),
+    contar: bool = Query(False, description="Se verdadeiro, retorna também o total de registros encontrados"),
+    colunas: str = Depends(campos_autuacao)
 ):
     try:
-        response = supabase.table('autuacoes_ibama').select("*").ilike('municipio', f'%{nome_municipio}%').execute()
-        dados = response.data
+        filtros, sugestoes = await filtros_por_municipio(nome_municipio, uf)
+        pagina = await buscar_pagina('autuacoes_ibama', filtros, limite, cursor, contar, colunas) if filtros else None
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
 
-    if not dados:
+    # O nome não corresponde a nenhum município conhecido (ou é ambíguo): devolve sugestões
+    if pagina is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"mensagem": f"Nenhuma autuação encontrada para o município: {nome_municipio}", "sugestoes": sugestoes}
+        )
+
+    if not pagina.itens and cursor is None:
         raise HTTPException(
             status_code=404,
             detail=f"Nenhuma autuação encontrada para o município: {nome_municipio}"
         )
 
-    return dados
\ No newline at end of file
+    return pagina
@@ -1,22 +1,33 @@
 from typing import List
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException
 from schemas.sch_base_consultas import AutuacaoSchema
-from supabase_client import supabase
+from servicos.admissao import consultas_varredura
+from servicos.projecao import CamposConsulta
+from servicos.repositorio import obter_repositorio
+from servicos.validadores_http import ValidadorVersao
 
 router = APIRouter(
     prefix="/api/autuacoes/recentes",
     tags=["Consultas de Autuações Recentes"]
 )
 
+# ETag e Cache-Control pela versão dos datasets consultados (304 se o cliente já tem a resposta)
+validar_autuacoes = ValidadorVersao("autuacoes_ibama")
+
+campos_autuacao = CamposConsulta(AutuacaoSchema)
+
 ### CONSULTA AUTUAÇÕES MAIS RECENTER, ORDENADAS PELA DATA DE CRIAÇÃO ###
-@router.get("/", response_model=List[AutuacaoSchema])
-def consultar_recentes(
-    limite: int = Query(5, title="Número de resultados a retornar", ge=1, le=50)
+@router.get("/", response_model=List[AutuacaoSchema], response_model_exclude_unset=True, dependencies=[Depends(validar_autuacoes), Depends(consultas_varredura)])
+async def consultar_recentes(
+    limite: int = Query(5, title="Número de resultados a retornar", ge=1, le=50),
+    colunas: str = Depends(campos_autuacao)
 ):
     try:
-        response = supabase.table('autuacoes_ibama').select("*").order('created_at', desc=True).limit(limite).execute()
-        dados = response.data
+        resultado = await obter_repositorio().selecionar(
+            'autuacoes_ibama', colunas=colunas, ordem='created_at.desc', limite=limite
+        )
+        dados = resultado.dados
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
 
-    return dados
\ No newline at end of file
+    return dados
@@ -0,0 +1,70 @@
+import time
+from fastapi import APIRouter, Depends, HTTPException
+from config import settings
+from schemas.sch_base_consultas import RespostaTriagemSchema, TriagemRequisicaoSchema
+from servicos.admissao import consultas_varredura
+from servicos.consultas import triagem_documentos
+from servicos.normalizacao import documento_valido, limpar_documento
+from servicos.projecao import COLUNAS_AUTUACOES, COLUNAS_CTF, COLUNAS_EMBARGOS
+
+router = APIRouter(
+    prefix="/api/triagem",
+    tags=["Triagem em Lote"]
+)
+
+# No modo apenas_resumo só as colunas usadas nas contagens são buscadas (autuações, embargos, CTF)
+COLUNAS_RESUMO = ("cpf_cnpj,valor_multa", "cpf_cnpj", "cnpj,situacao_cadastro")
+
+
+### CONSULTA AUTUAÇÕES, EMBARGOS E CTF DE UMA LISTA DE DOCUMENTOS EM UMA ÚNICA REQUISIÇÃO ###
+# Sem os registros (apenas_resumo), as chaves 'autuacoes', 'embargos' e 'ctf' não aparecem na resposta
+@router.post("", response_model=RespostaTriagemSchema, response_model_exclude_unset=True,
+             dependencies=[Depends(consultas_varredura)])
+async def triagem_em_lote(requisicao: TriagemRequisicaoSchema):
+    # Normaliza e remove duplicatas mantendo a ordem de envio
+    documentos, invalidos = [], []
+    for original in requisicao.documentos:
+        documento = limpar_documento(original)
+        if documento_valido(documento, settings.VALIDAR_DIGITOS_DOCUMENTO):
+            documentos.append(documento)
+        else:
+            invalidos.append(original)
+    documentos = list(dict.fromkeys(documentos))
+
+    if len(documentos) > settings.TRIAGEM_MAXIMO_DOCUMENTOS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"No máximo {settings.TRIAGEM_MAXIMO_DOCUMENTOS} documentos distintos por requisição."
+        )
+
+    inicio = time.perf_counter()
+    try:
+        if requisicao.apenas_resumo:
+            encontrados = await triagem_documentos(documentos, *COLUNAS_RESUMO)
+        else:
+            encontrados = await triagem_documentos(documentos, COLUNAS_AUTUACOES, COLUNAS_EMBARGOS, COLUNAS_CTF)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar o banco de dados: {e}")
+
+    resultados = {}
+    for documento, fontes in encontrados.items():
+        ctf = fontes["ctf"]
+        resultado = {
+            "tipo_documento": "CNPJ" if len(documento) == 14 else "CPF",
+            "resumo": {
+                "total_autuacoes": len(fontes["autuacoes"]),
+                "valor_total_multas": round(sum(a.get("valor_multa") or 0 for a in fontes["autuacoes"]), 2),
+                "total_embargos": len(fontes["embargos"]),
+                "situacao_ctf": ctf.get("situacao_cadastro") if ctf else None,
+            },
+        }
+        if not requisicao.apenas_resumo:
+            resultado.update(autuacoes=fontes["autuacoes"], embargos=fontes["embargos"], ctf=ctf)
+        resultados[documento] = resultado
+
+    return {
+        "total_documentos": len(documentos),
+        "documentos_invalidos": invalidos,
+        "resultados": resultados,
+        "tempo_total_ms": round((time.perf_counter() - inicio) * 1000, 2),
+    }
@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+from config import settings
 
 ## SCHEMA PARA AUTUAÇÕES ##
 class AutuacaoSchema(BaseModel):
@@ -14,6 +16,11 @@ class RespostaConsultaSchema(BaseModel):
     documento: str
     autuacoes: List[AutuacaoSchema]
 
+class PaginaAutuacoesSchema(BaseModel):
+    itens: List[AutuacaoSchema]
+    next_cursor: Optional[int] = None  # 'id' a ser enviado em ?cursor= para obter a próxima página
+    total: Optional[int] = None  # preenchido apenas quando solicitado com ?contar=true
+
 
 ## SCHEMA PARA LEGISLAÇÃO ##
 class LegislacaoSchema(BaseModel):
@@ -24,6 +31,12 @@ class LegislacaoSchema(BaseModel):
     link_oficial: Optional[str] = None
     palavras_chave: Optional[List[str]] = None
 
+class LegislacaoBuscaSchema(LegislacaoSchema):
+    score: float  # relevância BM25 da norma para o termo buscado
+
+class LegislacaoSemanticaSchema(LegislacaoSchema):
+    similaridade: float  # similaridade de cosseno entre a consulta e a norma
+
 
 ## SCHEMA PARA GLOSSARIO ##
 class GlossarioSchema(BaseModel):
@@ -49,6 +62,11 @@ class RespostaEmbargoSchema(BaseModel):
     documento: str
     embargos: List[TermoEmbargoSchema]
 
+class PaginaEmbargosSchema(BaseModel):
+    itens: List[TermoEmbargoSchema]
+    next_cursor: Optional[int] = None
+    total: Optional[int] = None
+
 
 ## SCHEMA PARA CADASTRO TÉCNICO FEDERAL (CTF) ##
 class CadastroTecnicoFederalSchema(BaseModel):
@@ -62,4 +80,105 @@ class CadastroTecnicoFederalSchema(BaseModel):
 
 class RespostaCTFSchema(BaseModel):
     cnpj: str
-    cadastro: CadastroTecnicoFederalSchema
\ No newline at end of file
+    cadastro: CadastroTecnicoFederalSchema
+
+
+class PaginaCTFSchema(BaseModel):
+    itens: List[CadastroTecnicoFederalSchema]
+    next_cursor: Optional[int] = None
+    total: Optional[int] = None
+
+## SCHEMAS PARA O DOSSIÊ (AUTUAÇÕES + EMBARGOS + CTF EM UMA ÚNICA RESPOSTA) ##
+class FonteDossieSchema(BaseModel):
+    status: str  # "ok", "nao_encontrado", "nao_aplicavel" ou "erro"
+    tempo_ms: float
+    erro: Optional[str] = None
+
+
+class FonteAutuacoesSchema(FonteDossieSchema):
+    dados: Optional[List[AutuacaoSchema]] = None
+
+
+class FonteEmbargosSchema(FonteDossieSchema):
+    dados: Optional[List[TermoEmbargoSchema]] = None
+
+
+class FonteCTFSchema(FonteDossieSchema):
+    dados: Optional[CadastroTecnicoFederalSchema] = None
+
+
+class RespostaDossieSchema(BaseModel):
+    documento: str
+    tipo_documento: str
+    autuacoes: FonteAutuacoesSchema
+    embargos: FonteEmbargosSchema
+    ctf: FonteCTFSchema
+    tempo_total_ms: float
+
+
+## SCHEMAS PARA A TRIAGEM EM LOTE DE DOCUMENTOS ##
+class TriagemRequisicaoSchema(BaseModel):
+    # CPFs/CNPJs, com ou sem pontuação. O limite da lista bruta (com repetidos e inválidos) barra corpos
+    # enormes na validação, antes da normalização; o limite de documentos distintos é checado na rota
+    documentos: List[str] = Field(..., min_length=1, max_length=2 * settings.TRIAGEM_MAXIMO_DOCUMENTOS)
+    apenas_resumo: bool = False  # True: devolve só as contagens, sem os registros
+
+
+class ResumoTriagemSchema(BaseModel):
+    total_autuacoes: int
+    valor_total_multas: float
+    total_embargos: int
+    situacao_ctf: Optional[str] = None  # None para CPF ou CNPJ fora do CTF
+
+
+class ResultadoTriagemSchema(BaseModel):
+    tipo_documento: str
+    resumo: ResumoTriagemSchema
+    autuacoes: Optional[List[AutuacaoSchema]] = None
+    embargos: Optional[List[TermoEmbargoSchema]] = None
+    ctf: Optional[CadastroTecnicoFederalSchema] = None
+
+
+class RespostaTriagemSchema(BaseModel):
+    total_documentos: int  # documentos válidos e distintos consultados
+    documentos_invalidos: List[str]
+    resultados: Dict[str, ResultadoTriagemSchema]
+    tempo_total_ms: float
+
+
+## SCHEMA PARA AS CONSULTAS ESPACIAIS DE EMBARGOS ##
+class RespostaEmbargosEspacialSchema(BaseModel):
+    total: int  # quantidade de áreas embargadas que atendem à consulta
+    itens: List[TermoEmbargoSchema]  # os primeiros 'limite' embargos, ordenados pelo 'id'
+
+
+## SCHEMAS PARA AS ESTATÍSTICAS AGREGADAS ##
+class EstatisticasSchema(BaseModel):
+    conjunto: str  # "autuacoes" ou "embargos"
+    uf: Optional[str] = None
+    municipios: Optional[List[str]] = None  # chaves dos municípios somados (homônimos em várias UFs)
+    ano: Optional[int] = None
+    mes: Optional[int] = None
+    quantidade: int
+    quantidade_com_valor: int  # registros com valor de multa preenchido (base da média)
+    valor_total: Optional[float] = None  # None nos embargos, que não têm valor
+    valor_medio: Optional[float] = None
+    valor_maximo: Optional[float] = None
+    versao: Optional[int] = None  # versão do dataset a que os números se referem
+
+
+class ItemRankingSchema(BaseModel):
+    posicao: int
+    cpf_cnpj: str
+    nome: Optional[str] = None
+    quantidade: int
+    valor_total: Optional[float] = None
+
+
+class RankingSchema(BaseModel):
+    conjunto: str
+    uf: Optional[str] = None
+    ano: Optional[int] = None
+    criterio: str  # "valor_total" (autuações) ou "quantidade" (embargos)
+    itens: List[ItemRankingSchema]
+    versao: Optional[int] = None
@@ -0,0 +1,246 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+if __name__ == "__main__":
+    # Adiciona o caminho do projeto para permitir a execução direta do script
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config import settings
+
+# Status HTTP / SQLSTATE (comparados por igualdade) e mensagens que indicam lote grande demais:
+# o lote é dividido em vez de repetido igual
+_CODIGOS_LOTE_GRANDE = ("413", "57014")
+_MENSAGENS_LOTE_GRANDE = ("payload too large", "request entity too large", "statement timeout")
+# Erros de dados (classes 22 e 23: tipo inválido, constraint...) ficam em registros específicos:
+# dividir o lote isola esses registros e deixa o resto passar
+_CLASSES_ERRO_DADOS = ("22", "23")
+# Erros de esquema/permissão (classe 42, PGRST1xx/2xx) valem para qualquer lote da tabela:
+# dividir só multiplicaria as requisições, então a carga é interrompida
+_CLASSES_ERRO_ESQUEMA = ("42",)
+_CODIGOS_POSTGREST_ESQUEMA = ("pgrst1", "pgrst2")
+
+
+class CargaInterrompida(Exception):
+    """Um erro que nenhum lote da tabela vai superar (ex.: coluna inexistente) interrompeu a carga."""
+
+
+def _codigos(erro: Exception) -> Tuple[str, Optional[str]]:
+    # (SQLSTATE/código PostgREST, status HTTP); sem JSON de erro o PostgREST informa o status em 'code'
+    codigo = str(getattr(erro, "code", "") or "").lower()
+    status = getattr(getattr(erro, "response", None), "status_code", None)
+    if codigo.isdigit() and len(codigo) == 3:
+        return "", codigo
+    return codigo, str(status) if status is not None else None
+
+
+def _classificar_erro(erro: Exception) -> str:
+    codigo, status = _codigos(erro)
+    mensagem = str(erro).lower()
+    if (codigo in _CODIGOS_LOTE_GRANDE or status in _CODIGOS_LOTE_GRANDE
+            or any(m in mensagem for m in _MENSAGENS_LOTE_GRANDE)
+            or type(erro).__name__ in ("ReadTimeout", "WriteTimeout")):
+        return "grande"
+    # Só SQLSTATEs (5 caracteres) são comparados por classe, para um status como 422 não virar '42'
+    sqlstate = codigo if len(codigo) == 5 else ""
+    if sqlstate.startswith(_CLASSES_ERRO_DADOS):
+        return "dados"
+    if sqlstate.startswith(_CLASSES_ERRO_ESQUEMA) or codigo.startswith(_CODIGOS_POSTGREST_ESQUEMA):
+        return "esquema"
+    return "transitorio"
+
+
+@dataclass
+class RelatorioCarga:
+    tabela: str
+    registros_enviados: int
+    registros_falhos: int
+    lotes_enviados: int
+    tentativas_extras: int
+    segundos: float
+    arquivo_dead_letter: Optional[str]
+    interrompida_por: Optional[str] = None  # erro de esquema/permissão que interrompeu a carga
+
+    @property
+    def registros_por_segundo(self) -> float:
+        return self.registros_enviados / self.segundos if self.segundos else 0.0
+
+    def imprimir(self) -> None:
+        print(f"   - {self.registros_enviados} registros carregados em {self.segundos:.1f}s "
+              f"({self.registros_por_segundo:.0f} registros/s, {self.lotes_enviados} lotes, "
+              f"{self.tentativas_extras} novas tentativas).")
+        if self.registros_falhos:
+            print(f"   - ATENÇÃO: {self.registros_falhos} registros falharam definitivamente "
+                  f"e foram gravados em '{self.arquivo_dead_letter}'.")
+        if self.interrompida_por:
+            print(f"   - ATENÇÃO: carga interrompida por um erro de esquema/permissão: {self.interrompida_por}")
+
+
+## CARREGADOR PARALELO EM LOTES, COM NOVAS TENTATIVAS E TAMANHO DE LOTE ADAPTATIVO ##
+class CarregadorLotes:
+    """Envia registros ao Supabase em lotes concorrentes.
+
+    O tamanho do lote cresce enquanto a latência fica abaixo do alvo e encolhe quando passa dele;
+    lotes rejeitados por tamanho ou por erro de dados são divididos ao meio. Um erro de esquema ou
+    permissão interrompe a carga. O que falhar de vez vai para um arquivo JSONL (dead letter) que
+    pode ser reprocessado com `reprocessar_dead_letter`.
+    """
+
+    def __init__(self, supabase, nome_tabela: str, workers: int = None, lote_inicial: int = None,
+                 on_conflict: Optional[str] = None):
+        self.supabase = supabase
+        self.nome_tabela = nome_tabela
+        # Com on_conflict os lotes viram upsert pela coluna indicada (cargas incrementais)
+        self.on_conflict = on_conflict
+        self.workers = workers or settings.ETL_WORKERS
+        self.tamanho_lote = lote_inicial or settings.ETL_LOTE_INICIAL
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"carga-{nome_tabela}")
+        # Limita os lotes pendentes para a fila não acumular o dataset inteiro em memória
+        self._vagas = threading.BoundedSemaphore(self.workers * 2)
+        self._lock = threading.Lock()
+        self._futuros = []
+        self._inicio = time.monotonic()
+        self._enviados = 0
+        self._falhos = 0
+        self._lotes = 0
+        self._tentativas_extras = 0
+        self._arquivo_dead_letter: Optional[Path] = None
+        self._interrompida_por: Optional[Exception] = None
+
+    ## ENFILEIRA OS REGISTROS, FATIADOS NO TAMANHO DE LOTE ATUAL
+    def enviar(self, registros: List[dict]) -> None:
+        if self._interrompida_por is not None:
+            raise CargaInterrompida(str(self._interrompida_por)) from self._interrompida_por
+        inicio = 0
+        while inicio < len(registros):
+            tamanho = self.tamanho_lote
+            lote = registros[inicio:inicio + tamanho]
+            inicio += tamanho
+            self._vagas.acquire()
+            futuro = self._executor.submit(self._processar_lote, lote)
+            futuro.add_done_callback(lambda _: self._vagas.release())
+            self._futuros.append(futuro)
+        # Descarta os lotes já concluídos (propagando qualquer erro inesperado)
+        for futuro in [f for f in self._futuros if f.done()]:
+            futuro.result()
+        self._futuros = [f for f in self._futuros if not f.done()]
+
+    def _executar(self, lote: List[dict]) -> None:
+        if self.on_conflict:
+            self.supabase.table(self.nome_tabela).upsert(lote, on_conflict=self.on_conflict).execute()
+        else:
+            self.supabase.table(self.nome_tabela).insert(lote).execute()
+
+    def _ajustar_tamanho(self, latencia: float) -> None:
+        with self._lock:
+            if latencia < settings.ETL_LATENCIA_ALVO / 2:
+                self.tamanho_lote = min(settings.ETL_LOTE_MAXIMO, int(self.tamanho_lote * 1.5) + 1)
+            elif latencia > settings.ETL_LATENCIA_ALVO:
+                self.tamanho_lote = max(settings.ETL_LOTE_MINIMO, self.tamanho_lote // 2)
+
+    def _processar_lote(self, lote: List[dict]) -> None:
+        if self._interrompida_por is not None:
+            # Lotes já enfileirados quando a carga foi interrompida vão direto para o dead letter
+            self._registrar_falha(lote, self._interrompida_por, silencioso=True)
+            return
+        for tentativa in range(settings.ETL_TENTATIVAS):
+            inicio = time.monotonic()
+            try:
+                self._executar(lote)
+            except Exception as e:
+                tipo = _classificar_erro(e)
+                if tipo in ("grande", "dados") and len(lote) > 1:
+                    if tipo == "grande":
+                        # Lote grande demais: também reduz o tamanho dos próximos
+                        with self._lock:
+                            self.tamanho_lote = max(settings.ETL_LOTE_MINIMO, min(self.tamanho_lote, len(lote)) // 2)
+                    # Divide o lote ao meio; num erro de dados isso isola os registros problemáticos
+                    meio = len(lote) // 2
+                    self._processar_lote(lote[:meio])
+                    self._processar_lote(lote[meio:])
+                    return
+                if tipo == "esquema":
+                    # O lote inteiro vai uma única vez para o dead letter e nenhum outro é enviado
+                    with self._lock:
+                        if self._interrompida_por is None:
+                            self._interrompida_por = e
+                    self._registrar_falha(lote, e)
+                    return
+                if tipo == "dados" or tentativa == settings.ETL_TENTATIVAS - 1:
+                    self._registrar_falha(lote, e)
+                    return
+                with self._lock:
+                    self._tentativas_extras += 1
+                # Espera exponencial com variação aleatória para não sincronizar as threads
+                time.sleep(settings.ETL_ESPERA_BASE * (2 ** tentativa) * (0.5 + random.random()))
+                continue
+
+            self._ajustar_tamanho(time.monotonic() - inicio)
+            with self._lock:
+                self._enviados += len(lote)
+                self._lotes += 1
+            return
+
+    def _registrar_falha(self, lote: List[dict], erro: Exception, silencioso: bool = False) -> None:
+        if not silencioso:
+            print(f"   - ERRO definitivo em um lote de {len(lote)} registros de '{self.nome_tabela}': {erro}")
+        with self._lock:
+            if self._arquivo_dead_letter is None:
+                pasta = Path(settings.ETL_DEAD_LETTER_DIR)
+                pasta.mkdir(parents=True, exist_ok=True)
+                carimbo = datetime.now().strftime("%Y%m%d_%H%M%S")
+                self._arquivo_dead_letter = pasta / f"{self.nome_tabela}_{carimbo}.jsonl"
+            with open(self._arquivo_dead_letter, "a", encoding="utf-8") as arquivo:
+                linha = {"tabela": self.nome_tabela, "on_conflict": self.on_conflict, "erro": str(erro), "registros": lote}
+                arquivo.write(json.dumps(linha, ensure_ascii=False, default=str) + "\n")
+            self._falhos += len(lote)
+
+    ## AGUARDA OS LOTES PENDENTES E DEVOLVE O RELATÓRIO DA CARGA
+    def finalizar(self) -> RelatorioCarga:
+        self._executor.shutdown(wait=True)
+        for futuro in self._futuros:
+            futuro.result()
+        return RelatorioCarga(
+            tabela=self.nome_tabela,
+            registros_enviados=self._enviados,
+            registros_falhos=self._falhos,
+            lotes_enviados=self._lotes,
+            tentativas_extras=self._tentativas_extras,
+            segundos=time.monotonic() - self._inicio,
+            arquivo_dead_letter=str(self._arquivo_dead_letter) if self._arquivo_dead_letter else None,
+            interrompida_por=str(self._interrompida_por) if self._interrompida_por else None,
+        )
+
+
+## REENVIA OS LOTES GRAVADOS EM UM ARQUIVO DEAD LETTER ##
+def reprocessar_dead_letter(supabase, caminho: str) -> List[RelatorioCarga]:
+    carregadores = {}
+    with open(caminho, encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            item = json.loads(linha)
+            tabela = item["tabela"]
+            if tabela not in carregadores:
+                carregadores[tabela] = CarregadorLotes(supabase, tabela, on_conflict=item.get("on_conflict"))
+            carregadores[tabela].enviar(item["registros"])
+
+    relatorios = [c.finalizar() for c in carregadores.values()]
+    for relatorio in relatorios:
+        relatorio.imprimir()
+    return relatorios
+
+
+if __name__ == "__main__":
+    from supabase_client import supabase
+
+    if len(sys.argv) != 2:
+        print("Uso: python scripts_etl/carregador_lotes.py <arquivo_dead_letter.jsonl>")
+        sys.exit(1)
+    reprocessar_dead_letter(supabase, sys.argv[1])
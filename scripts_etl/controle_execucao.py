@@ -0,0 +1,123 @@
+import sqlite3
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+import pandas as pd
+
+# Tabela com os metadados da última execução de cada carga (para o download condicional)
+TABELA_EXECUCOES = "execucoes_etl"
+# Chave fixa para que o hash de cada linha seja o mesmo em todas as execuções
+_CHAVE_HASH = "hash-linha-etl01"  # 16 bytes, exigido pelo pandas
+
+
+## METADADOS DAS EXECUÇÕES ##
+def obter_ultima_execucao(supabase, tabela: str) -> Optional[dict]:
+    try:
+        dados = supabase.table(TABELA_EXECUCOES).select("*").eq("tabela", tabela).limit(1).execute().data
+    except Exception as e:
+        print(f"   - Aviso: não foi possível ler a última execução de '{tabela}': {e}")
+        return None
+    return dados[0] if dados else None
+
+
+def registrar_execucao(supabase, tabela: str, url: str, download, linhas: int) -> None:
+    supabase.table(TABELA_EXECUCOES).upsert({
+        "tabela": tabela,
+        "url": url,
+        "etag": download.etag,
+        "last_modified": download.last_modified,
+        "hash_conteudo": download.hash_conteudo,
+        "linhas": linhas,
+        "executado_em": datetime.now(timezone.utc).isoformat(),
+    }, on_conflict="tabela").execute()
+
+
+## CHAVE NATURAL E HASH DE CADA LINHA ##
+def adicionar_chave_e_hash(df: pd.DataFrame, colunas_dados: Iterable[str], chave: Optional[pd.Series] = None) -> pd.DataFrame:
+    # O hash cobre apenas as colunas de dados (texto), de forma vetorizada e estável entre execuções
+    colunas = list(colunas_dados)
+    valores = df[colunas].astype(str)
+    df['hash_linha'] = pd.util.hash_pandas_object(valores, index=False, hash_key=_CHAVE_HASH).map('{:016x}'.format)
+    # Sem chave natural na fonte, o próprio hash identifica a linha (alteração = remoção + inclusão)
+    if chave is None:
+        df['chave_origem'] = df['hash_linha']
+    else:
+        chave = chave.reindex(df.index)
+        df['chave_origem'] = chave.astype(str).str.strip().where(chave.notna(), df['hash_linha'])
+    return df.drop_duplicates(subset=['chave_origem'], keep='last')
+
+
+## SINCRONIZAÇÃO INCREMENTAL (DELTA) ##
+class SincronizadorIncremental:
+    """Envia ao carregador só as linhas novas ou alteradas e remove as que sumiram da fonte.
+
+    O estado da tabela (chave_origem, hash_linha e se a chave apareceu na fonte) fica num SQLite
+    temporário em disco, indexado pela chave: a memória usada depende do tamanho da página e do
+    pedaço, não do tamanho da tabela.
+    """
+
+    def __init__(self, supabase, tabela: str, carregador, tamanho_pagina: int = 1000):
+        self.supabase = supabase
+        self.tabela = tabela
+        self.carregador = carregador
+        self.tamanho_pagina = tamanho_pagina
+        self.alteradas = 0
+        # Nome vazio: banco temporário em disco, apagado quando a conexão é fechada
+        self._estado = sqlite3.connect("")
+        self._estado.execute(
+            "CREATE TABLE existentes (chave_origem TEXT PRIMARY KEY, hash_linha TEXT, vista INTEGER NOT NULL DEFAULT 0) "
+            "WITHOUT ROWID"
+        )
+        self._estado.execute("CREATE TEMP TABLE pedaco (chave_origem TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def carregar_estado_atual(self) -> int:
+        # Lê (chave_origem, hash_linha) de toda a tabela, paginando pela própria chave
+        ultimo = None
+        total = 0
+        while True:
+            consulta = (
+                self.supabase.table(self.tabela).select("chave_origem,hash_linha")
+                .not_.is_("chave_origem", "null").order("chave_origem").limit(self.tamanho_pagina)
+            )
+            if ultimo is not None:
+                consulta = consulta.gt("chave_origem", ultimo)
+            pagina = consulta.execute().data
+            self._estado.executemany(
+                "INSERT OR REPLACE INTO existentes (chave_origem, hash_linha) VALUES (?, ?)",
+                [(linha["chave_origem"], linha["hash_linha"]) for linha in pagina],
+            )
+            total += len(pagina)
+            if len(pagina) < self.tamanho_pagina:
+                return total
+            ultimo = pagina[-1]["chave_origem"]
+
+    def processar(self, df: pd.DataFrame) -> int:
+        # Consulta os hashes só das chaves deste pedaço e marca as chaves como vistas na fonte
+        self._estado.execute("DELETE FROM pedaco")
+        self._estado.executemany("INSERT OR IGNORE INTO pedaco VALUES (?)", ((c,) for c in df['chave_origem']))
+        atuais = dict(self._estado.execute(
+            "SELECT e.chave_origem, e.hash_linha FROM pedaco AS p JOIN existentes AS e USING (chave_origem)"
+        ))
+        self._estado.execute("UPDATE existentes SET vista = 1 WHERE chave_origem IN (SELECT chave_origem FROM pedaco)")
+
+        hash_atual = df['chave_origem'].map(atuais)
+        novas_ou_alteradas = df[hash_atual != df['hash_linha']]
+        if len(novas_ou_alteradas):
+            self.carregador.enviar(novas_ou_alteradas.to_dict(orient='records'))
+        self.alteradas += len(novas_ou_alteradas)
+        return len(novas_ou_alteradas)
+
+    def remover_ausentes(self, remover_sem_chave: bool = False, tamanho_lote: int = 200) -> int:
+        # Linhas que não vieram mais na fonte e, se pedido, linhas antigas carregadas antes da chave natural existir
+        ausentes = self._estado.execute("SELECT chave_origem FROM existentes WHERE vista = 0")
+        removidos = 0
+        while lote := [chave for (chave,) in ausentes.fetchmany(tamanho_lote)]:
+            self.supabase.table(self.tabela).delete().in_("chave_origem", lote).execute()
+            removidos += len(lote)
+        if remover_sem_chave:
+            sem_chave = self.supabase.table(self.tabela).delete().is_("chave_origem", "null").execute().data
+            removidos += len(sem_chave or [])
+        return removidos
+
+    def fechar(self) -> None:
+        self._estado.close()
@@ -0,0 +1,104 @@
+from config import settings
+from scripts_etl.estatisticas import EspecificacaoEstatisticas
+from scripts_etl.pipeline import EspecificacaoDataset
+
+# Formatos de data encontrados nos arquivos do IBAMA, do mais comum para o menos comum
+FORMATOS_DATA_IBAMA = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y")
+
+
+## AUTOS DE INFRAÇÃO (arquivo .ZIP de autos distribuídos dos últimos 5 anos)
+INFRACOES = EspecificacaoDataset(
+    nome="AUTOS DE INFRAÇÃO",
+    tabela="autuacoes_ibama",
+    origem="https://dadosabertos.ibama.gov.br/dados/SIFISC/auto_infracao/auto_infracao_distribuidos/ultimos_5_anos_infra_dist_csv.zip",
+    formato="zip",
+    mapa_colunas={
+        'CPF_CNPJ_INFRATOR': 'cpf_cnpj',
+        'NOME_INFRATOR': 'nome_autuado',
+        'DAT_HORA_AUTO_INFRACAO': 'data_auto',
+        'VAL_AUTO_INFRACAO': 'valor_multa',
+        'DES_INFRACAO': 'descricao_infracao',
+        'MUNICIPIO': 'municipio',
+        'UF': 'uf',
+    },
+    colunas_documento=('cpf_cnpj',),
+    colunas_decimal=('valor_multa',),
+    formatos_data={'data_auto': FORMATOS_DATA_IBAMA},
+    colunas_reparar_encoding=('descricao_infracao',),
+    colunas_obrigatorias=('cpf_cnpj', 'data_auto'),
+    chave_origem='SEQ_AUTO_INFRACAO',
+    remover_sem_chave=True,  # Linhas de cargas anteriores à chave natural
+    chave_municipio=True,
+    estatisticas=EspecificacaoEstatisticas(coluna_data='data_auto', coluna_valor='valor_multa', coluna_nome='nome_autuado'),
+)
+
+## TERMOS DE EMBARGO
+EMBARGOS = EspecificacaoDataset(
+    nome="TERMOS DE EMBARGO",
+    tabela="termos_embargo",
+    origem="https://dadosabertos.ibama.gov.br/dados/SIFISC/termo_embargo/termo_embargo/termo_embargo_csv",
+    formato="zip",
+    mapa_colunas={
+        'CPF_CNPJ_EMBARGADO': 'cpf_cnpj',
+        'NOME_EMBARGADO': 'nome_embargado',
+        'DAT_EMBARGO': 'data_embargo',
+        'DES_TAD': 'justificativa',
+        'MUNICIPIO': 'municipio',
+        'UF': 'uf',
+    },
+    # Polígono da área embargada em WKT (nem todas as versões do arquivo trazem a coluna)
+    colunas_opcionais={'GEOM_AREA_EMBARGADA': 'wkt_geometria'},
+    coluna_geometria='wkt_geometria',
+    colunas_documento=('cpf_cnpj',),
+    formatos_data={'data_embargo': FORMATOS_DATA_IBAMA},
+    colunas_reparar_encoding=('justificativa',),
+    colunas_obrigatorias=('cpf_cnpj', 'data_embargo'),
+    chave_origem='SEQ_TAD',
+    remover_sem_chave=True,  # Linhas de cargas anteriores à chave natural
+    chave_municipio=True,
+    estatisticas=EspecificacaoEstatisticas(coluna_data='data_embargo', coluna_nome='nome_embargado'),
+)
+
+## CADASTRO TÉCNICO FEDERAL (CTF/APP) - PESSOAS JURÍDICAS
+CTF = EspecificacaoDataset(
+    nome="CADASTRO TÉCNICO FEDERAL",
+    tabela="cadastro_tecnico_federal",
+    origem="https://dadosabertos.ibama.gov.br/dados/CTF/APP/AC/pessoasJuridicas.csv",
+    encoding="utf-8",
+    mapa_colunas={
+        'CNPJ': 'cnpj',
+        'Razão Social': 'razao_social',
+        'Situação cadastral': 'situacao_cadastro',
+        'Última Atualização Relatório': 'data_situacao_cadastral',
+        'Estado': 'uf',
+    },
+    colunas_documento=('cnpj',),
+    formatos_data={'data_situacao_cadastral': FORMATOS_DATA_IBAMA},
+    colunas_obrigatorias=('cnpj', 'data_situacao_cadastral'),
+    chave_origem='cnpj',  # Se o CNPJ aparecer repetido, fica a última linha
+    remover_sem_chave=True,  # Linhas de cargas anteriores à chave natural
+)
+
+## LEGISLAÇÃO AMBIENTAL (catálogo curado mantido em CSV local; palavras-chave separadas por vírgula)
+# O CSV é gerado a partir da tabela por scripts_etl/exportar_legislacao.py (depois do preenchimento único
+# de bd/preencher_chave_origem_legislacao.sql). Normas sem chave_origem nunca são removidas pela carga
+LEGISLACAO = EspecificacaoDataset(
+    nome="LEGISLAÇÃO AMBIENTAL",
+    tabela="legislacao_ambiental",
+    origem=settings.ETL_LEGISLACAO_ARQUIVO,
+    encoding="utf-8",
+    mapa_colunas={
+        'titulo': 'titulo',
+        'resumo': 'resumo',
+        'tipo_norma': 'tipo_norma',
+        'orgao_emissor': 'orgao_emissor',
+        'link_oficial': 'link_oficial',
+        'palavras_chave': 'palavras_chave',
+    },
+    colunas_lista={'palavras_chave': ','},
+    colunas_obrigatorias=('titulo',),
+    chave_origem='titulo',
+)
+
+# Datasets disponíveis, por tabela de destino. Um dataset novo é só mais uma especificação aqui
+DATASETS = {especificacao.tabela: especificacao for especificacao in (INFRACOES, EMBARGOS, CTF, LEGISLACAO)}
@@ -0,0 +1,183 @@
+import io
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pandas as pd
+
+from config import settings
+from scripts_etl.carregador_lotes import CarregadorLotes
+from scripts_etl.controle_execucao import SincronizadorIncremental
+
+try:
+    import psycopg
+    from psycopg import sql
+except ImportError:  # psycopg é opcional: só o destino 'copy' precisa dele
+    psycopg = None
+
+
+@dataclass
+class ResultadoCarga:
+    enviados: int  # linhas novas ou alteradas gravadas na tabela
+    falhos: int
+    removidos: int
+
+
+## DESTINO PADRÃO: UPSERT EM LOTES PELO POSTGREST ##
+class DestinoPostgrest:
+    """Envia só as linhas novas ou alteradas, em lotes paralelos, pela API do Supabase."""
+
+    def __init__(self, supabase, tabela: str):
+        self.carregador = CarregadorLotes(supabase, tabela, on_conflict='chave_origem')
+        self.sincronizador = SincronizadorIncremental(supabase, tabela, self.carregador)
+
+    def iniciar(self) -> None:
+        print(f"   - {self.sincronizador.carregar_estado_atual()} registros já presentes na tabela.")
+
+    def processar(self, df: pd.DataFrame) -> int:
+        return self.sincronizador.processar(df)
+
+    def abortar(self) -> None:
+        self.carregador.finalizar()
+        self.sincronizador.fechar()
+
+    def concluir(self, remover_ausentes: bool, remover_sem_chave: bool = False) -> ResultadoCarga:
+        relatorio = self.carregador.finalizar()
+        relatorio.imprimir()
+        # Numa carga interrompida a tabela não recebeu a fonte inteira: nada é removido
+        remover_ausentes = remover_ausentes and not relatorio.interrompida_por
+        removidos = self.sincronizador.remover_ausentes(remover_sem_chave) if remover_ausentes else 0
+        self.sincronizador.fechar()
+        return ResultadoCarga(relatorio.registros_enviados, relatorio.registros_falhos, removidos)
+
+
+## DESTINO 'COPY': CARGA DIRETA NO POSTGRES, COM MERGE ATÔMICO ##
+def _literal_array(itens) -> Optional[str]:
+    # Listas (ex.: palavras_chave TEXT[]) vão no formato de array do Postgres: {"a","b"}
+    if not isinstance(itens, list):
+        return None
+    return "{" + ",".join('"' + str(i).replace('\\', '\\\\').replace('"', '\\"') + '"' for i in itens) + "}"
+
+
+class DestinoCopy:
+    """Grava os pedaços com COPY numa tabela temporária e faz o merge na tabela real numa única transação.
+
+    Tudo acontece na mesma transação: quem lê a tabela continua vendo a versão anterior até o COMMIT,
+    e qualquer erro desfaz a carga inteira. O merge (em vez de trocar a tabela inteira) preserva os ids,
+    as permissões e os índices, e só reescreve as linhas cujo hash mudou.
+    """
+
+    def __init__(self, tabela: str, url: Optional[str] = None):
+        if psycopg is None:
+            raise RuntimeError("O destino 'copy' requer o pacote 'psycopg'.")
+        url = url or settings.DATABASE_URL
+        if not url:
+            raise RuntimeError("O destino 'copy' requer a configuração DATABASE_URL.")
+        self.tabela = tabela
+        self._staging = f"_staging_{tabela}"
+        self._colunas: Optional[List[str]] = None
+        self._colunas_lista: List[str] = []
+        self._recebidos = 0
+        self._conexao = psycopg.connect(url)
+
+    def iniciar(self) -> None:
+        print("   - Carga direta no Postgres via COPY (tabela temporária + merge numa transação).")
+
+    def _criar_staging(self, colunas: List[str]) -> None:
+        self._colunas = colunas
+        with self._conexao.cursor() as cursor:
+            # Colunas de array (ex.: TEXT[]) pelo tipo declarado na tabela, não pelos valores de um pedaço,
+            # em que a coluna pode vir toda nula
+            cursor.execute(
+                "SELECT a.attname FROM pg_attribute AS a JOIN pg_type AS t ON t.oid = a.atttypid "
+                "WHERE a.attrelid = to_regclass(%s) AND a.attnum > 0 AND NOT a.attisdropped AND t.typcategory = 'A'",
+                (sql.Identifier(self.tabela).as_string(self._conexao),),
+            )
+            arrays = {linha[0] for linha in cursor.fetchall()}
+            self._colunas_lista = [c for c in colunas if c in arrays]
+            cursor.execute(sql.SQL(
+                "CREATE TEMP TABLE {staging} ON COMMIT DROP AS SELECT {colunas} FROM {tabela} WITH NO DATA"
+            ).format(
+                staging=sql.Identifier(self._staging),
+                colunas=sql.SQL(", ").join(map(sql.Identifier, colunas)),
+                tabela=sql.Identifier(self.tabela),
+            ))
+            # Ordem de chegada: entre linhas com a mesma chave, vale a última do arquivo
+            cursor.execute(sql.SQL("ALTER TABLE {} ADD COLUMN _ordem BIGINT GENERATED ALWAYS AS IDENTITY").format(
+                sql.Identifier(self._staging)
+            ))
+
+    def processar(self, df: pd.DataFrame) -> int:
+        if self._colunas is None:
+            self._criar_staging(list(df.columns))
+        df = df[self._colunas].copy()
+        for coluna in self._colunas_lista:
+            df[coluna] = df[coluna].map(_literal_array)
+
+        # No formato CSV do COPY, campo vazio sem aspas é NULL
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False, header=False)
+        with self._conexao.cursor() as cursor:
+            comando = sql.SQL("COPY {} ({}) FROM STDIN (FORMAT csv)").format(
+                sql.Identifier(self._staging), sql.SQL(", ").join(map(sql.Identifier, self._colunas))
+            )
+            with cursor.copy(comando) as copia:
+                copia.write(buffer.getvalue())
+        self._recebidos += len(df)
+        return len(df)
+
+    def abortar(self) -> None:
+        self._conexao.rollback()
+        self._conexao.close()
+
+    def concluir(self, remover_ausentes: bool, remover_sem_chave: bool = False) -> ResultadoCarga:
+        if self._colunas is None:
+            self.abortar()
+            return ResultadoCarga(0, 0, 0)
+
+        tabela = sql.Identifier(self.tabela)
+        staging = sql.Identifier(self._staging)
+        colunas = sql.SQL(", ").join(map(sql.Identifier, self._colunas))
+        atualizacoes = sql.SQL(", ").join(
+            sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(c)) for c in self._colunas if c != 'chave_origem'
+        )
+        try:
+            with self._conexao.cursor() as cursor:
+                # Impede duas cargas simultâneas da mesma tabela; leituras não são bloqueadas
+                cursor.execute(sql.SQL("LOCK TABLE {} IN SHARE ROW EXCLUSIVE MODE").format(tabela))
+                cursor.execute(sql.SQL("CREATE INDEX ON {} (chave_origem)").format(staging))
+                cursor.execute(sql.SQL("ANALYZE {}").format(staging))
+                cursor.execute(sql.SQL(
+                    "INSERT INTO {tabela} ({colunas}) "
+                    "SELECT DISTINCT ON (chave_origem) {colunas} FROM {staging} ORDER BY chave_origem, _ordem DESC "
+                    "ON CONFLICT (chave_origem) DO UPDATE SET {atualizacoes} "
+                    "WHERE {tabela}.hash_linha IS DISTINCT FROM EXCLUDED.hash_linha"
+                ).format(tabela=tabela, colunas=colunas, staging=staging, atualizacoes=atualizacoes))
+                enviados = cursor.rowcount
+
+                removidos = 0
+                if remover_ausentes:
+                    cursor.execute(sql.SQL(
+                        "DELETE FROM {tabela} AS t WHERE t.chave_origem IS NOT NULL "
+                        "AND NOT EXISTS (SELECT 1 FROM {staging} AS s WHERE s.chave_origem = t.chave_origem)"
+                    ).format(tabela=tabela, staging=staging))
+                    removidos = cursor.rowcount
+                    if remover_sem_chave:
+                        cursor.execute(sql.SQL("DELETE FROM {} WHERE chave_origem IS NULL").format(tabela))
+                        removidos += cursor.rowcount
+            self._conexao.commit()
+        except psycopg.Error as e:
+            print(f"   - ERRO no merge da carga em '{self.tabela}'; nada foi alterado: {e}")
+            self.abortar()
+            return ResultadoCarga(0, self._recebidos, 0)
+
+        self._conexao.close()
+        print(f"   - {self._recebidos} registros recebidos via COPY, {enviados} novos ou alterados após o merge.")
+        return ResultadoCarga(enviados, 0, removidos)
+
+
+def criar_destino(supabase, tabela: str):
+    if settings.ETL_DESTINO == "postgrest":
+        return DestinoPostgrest(supabase, tabela)
+    if settings.ETL_DESTINO == "copy":
+        return DestinoCopy(tabela)
+    raise ValueError(f"Destino de carga desconhecido: '{settings.ETL_DESTINO}'")
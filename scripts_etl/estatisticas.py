@@ -0,0 +1,187 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+from scripts_etl.carregador_lotes import CarregadorLotes
+
+TABELA_ESTATISTICAS = "estatisticas_agregadas"
+TABELA_RANKING = "ranking_documentos"
+
+_DIMENSOES = ["uf", "municipio_chave", "ano", "mes"]
+# Agrupamentos gravados (como um GROUPING SETS): a API responde qualquer combinação com uma consulta
+# direta por chave. O município sempre vem com a UF, e o mês sempre com o ano
+NIVEIS: Tuple[Tuple[str, ...], ...] = (
+    ("uf", "municipio_chave", "ano", "mes"), ("uf", "municipio_chave", "ano"), ("uf", "municipio_chave"),
+    ("uf", "ano", "mes"), ("uf", "ano"), ("uf",), ("ano", "mes"), ("ano",), (),
+)
+# Escopos dos rankings de documentos (autuados/embargados)
+ESCOPOS_RANKING: Tuple[Tuple[str, ...], ...] = (("uf", "ano"), ("uf",), ("ano",), ())
+_AGREGACOES = {"quantidade": "sum", "quantidade_com_valor": "sum", "valor_total": "sum", "valor_maximo": "max"}
+
+
+@dataclass(frozen=True)
+class EspecificacaoEstatisticas:
+    coluna_data: str
+    coluna_valor: Optional[str] = None  # sem valor (ex.: embargos) só as quantidades são calculadas
+    coluna_documento: str = "cpf_cnpj"
+    coluna_nome: Optional[str] = None
+    tamanho_ranking: int = settings.ESTATISTICAS_TAMANHO_RANKING
+
+
+## ACUMULA AGREGADOS PARCIAIS DE CADA PEDAÇO DO ARQUIVO E COMBINA NO FINAL ##
+class AcumuladorEstatisticas:
+    """Calcula quantidade, soma, média e máximo por UF/município/ano/mês e o ranking de documentos.
+
+    Cada pedaço passa por um único group-by vetorizado na granularidade mais fina; os níveis mais
+    agregados são derivados desses parciais no final, sem reler as linhas.
+    """
+
+    def __init__(self, especificacao: EspecificacaoEstatisticas):
+        self.especificacao = especificacao
+        self._parciais: List[pd.DataFrame] = []
+        self._documentos: List[pd.DataFrame] = []
+        self._nomes: Dict[str, str] = {}
+
+    def adicionar(self, df: pd.DataFrame) -> None:
+        esp = self.especificacao
+        datas = pd.to_datetime(df[esp.coluna_data], format="%Y-%m-%d", errors="coerce")
+        valores = (
+            pd.to_numeric(df[esp.coluna_valor], errors="coerce") if esp.coluna_valor
+            else pd.Series(np.nan, index=df.index)
+        )
+        base = pd.DataFrame({
+            "uf": df["uf"], "municipio_chave": df["municipio_chave"],
+            "ano": datas.dt.year.astype("Int64"), "mes": datas.dt.month.astype("Int64"),
+            "documento": df[esp.coluna_documento], "valor": valores,
+        })
+
+        self._parciais.append(
+            base.groupby(_DIMENSOES, dropna=False).agg(
+                quantidade=("valor", "size"), quantidade_com_valor=("valor", "count"),
+                valor_total=("valor", "sum"), valor_maximo=("valor", "max"),
+            )
+        )
+        self._documentos.append(
+            base.groupby(["documento", "uf", "ano"], dropna=False).agg(
+                quantidade=("valor", "size"), quantidade_com_valor=("valor", "count"), valor_total=("valor", "sum")
+            )
+        )
+        if esp.coluna_nome:
+            nomes = df[[esp.coluna_documento, esp.coluna_nome]].dropna().drop_duplicates(esp.coluna_documento)
+            for documento, nome in nomes.itertuples(index=False):
+                self._nomes.setdefault(documento, nome)
+
+        # Compacta os parciais de tempos em tempos para a memória não crescer com o número de pedaços
+        if len(self._parciais) >= 20:
+            self._parciais = [self._combinar_parciais()]
+            self._documentos = [self._combinar_documentos()]
+
+    def _combinar_parciais(self) -> pd.DataFrame:
+        return pd.concat(self._parciais).groupby(level=_DIMENSOES, dropna=False).agg(_AGREGACOES)
+
+    def _combinar_documentos(self) -> pd.DataFrame:
+        return pd.concat(self._documentos).groupby(level=["documento", "uf", "ano"], dropna=False).sum()
+
+    def estatisticas(self, tabela: str, versao: int) -> List[dict]:
+        if not self._parciais:
+            return []
+        fino = self._combinar_parciais().reset_index()
+        niveis = []
+        for nivel in NIVEIS:
+            # Linhas sem a dimensão (ex.: UF em branco) entram só nos níveis que não a usam, senão o grupo
+            # "UF nula" se confundiria com o total de todas as UFs
+            agregado = fino.groupby(list(nivel)).agg(_AGREGACOES).reset_index() if nivel else (
+                fino.agg(_AGREGACOES).to_frame().T
+            )
+            for dimensao in _DIMENSOES:
+                if dimensao not in nivel:
+                    agregado[dimensao] = None
+            niveis.append(agregado)
+        todos = pd.concat(niveis, ignore_index=True)
+        # A soma do pandas dá 0 num grupo sem nenhum valor; a contagem combinada identifica esses grupos
+        todos["valor_total"] = todos["valor_total"].mask(todos["quantidade_com_valor"] == 0)
+        todos["valor_medio"] = todos["valor_total"] / todos["quantidade_com_valor"].replace(0, np.nan)
+        if not self.especificacao.coluna_valor:
+            todos[["valor_total", "valor_maximo", "valor_medio"]] = np.nan
+        todos["tabela"] = tabela
+        todos["versao"] = versao
+        return _registros(todos)
+
+    def ranking(self, tabela: str, versao: int) -> List[dict]:
+        if not self._documentos:
+            return []
+        por_documento = self._combinar_documentos().reset_index()
+        por_documento = por_documento[por_documento["documento"].notna()]
+        # Com valor, o ranking é pelo total das multas; sem valor, pela quantidade de registros
+        criterio = "valor_total" if self.especificacao.coluna_valor else "quantidade"
+        escopos = []
+        for escopo in ESCOPOS_RANKING:
+            agregado = por_documento.groupby(list(escopo) + ["documento"])[
+                ["quantidade", "quantidade_com_valor", "valor_total"]
+            ].sum()
+            # Documentos sem nenhum valor ficam com total nulo (e no fim do ranking), não com 0
+            agregado["valor_total"] = agregado["valor_total"].mask(agregado["quantidade_com_valor"] == 0)
+            agregado = agregado.reset_index().sort_values([criterio, "documento"], ascending=[False, True])
+            if escopo:
+                agregado = agregado.groupby(list(escopo)).head(self.especificacao.tamanho_ranking)
+                agregado["posicao"] = agregado.groupby(list(escopo)).cumcount() + 1
+            else:
+                agregado = agregado.head(self.especificacao.tamanho_ranking)
+                agregado["posicao"] = np.arange(1, len(agregado) + 1)
+            for dimensao in ("uf", "ano"):
+                if dimensao not in escopo:
+                    agregado[dimensao] = None
+            escopos.append(agregado)
+        todos = pd.concat(escopos, ignore_index=True).drop(columns="quantidade_com_valor")
+        todos = todos.rename(columns={"documento": "cpf_cnpj"})
+        todos["nome"] = todos["cpf_cnpj"].map(self._nomes)
+        if not self.especificacao.coluna_valor:
+            todos["valor_total"] = np.nan
+        todos["tabela"] = tabela
+        todos["versao"] = versao
+        return _registros(todos)
+
+
+def _registros(df: pd.DataFrame) -> List[dict]:
+    df = df.astype(object).where(df.notna(), None)
+    registros = df.to_dict(orient="records")
+    for registro in registros:
+        for chave in ("ano", "mes", "quantidade", "quantidade_com_valor", "posicao"):
+            if registro.get(chave) is not None:
+                registro[chave] = int(registro[chave])
+        for chave in ("valor_total", "valor_medio", "valor_maximo"):
+            if registro.get(chave) is not None:
+                registro[chave] = round(float(registro[chave]), 2)
+    return registros
+
+
+## GRAVAÇÃO: A NOVA VERSÃO ENTRA ANTES DE A ANTIGA SAIR ##
+def gravar_estatisticas(supabase, tabela: str, acumulador: AcumuladorEstatisticas, versao: int) -> int:
+    # As linhas levam a versão que será publicada; a API só lê a versão vigente, então nunca vê
+    # uma mistura da carga antiga com a nova
+    total = 0
+    try:
+        for destino, registros in (
+            (TABELA_ESTATISTICAS, acumulador.estatisticas(tabela, versao)),
+            (TABELA_RANKING, acumulador.ranking(tabela, versao)),
+        ):
+            carregador = CarregadorLotes(supabase, destino)
+            carregador.enviar(registros)
+            relatorio = carregador.finalizar()
+            if relatorio.registros_falhos:
+                raise RuntimeError(f"{relatorio.registros_falhos} linhas de '{destino}' não foram gravadas")
+            total += len(registros)
+    except Exception:
+        # Uma versão gravada pela metade nunca deve ser lida: descarta o que entrou
+        for destino in (TABELA_ESTATISTICAS, TABELA_RANKING):
+            supabase.table(destino).delete().eq("tabela", tabela).eq("versao", versao).execute()
+        raise
+    return total
+
+
+def remover_versoes_antigas(supabase, tabela: str, versao: int) -> None:
+    for destino in (TABELA_ESTATISTICAS, TABELA_RANKING):
+        supabase.table(destino).delete().eq("tabela", tabela).lt("versao", versao).execute()
@@ -0,0 +1,72 @@
+import csv
+import os
+import sys
+import time
+from pathlib import Path
+
+try:
+    from ..supabase_client import supabase
+except ImportError:
+    # Adiciona o caminho do projeto para permitir a execução direta do script
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from supabase_client import supabase
+
+from config import settings
+from scripts_etl.datasets import LEGISLACAO
+
+NOME_TABELA = "legislacao_ambiental"
+
+
+def _paginas_normas(tamanho_pagina: int):
+    # Mesma paginação por 'id' da geração de embeddings: o PostgREST limita as linhas por resposta
+    colunas = ",".join(("id",) + tuple(LEGISLACAO.mapa_colunas.values()))
+    ultimo_id = 0
+    while True:
+        pagina = (
+            supabase.table(NOME_TABELA).select(colunas).gt("id", ultimo_id)
+            .order("id").limit(tamanho_pagina).execute().data
+        )
+        if pagina:
+            yield pagina
+        if len(pagina) < tamanho_pagina:
+            return
+        ultimo_id = pagina[-1]["id"]
+
+
+## EXPORTA O CATÁLOGO CURADO DA TABELA PARA O CSV LIDO PELO ETL ##
+def exportar_legislacao(caminho=None, tamanho_pagina=1000):
+    """Grava a tabela 'legislacao_ambiental' no formato da especificação LEGISLACAO.
+
+    Uma coluna por valor de `LEGISLACAO.mapa_colunas`, separadas por ';', em UTF-8, com as
+    palavras-chave separadas por ','. O arquivo gerado é a fonte do catálogo: as normas são
+    editadas nele e recarregadas com `python scripts_etl/pipeline.py legislacao_ambiental`.
+    """
+    caminho = Path(caminho or settings.ETL_LEGISLACAO_ARQUIVO)
+    print(f"\n--- EXPORTANDO O CATÁLOGO DE LEGISLAÇÃO PARA '{caminho}' ---")
+
+    colunas = list(LEGISLACAO.mapa_colunas)
+    separador_lista = LEGISLACAO.colunas_lista['palavras_chave']
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    total = 0
+    with open(caminho, "w", encoding=LEGISLACAO.encoding, newline="") as arquivo:
+        escritor = csv.writer(arquivo, delimiter=LEGISLACAO.separador)
+        escritor.writerow(colunas)
+        for normas in _paginas_normas(tamanho_pagina):
+            for norma in normas:
+                norma["palavras_chave"] = separador_lista.join(norma.get("palavras_chave") or [])
+                escritor.writerow([norma.get(LEGISLACAO.mapa_colunas[c]) for c in colunas])
+            total += len(normas)
+
+    print(f"   - {total} normas exportadas.")
+    print("\n--- EXPORTAÇÃO CONCLUÍDA ---")
+
+
+if __name__ == "__main__":
+    start_time = time.time()
+    try:
+        exportar_legislacao(sys.argv[1] if len(sys.argv) > 1 else None)
+    except Exception as e:
+        print(f"Ocorreu um erro fatal durante a execução: {e}")
+
+    end_time = time.time()
+    print(f"Tempo total de execução: {end_time - start_time:.2f} segundos.")
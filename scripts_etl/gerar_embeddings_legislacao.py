@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+
+try:
+    from ..supabase_client import supabase
+except ImportError:
+    # Adiciona o caminho do projeto para permitir a execução direta do script
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from supabase_client import supabase
+
+from servicos.busca_semantica import criar_codificador, texto_para_embedding
+from servicos.versoes import registrar_nova_versao
+
+NOME_TABELA = "legislacao_ambiental"
+
+
+def _paginas_normas(recalcular_todos: bool, tamanho_pagina: int):
+    # O PostgREST limita as linhas por resposta: percorre as normas em páginas ordenadas por 'id'
+    ultimo_id = 0
+    while True:
+        consulta = supabase.table(NOME_TABELA).select("id,titulo,resumo,palavras_chave").gt("id", ultimo_id)
+        if not recalcular_todos:
+            consulta = consulta.is_("embedding", "null")
+        pagina = consulta.order("id").limit(tamanho_pagina).execute().data
+        if pagina:
+            yield pagina
+        if len(pagina) < tamanho_pagina:
+            return
+        ultimo_id = pagina[-1]["id"]
+
+
+## GERA A COLUNA 'embedding' DAS NORMAS QUE AINDA NÃO TÊM VETOR ##
+def gerar_embeddings_legislacao(recalcular_todos=False, tamanho_lote=64, tamanho_pagina=1000):
+    print("\n--- INICIANDO GERAÇÃO DE EMBEDDINGS (LEGISLAÇÃO AMBIENTAL) ---")
+
+    codificador = None
+    lidas = 0
+    total = 0
+    for normas in _paginas_normas(recalcular_todos, tamanho_pagina):
+        if codificador is None:
+            codificador = criar_codificador()
+            print(f"1. Codificando com '{type(codificador).__name__}' e gravando no Supabase...")
+        lidas += len(normas)
+        for i in range(0, len(normas), tamanho_lote):
+            lote = normas[i:i + tamanho_lote]
+            vetores = codificador.codificar([texto_para_embedding(n) for n in lote])
+            for norma, vetor in zip(lote, vetores):
+                try:
+                    supabase.table(NOME_TABELA).update({"embedding": vetor.tolist()}).eq("id", norma["id"]).execute()
+                    total += 1
+                except Exception as e:
+                    print(f"   - ERRO ao gravar o embedding da norma {norma['id']}: {e}")
+        print(f"   - {lidas} normas lidas, {total} embeddings gravados.")
+
+    if not lidas:
+        print("   - Nenhuma norma pendente. Encerrando o processo.")
+        return
+
+    # Publica uma nova versão para a API recarregar o índice vetorial
+    registrar_nova_versao(supabase, NOME_TABELA)
+    print("\n--- GERAÇÃO DE EMBEDDINGS CONCLUÍDA ---")
+
+
+if __name__ == "__main__":
+    start_time = time.time()
+    try:
+        gerar_embeddings_legislacao(recalcular_todos="--todos" in sys.argv)
+    except Exception as e:
+        print(f"Ocorreu um erro fatal durante a execução: {e}")
+
+    end_time = time.time()
+    print(f"Tempo total de execução: {end_time - start_time:.2f} segundos.")
@@ -0,0 +1,33 @@
+import os
+import sys
+import time
+
+try:
+    from ..supabase_client import supabase
+except ImportError:
+    # Adiciona o caminho do projeto para permitir a execução direta do script
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from supabase_client import supabase
+
+from servicos.snapshot import TABELAS_SNAPSHOT, exportar_snapshot
+
+
+## GERA OS SNAPSHOTS LOCAIS (ARROW) DE TODAS AS TABELAS, OU DAS INFORMADAS NA LINHA DE COMANDO ##
+def gerar_snapshots(tabelas=None):
+    print("\n--- GERANDO SNAPSHOTS LOCAIS DAS TABELAS ---")
+
+    for tabela in tabelas or list(TABELAS_SNAPSHOT):
+        try:
+            total = exportar_snapshot(supabase, tabela)
+            print(f"   - '{tabela}': {total} registros gravados.")
+        except Exception as e:
+            print(f"   - ERRO ao gerar o snapshot de '{tabela}': {e}")
+
+    print("\n--- SNAPSHOTS CONCLUÍDOS ---")
+
+
+if __name__ == "__main__":
+    start_time = time.time()
+    gerar_snapshots(sys.argv[1:])
+    end_time = time.time()
+    print(f"Tempo total de execução: {end_time - start_time:.2f} segundos.")
@@ -0,0 +1,316 @@
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import shapely
+except ImportError:  # shapely é opcional: só os datasets com geometria precisam dele
+    shapely = None
+
+if __name__ == "__main__":
+    # Adiciona o caminho do projeto para permitir a execução direta do script
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config import settings
+from servicos.documentos_conhecidos import TABELAS_INDICE, AcumuladorDocumentos, caminho_indice, remover_indices_antigos
+from servicos.normalizacao import chave_municipio_serie
+from servicos.snapshot import TABELAS_SNAPSHOT, exportar_snapshot
+from servicos.versoes import nova_versao, registrar_nova_versao
+from scripts_etl.controle_execucao import adicionar_chave_e_hash, obter_ultima_execucao, registrar_execucao
+from scripts_etl.destinos import criar_destino
+from scripts_etl.estatisticas import (
+    AcumuladorEstatisticas, EspecificacaoEstatisticas, gravar_estatisticas, remover_versoes_antigas
+)
+from scripts_etl.utils_etl import abrir_origem, ler_csv_do_zip_em_chunks, ler_csv_em_chunks
+
+
+## ESPECIFICAÇÃO DECLARATIVA DE UM DATASET ##
+@dataclass(frozen=True)
+class EspecificacaoDataset:
+    """De onde vem o dataset, como cada coluna é convertida e limpa, e em qual tabela é carregado.
+
+    As regras de limpeza usam os nomes de coluna do banco (valores de `mapa_colunas`).
+    """
+    nome: str
+    tabela: str
+    origem: str  # URL (download condicional) ou caminho de um arquivo local
+    mapa_colunas: Dict[str, str]  # coluna do CSV -> coluna do banco
+    colunas_opcionais: Dict[str, str] = field(default_factory=dict)  # como mapa_colunas, mas podem faltar no CSV
+    formato: str = "csv"  # "csv" ou "zip" (usa o primeiro .csv dentro do .zip)
+    separador: str = ";"
+    encoding: str = "latin-1"
+    colunas_documento: Tuple[str, ...] = ()  # CPF/CNPJ: mantém só os dígitos
+    colunas_decimal: Tuple[str, ...] = ()  # números com vírgula decimal
+    formatos_data: Dict[str, Tuple[str, ...]] = field(default_factory=dict)  # formatos tentados em ordem
+    colunas_reparar_encoding: Tuple[str, ...] = ()  # texto UTF-8 lido como latin-1
+    colunas_lista: Dict[str, str] = field(default_factory=dict)  # coluna -> separador dos itens
+    colunas_obrigatorias: Tuple[str, ...] = ()  # linhas sem estes valores são descartadas
+    chave_origem: Optional[str] = None  # coluna do banco ou do CSV com a chave natural da linha
+    # Remove as linhas sem chave_origem (carregadas antes da chave natural existir). Desligado nas
+    # tabelas curadas, em que linhas cadastradas à mão (e seus embeddings) não vêm de carga anterior
+    remover_sem_chave: bool = False
+    chave_municipio: bool = False  # grava municipio_chave e atualiza a view de municípios
+    coluna_geometria: Optional[str] = None  # coluna WKT: gera wkb_geometria e o retângulo envolvente (bbox_*)
+    estatisticas: Optional[EspecificacaoEstatisticas] = None  # agregados por UF/município/ano/mês e ranking
+
+    @property
+    def colunas_dados(self) -> Tuple[str, ...]:
+        # Colunas do banco vindas do CSV (são as que entram no hash da linha)
+        return tuple(self.mapa_colunas.values()) + tuple(self.colunas_opcionais.values())
+
+    @property
+    def colunas_csv(self) -> Tuple[str, ...]:
+        # A chave natural pode ser uma coluna do CSV que não é carregada no banco (ex.: SEQ_TAD)
+        colunas = tuple(self.mapa_colunas) + tuple(self.colunas_opcionais)
+        chave = self.chave_origem
+        if chave and chave not in colunas and chave not in self.colunas_dados:
+            return colunas + (chave,)
+        return colunas
+
+
+## TRANSFORMAÇÕES VETORIZADAS ##
+def converter_datas(serie: pd.Series, formatos: Tuple[str, ...]) -> pd.Series:
+    # Cada formato explícito é aplicado só às linhas que os anteriores não reconheceram
+    datas = pd.Series(pd.NaT, index=serie.index, dtype="datetime64[ns]")
+    for formato in formatos:
+        pendentes = datas.isna() & serie.notna()
+        if not pendentes.any():
+            break
+        datas[pendentes] = pd.to_datetime(serie[pendentes], format=formato, errors='coerce')
+    # Formato inesperado: a inferência (lenta) fica restrita às linhas que sobraram
+    pendentes = datas.isna() & serie.notna()
+    if pendentes.any():
+        datas[pendentes] = pd.to_datetime(serie[pendentes], format='mixed', dayfirst=True, errors='coerce')
+    return datas.dt.strftime('%Y-%m-%d')
+
+
+def reparar_encoding(serie: pd.Series) -> pd.Series:
+    # Só textos com caracteres fora do ASCII podem estar corrompidos, e cada valor distinto é corrigido uma vez
+    suspeitos = serie.str.contains(r'[^\x00-\x7F]', regex=True, na=False)
+    if not suspeitos.any():
+        return serie
+    corrigidos = {
+        valor: valor.encode('latin-1', 'ignore').decode('utf-8', 'ignore')
+        for valor in serie[suspeitos].unique()
+    }
+    serie = serie.copy()
+    serie[suspeitos] = serie[suspeitos].map(corrigidos)
+    return serie
+
+
+def calcular_geometrias(df: pd.DataFrame, coluna: str) -> pd.DataFrame:
+    # O WKT é interpretado uma única vez aqui; a API lê o WKB compacto e o retângulo já calculado
+    if shapely is None:
+        raise RuntimeError("Datasets com geometria requerem o pacote 'shapely'.")
+    geometrias = shapely.from_wkt(df[coluna].to_numpy(dtype=object, na_value=None), on_invalid='ignore')
+    wkb = shapely.to_wkb(geometrias, hex=True)
+    # No PostgREST (e no COPY) um BYTEA é enviado como texto hexadecimal com o prefixo '\x'
+    df['wkb_geometria'] = ['\\x' + h if h else None for h in wkb]
+    limites = shapely.bounds(geometrias)
+    for i, nome in enumerate(('bbox_xmin', 'bbox_ymin', 'bbox_xmax', 'bbox_ymax')):
+        df[nome] = limites[:, i]
+    return df
+
+
+def transformar(especificacao: EspecificacaoDataset, df: pd.DataFrame) -> pd.DataFrame:
+    mapa = dict(especificacao.mapa_colunas)
+    mapa.update({c: destino for c, destino in especificacao.colunas_opcionais.items() if c in df.columns})
+    df = df[list(mapa)].rename(columns=mapa)
+    for destino in especificacao.colunas_opcionais.values():
+        if destino not in df.columns:
+            df[destino] = pd.NA
+
+    for coluna in especificacao.colunas_documento:
+        df[coluna] = df[coluna].str.replace(r'\D', '', regex=True).replace('', pd.NA)
+    for coluna in especificacao.colunas_decimal:
+        df[coluna] = pd.to_numeric(df[coluna].str.replace(',', '.', regex=False), errors='coerce')
+    for coluna, formatos in especificacao.formatos_data.items():
+        df[coluna] = converter_datas(df[coluna], formatos)
+    for coluna in especificacao.colunas_reparar_encoding:
+        df[coluna] = reparar_encoding(df[coluna])
+    for coluna, separador in especificacao.colunas_lista.items():
+        df[coluna] = df[coluna].str.split(separador).map(
+            lambda itens: [i.strip() for i in itens if i.strip()] if isinstance(itens, list) else None
+        )
+
+    if especificacao.coluna_geometria:
+        df = calcular_geometrias(df, especificacao.coluna_geometria)
+
+    if especificacao.chave_municipio:
+        # Chave normalizada do município (sem acentos, maiúscula e com a UF) usada nas buscas da API
+        df['municipio_chave'] = chave_municipio_serie(df['municipio'], df['uf'])
+
+    df = df.dropna(subset=list(especificacao.colunas_obrigatorias))
+    # Valores nulos viram None, que é o que o cliente do Supabase envia como NULL
+    return df.astype(object).where(df.notna(), None)
+
+
+def _ler_chunks(especificacao: EspecificacaoDataset, arquivo):
+    leitor = ler_csv_do_zip_em_chunks if especificacao.formato == "zip" else ler_csv_em_chunks
+    return leitor(arquivo, especificacao.colunas_csv, especificacao.separador, especificacao.encoding)
+
+
+## MOTOR DO PIPELINE: EXTRAÇÃO, TRANSFORMAÇÃO, CARGA INCREMENTAL E PUBLICAÇÃO ##
+def executar_pipeline(supabase, especificacao: EspecificacaoDataset) -> None:
+    tabela = especificacao.tabela
+    print(f"\n--- INICIANDO PROCESSO DE ETL ({especificacao.nome}) ---")
+
+    print(f"1. Extraindo dados da origem:\n   {especificacao.origem}")
+    print(f"2. Transformando e carregando em pedaços de {settings.ETL_TAMANHO_CHUNK} linhas na tabela '{tabela}'...")
+    total_lido = 0
+    total_valido = 0
+    destino = None
+    # As estatísticas são calculadas sobre todas as linhas válidas, não só as enviadas na carga incremental
+    acumulador = AcumuladorEstatisticas(especificacao.estatisticas) if especificacao.estatisticas else None
+    # Documentos presentes na tabela, para a API responder localmente quando um documento não tem registros
+    documentos = AcumuladorDocumentos(TABELAS_INDICE[tabela]) if tabela in TABELAS_INDICE else None
+    if not especificacao.origem.startswith(('http://', 'https://')) and not os.path.exists(especificacao.origem):
+        print(f"   - Arquivo de origem não encontrado: '{especificacao.origem}'. Encerrando o processo.")
+        return
+    try:
+        # A origem é lida em blocos e o CSV em pedaços: a memória não depende do tamanho do arquivo.
+        # Se a origem não mudou desde a última execução, nada é processado
+        with abrir_origem(especificacao.origem, obter_ultima_execucao(supabase, tabela)) as download:
+            if not download.modificado:
+                print("   - Nenhuma alteração na fonte. Encerrando o processo.")
+                return
+            # A carga é incremental: só as linhas novas ou alteradas (pela chave natural) são gravadas
+            destino = criar_destino(supabase, tabela)
+            destino.iniciar()
+            for numero, chunk in enumerate(_ler_chunks(especificacao, download.arquivo), start=1):
+                faltantes = [c for c in especificacao.mapa_colunas if c not in chunk.columns]
+                if faltantes:
+                    print("   - ERRO CRÍTICO: Colunas essenciais não foram encontradas no arquivo CSV.")
+                    print(f"   - Colunas ausentes: {faltantes}")
+                    destino.abortar()
+                    return
+
+                df = transformar(especificacao, chunk)
+                chave = None
+                if especificacao.chave_origem in df.columns:
+                    chave = df[especificacao.chave_origem]
+                elif especificacao.chave_origem in chunk.columns:
+                    chave = chunk[especificacao.chave_origem]
+                df = adicionar_chave_e_hash(df, especificacao.colunas_dados, chave)
+                if acumulador is not None:
+                    acumulador.adicionar(df)
+                if documentos is not None:
+                    documentos.adicionar(df)
+                total_lido += len(chunk)
+                total_valido += len(df)
+                enviados = destino.processar(df)
+                print(f"   - Pedaço {numero}: {len(df)} registros válidos, {enviados} enviados para carga.")
+    except Exception as e:
+        print(f"   - ERRO CRÍTICO ao obter e processar os dados da origem: {e}")
+        if destino is not None:
+            destino.abortar()
+        return
+
+    print(f"   - {total_lido} linhas lidas, {total_valido} registros válidos.")
+    # Um arquivo sem nenhum registro válido é tratado como defeituoso: nada é removido da tabela
+    resultado = destino.concluir(remover_ausentes=total_valido > 0, remover_sem_chave=especificacao.remover_sem_chave)
+    if not total_valido:
+        print("   - Nenhum registro válido no arquivo. Encerrando o processo.")
+        return
+
+    print(f"   - {resultado.removidos} registros que não constam mais na fonte foram removidos.")
+    # Com falhas de carga a execução não é registrada, para ser refeita por completo na próxima vez
+    if not resultado.falhos:
+        registrar_execucao(supabase, tabela, especificacao.origem, download, resultado.enviados)
+
+    if not resultado.enviados and not resultado.removidos:
+        print("   - Nenhum registro novo, alterado ou removido. Encerrando o processo.")
+        return
+
+    publicar(supabase, especificacao, acumulador, documentos)
+    print(f"\n--- PROCESSO DE ETL ({especificacao.nome}) CONCLUÍDO ---")
+
+
+def publicar(supabase, especificacao: EspecificacaoDataset,
+             acumulador: Optional[AcumuladorEstatisticas] = None,
+             documentos: Optional[AcumuladorDocumentos] = None) -> None:
+    tabela = especificacao.tabela
+    versao = nova_versao()
+
+    # Atualiza a lista de municípios (view materializada) usada pelo dicionário da API
+    if especificacao.chave_municipio:
+        try:
+            supabase.rpc('atualizar_municipios_chaves').execute()
+        except Exception as e:
+            print(f"   - ERRO ao atualizar a lista de municípios: {e}")
+
+    # No modo snapshot, grava o arquivo local lido pela API antes de publicar a nova versão
+    if settings.SNAPSHOT_ATIVO and tabela in TABELAS_SNAPSHOT:
+        try:
+            total_snapshot = exportar_snapshot(supabase, tabela)
+            print(f"   - Snapshot local gravado com {total_snapshot} registros.")
+        except Exception as e:
+            print(f"   - ERRO ao gravar o snapshot local: {e}")
+
+    # O índice de documentos leva a versão no nome do arquivo: a API só o usa depois do registro da versão
+    if documentos is not None and settings.INDICE_DOCUMENTOS_ATIVO:
+        try:
+            total_documentos = documentos.gravar(tabela, versao)
+            print(f"   - Índice local gravado com {total_documentos} documentos distintos.")
+        except Exception as e:
+            print(f"   - ERRO ao gravar o índice local de documentos: {e}")
+
+    # As estatísticas são gravadas com a versão que será publicada: a API só passa a lê-las depois
+    # do registro da versão, e as da versão anterior continuam valendo até lá
+    estatisticas_gravadas = False
+    if acumulador is not None:
+        try:
+            total_estatisticas = gravar_estatisticas(supabase, tabela, acumulador, versao)
+            print(f"   - {total_estatisticas} linhas de estatísticas e ranking gravadas.")
+            estatisticas_gravadas = True
+        except Exception as e:
+            print(f"   - ERRO ao gravar as estatísticas agregadas: {e}")
+
+    # Publica uma nova versão do dataset para a API descartar os resultados em cache
+    try:
+        registrar_nova_versao(supabase, tabela, versao)
+        print(f"   - Nova versão do dataset '{tabela}' registrada: {versao}")
+    except Exception as e:
+        print(f"   - ERRO ao registrar a nova versão do dataset: {e}")
+        # A versão nunca será lida: o índice gravado para ela sai, e o da versão vigente continua
+        if documentos is not None:
+            caminho_indice(tabela, versao).unlink(missing_ok=True)
+        return
+
+    # Com a nova versão registrada, os índices de documentos mais antigos que a anterior não são mais usados
+    if documentos is not None and settings.INDICE_DOCUMENTOS_ATIVO:
+        try:
+            remover_indices_antigos(tabela, versao)
+        except OSError as e:
+            print(f"   - ERRO ao remover os índices de documentos de versões anteriores: {e}")
+
+    # Se a gravação falhou, a API continua usando as estatísticas da versão anterior
+    if estatisticas_gravadas:
+        try:
+            remover_versoes_antigas(supabase, tabela, versao)
+        except Exception as e:
+            print(f"   - ERRO ao remover as estatísticas de versões anteriores: {e}")
+
+
+if __name__ == "__main__":
+    from supabase_client import supabase
+    from scripts_etl.datasets import DATASETS
+
+    tabelas = sys.argv[1:] or list(DATASETS)
+    desconhecidas = [t for t in tabelas if t not in DATASETS]
+    if desconhecidas:
+        print(f"Datasets desconhecidos: {desconhecidas}. Disponíveis: {list(DATASETS)}")
+        sys.exit(1)
+
+    start_time = time.time()
+    for tabela in tabelas:
+        try:
+            executar_pipeline(supabase, DATASETS[tabela])
+        except Exception as e:
+            print(f"Ocorreu um erro fatal durante a execução de '{tabela}': {e}")
+    end_time = time.time()
+    print(f"Tempo total de execução: {end_time - start_time:.2f} segundos.")
@@ -0,0 +1,27 @@
+import os
+import sys
+
+try:
+    from ..supabase_client import supabase
+except ImportError:
+    # Adiciona o caminho do projeto para permitir a execução direta do script
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from supabase_client import supabase
+
+from servicos.versoes import registrar_nova_versao
+
+
+## PUBLICA UMA NOVA VERSÃO DE TABELAS ALTERADAS FORA DO ETL (EX.: O GLOSSÁRIO) ##
+# Com o gatilho de bd/schema.sql o glossário já publica sozinho; este script serve aos bancos criados
+# antes do gatilho e a qualquer outra edição manual que a API precise recarregar
+def publicar_versao(tabelas):
+    for tabela in tabelas:
+        versao = registrar_nova_versao(supabase, tabela)
+        print(f"   - Nova versão do dataset '{tabela}' registrada: {versao}")
+
+
+if __name__ == "__main__":
+    try:
+        publicar_versao(sys.argv[1:] or ["termos_glossario"])
+    except Exception as e:
+        print(f"Ocorreu um erro fatal durante a execução: {e}")
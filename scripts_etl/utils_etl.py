@@ -0,0 +1,149 @@
+import hashlib
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import IO, Iterator, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import requests
+
+from config import settings
+
+
+@dataclass
+class Download:
+    arquivo: Optional[IO[bytes]]  # None quando a fonte não mudou desde a última execução
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    hash_conteudo: Optional[str] = None
+
+    @property
+    def modificado(self) -> bool:
+        return self.arquivo is not None
+
+
+## DOWNLOAD CONDICIONAL EM BLOCOS PARA UM ARQUIVO TEMPORÁRIO ##
+@contextmanager
+def arquivo_baixado(url: str, execucao_anterior: Optional[dict] = None) -> Iterator[Download]:
+    # Arquivos pequenos ficam em memória; acima do limite o conteúdo vai para o disco.
+    # Em nenhum momento o arquivo inteiro precisa caber em 'response.content'.
+    anterior = execucao_anterior or {}
+    cabecalhos = {}
+    if anterior.get('etag'):
+        cabecalhos['If-None-Match'] = anterior['etag']
+    if anterior.get('last_modified'):
+        cabecalhos['If-Modified-Since'] = anterior['last_modified']
+
+    with tempfile.SpooledTemporaryFile(max_size=settings.ETL_DOWNLOAD_MEMORIA_MAXIMA) as arquivo:
+        with requests.get(url, stream=True, timeout=settings.ETL_TIMEOUT_DOWNLOAD, headers=cabecalhos) as response:
+            if response.status_code == 304:
+                print("   - A fonte não mudou desde a última execução (HTTP 304).")
+                yield Download(arquivo=None, etag=anterior.get('etag'), last_modified=anterior.get('last_modified'),
+                               hash_conteudo=anterior.get('hash_conteudo'))
+                return
+            response.raise_for_status()  # Lança um erro se o download falhar (ex: 404)
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            resumo = hashlib.sha256()
+            total = 0
+            for bloco in response.iter_content(chunk_size=settings.ETL_TAMANHO_BLOCO_DOWNLOAD):
+                arquivo.write(bloco)
+                resumo.update(bloco)
+                total += len(bloco)
+        print(f"   - Download concluído: {total / 1_048_576:.1f} MB.")
+
+        # Servidores sem ETag/Last-Modified: compara o hash do conteúdo com o da última execução
+        hash_conteudo = resumo.hexdigest()
+        if hash_conteudo == anterior.get('hash_conteudo'):
+            print("   - O conteúdo baixado é idêntico ao da última execução.")
+            yield Download(arquivo=None, etag=etag, last_modified=last_modified, hash_conteudo=hash_conteudo)
+            return
+
+        arquivo.seek(0)
+        yield Download(arquivo=arquivo, etag=etag, last_modified=last_modified, hash_conteudo=hash_conteudo)
+
+
+## LEITURA DE UM ARQUIVO LOCAL, COM O MESMO CONTROLE DE ALTERAÇÃO DO DOWNLOAD ##
+@contextmanager
+def arquivo_local(caminho: str, execucao_anterior: Optional[dict] = None) -> Iterator[Download]:
+    resumo = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(settings.ETL_TAMANHO_BLOCO_DOWNLOAD), b''):
+            resumo.update(bloco)
+        hash_conteudo = resumo.hexdigest()
+        if hash_conteudo == (execucao_anterior or {}).get('hash_conteudo'):
+            print("   - O arquivo é idêntico ao da última execução.")
+            yield Download(arquivo=None, hash_conteudo=hash_conteudo)
+            return
+        arquivo.seek(0)
+        yield Download(arquivo=arquivo, hash_conteudo=hash_conteudo)
+
+
+def abrir_origem(origem: str, execucao_anterior: Optional[dict] = None):
+    # URLs passam pelo download condicional; qualquer outra origem é um arquivo local
+    if origem.startswith(('http://', 'https://')):
+        return arquivo_baixado(origem, execucao_anterior)
+    return arquivo_local(origem, execucao_anterior)
+
+
+## LEITURA DO CSV EM PEDAÇOS (CHUNKS) COM O LEITOR DO PYARROW ##
+def _colunas_do_cabecalho(arquivo, separador: str, encoding: str) -> List[str]:
+    # Lê só a primeira linha e volta ao início: o leitor em streaming precisa saber quais colunas existem
+    cabecalho = arquivo.readline().decode(encoding).lstrip('\ufeff').rstrip('\r\n')
+    arquivo.seek(0)
+    return [c.strip().strip('"') for c in cabecalho.split(separador)]
+
+
+def ler_csv_em_chunks(arquivo, colunas: Sequence[str], separador: str = ';', encoding: str = 'utf-8',
+                      tamanho_chunk: int = None) -> Iterator[pd.DataFrame]:
+    """Lê apenas as colunas pedidas, todas como texto, em DataFrames de até `tamanho_chunk` linhas.
+
+    As colunas pedidas que não existirem no arquivo simplesmente não aparecem nos DataFrames.
+    O pico de memória fica limitado pelo tamanho do chunk, e não pelo tamanho do arquivo.
+    """
+    tamanho_chunk = tamanho_chunk or settings.ETL_TAMANHO_CHUNK
+    existentes = set(_colunas_do_cabecalho(arquivo, separador, encoding))
+    incluidas = [c for c in colunas if c in existentes]
+    leitor = pacsv.open_csv(
+        arquivo,
+        read_options=pacsv.ReadOptions(encoding=encoding, block_size=settings.ETL_TAMANHO_BLOCO_DOWNLOAD),
+        parse_options=pacsv.ParseOptions(delimiter=separador, invalid_row_handler=lambda _: 'skip'),
+        # Tudo como texto: a conversão de tipos é feita pela especificação do dataset
+        convert_options=pacsv.ConvertOptions(
+            include_columns=incluidas,
+            column_types={c: pa.string() for c in incluidas},
+            strings_can_be_null=True,
+        ),
+    )
+
+    lotes, linhas = [], 0
+    for lote in leitor:
+        lotes.append(lote)
+        linhas += lote.num_rows
+        if linhas >= tamanho_chunk:
+            yield _para_pandas(lotes)
+            lotes, linhas = [], 0
+    if lotes:
+        yield _para_pandas(lotes)
+
+
+def _para_pandas(lotes) -> pd.DataFrame:
+    # Strings ficam na memória do Arrow (StringDtype "pyarrow"): as operações .str são vetorizadas em C++
+    return pa.Table.from_batches(lotes).to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+
+
+def ler_csv_do_zip_em_chunks(arquivo_zip, colunas: Sequence[str], separador: str = ';', encoding: str = 'utf-8',
+                             tamanho_chunk: int = None) -> Iterator[pd.DataFrame]:
+    with zipfile.ZipFile(arquivo_zip) as z:
+        # Encontra o primeiro arquivo .csv dentro do .zip
+        nome_csv = next((f for f in z.namelist() if f.endswith('.csv')), None)
+        if not nome_csv:
+            raise FileNotFoundError("Nenhum arquivo .csv encontrado dentro do .zip baixado.")
+
+        print(f"   - Arquivo CSV encontrado no ZIP: '{nome_csv}'")
+        # Lê o CSV descompactando sob demanda, sem extrair o arquivo inteiro
+        with z.open(nome_csv) as f:
+            yield from ler_csv_em_chunks(f, colunas, separador, encoding, tamanho_chunk)
@@ -0,0 +1,176 @@
+import asyncio
+import contextvars
+import json
+import time
+from typing import Optional
+
+from fastapi import HTTPException
+
+from config import settings
+from servicos.metricas import Contador, Medidor, registro
+
+# Instante (time.monotonic) em que a requisição atual deixa de interessar ao cliente
+_prazo_requisicao: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("prazo_requisicao", default=None)
+
+admissao_rejeitadas = registro.registrar(Contador(
+    "ecobot_admissao_rejeitadas_total", "Requisições recusadas com 503 por fila cheia ou espera esgotada, por classe.",
+    ("classe", "motivo")
+))
+admissao_ocupacao = registro.registrar(Medidor(
+    "ecobot_admissao_ocupacao", "Vagas em uso e requisições na fila de cada classe de concorrência.", ("classe", "estado")
+))
+requisicoes_interrompidas = registro.registrar(Contador(
+    "ecobot_http_requisicoes_interrompidas_total", "Requisições canceladas por prazo esgotado ou cliente desconectado.",
+    ("motivo",)
+))
+
+
+def tempo_restante() -> Optional[float]:
+    prazo = _prazo_requisicao.get()
+    return None if prazo is None else max(0.0, prazo - time.monotonic())
+
+
+## CLASSES DE CONCORRÊNCIA (CONTROLE DE ADMISSÃO POR TIPO DE ENDPOINT) ##
+class ClasseConcorrencia:
+    """Limita quantas requisições de uma classe acessam o banco ao mesmo tempo.
+
+    Usada como dependência do FastAPI: a vaga é ocupada durante a requisição. Acima do limite a
+    requisição espera numa fila limitada; com a fila cheia (ou a espera esgotada) a resposta é um
+    503 imediato com Retry-After, em vez de acumular trabalho que o banco não vai dar conta.
+    """
+
+    def __init__(self, nome: str, limite: int, fila_maxima: int, espera_maxima: float):
+        self.nome = nome
+        self.limite = limite
+        self.fila_maxima = fila_maxima
+        self.espera_maxima = espera_maxima
+        self.em_uso = 0
+        self.aguardando = 0
+        self._semaforo = asyncio.Semaphore(limite)
+
+    def _atualizar_medidores(self) -> None:
+        admissao_ocupacao.definir(self.nome, "em_uso", valor=self.em_uso)
+        admissao_ocupacao.definir(self.nome, "aguardando", valor=self.aguardando)
+
+    def _recusar(self, motivo: str) -> HTTPException:
+        admissao_rejeitadas.incrementar(self.nome, motivo)
+        return HTTPException(
+            status_code=503,
+            detail=f"Serviço sobrecarregado ({self.nome}). Tente novamente em instantes.",
+            headers={"Retry-After": str(settings.ADMISSAO_RETRY_AFTER)},
+        )
+
+    async def entrar(self) -> None:
+        if self._semaforo.locked():
+            if self.aguardando >= self.fila_maxima:
+                raise self._recusar("fila_cheia")
+            # Não adianta esperar por uma vaga além do prazo da própria requisição
+            restante = tempo_restante()
+            espera = self.espera_maxima if restante is None else min(self.espera_maxima, restante)
+            self.aguardando += 1
+            self._atualizar_medidores()
+            try:
+                await asyncio.wait_for(self._semaforo.acquire(), timeout=espera)
+            except asyncio.TimeoutError:
+                raise self._recusar("espera_esgotada")
+            finally:
+                self.aguardando -= 1
+        else:
+            await self._semaforo.acquire()
+        self.em_uso += 1
+        self._atualizar_medidores()
+
+    def sair(self) -> None:
+        self.em_uso -= 1
+        self._semaforo.release()
+        self._atualizar_medidores()
+
+    async def __call__(self):
+        await self.entrar()
+        try:
+            yield
+        finally:
+            self.sair()
+
+
+# Consultas por chave (documento, CNPJ, ids): baratas, com muitas vagas
+consultas_pontuais = ClasseConcorrencia(
+    "pontual", settings.ADMISSAO_PONTUAL_LIMITE, settings.ADMISSAO_PONTUAL_FILA, settings.ADMISSAO_ESPERA_MAXIMA
+)
+# Varreduras e buscas (ilike, listagens ordenadas, lotes): caras, com poucas vagas para não afogar as pontuais
+consultas_varredura = ClasseConcorrencia(
+    "varredura", settings.ADMISSAO_VARREDURA_LIMITE, settings.ADMISSAO_VARREDURA_FILA, settings.ADMISSAO_ESPERA_MAXIMA
+)
+# Exportações completas em streaming: longas, ocupam a vaga durante todo o envio
+consultas_exportacao = ClasseConcorrencia(
+    "exportacao", settings.ADMISSAO_EXPORTACAO_LIMITE, settings.ADMISSAO_EXPORTACAO_FILA, settings.ADMISSAO_ESPERA_MAXIMA
+)
+
+
+## MIDDLEWARE ASGI: PRAZO POR REQUISIÇÃO E CANCELAMENTO QUANDO O CLIENTE DESCONECTA ##
+class MiddlewarePrazo:
+    """Cancela o processamento (e as chamadas ao banco em andamento) quando o prazo da requisição
+    se esgota antes do início da resposta (504) ou quando o cliente desconecta."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.API_PRAZO_REQUISICAO:
+            await self.app(scope, receive, send)
+            return
+
+        token = _prazo_requisicao.set(time.monotonic() + settings.API_PRAZO_REQUISICAO)
+        mensagens: asyncio.Queue = asyncio.Queue()
+        desconectou = asyncio.Event()
+        respondeu = False
+
+        # Toda mensagem do servidor passa por aqui: o corpo segue para a aplicação e a desconexão é percebida na hora
+        async def escutar():
+            while True:
+                mensagem = await receive()
+                await mensagens.put(mensagem)
+                if mensagem["type"] == "http.disconnect":
+                    desconectou.set()
+                    return
+
+        async def enviar(mensagem):
+            nonlocal respondeu
+            if mensagem["type"] == "http.response.start":
+                respondeu = True
+            await send(mensagem)
+
+        aplicacao = asyncio.ensure_future(self.app(scope, mensagens.get, enviar))
+        escuta = asyncio.ensure_future(escutar())
+        desconexao = asyncio.ensure_future(desconectou.wait())
+        try:
+            await asyncio.wait({aplicacao, desconexao}, timeout=tempo_restante(), return_when=asyncio.FIRST_COMPLETED)
+            if respondeu and not aplicacao.done() and not desconectou.is_set():
+                # Resposta em streaming (exportação) já começou: o prazo vale até o primeiro byte,
+                # depois disso só a desconexão do cliente interrompe o envio
+                await asyncio.wait({aplicacao, desconexao}, return_when=asyncio.FIRST_COMPLETED)
+            if aplicacao.done():
+                aplicacao.result()
+                return
+
+            aplicacao.cancel()
+            try:
+                await aplicacao
+            except asyncio.CancelledError:
+                pass
+            if desconectou.is_set():
+                requisicoes_interrompidas.incrementar("cliente_desconectou")
+                return
+
+            requisicoes_interrompidas.incrementar("prazo_esgotado")
+            if not respondeu:
+                corpo = json.dumps({"detail": "O processamento excedeu o prazo da requisição."}).encode()
+                await send({"type": "http.response.start", "status": 504,
+                            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(corpo)).encode())]})
+                await send({"type": "http.response.body", "body": corpo})
+        finally:
+            if not aplicacao.done():
+                aplicacao.cancel()
+            escuta.cancel()
+            desconexao.cancel()
+            _prazo_requisicao.reset(token)
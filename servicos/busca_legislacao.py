@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from servicos.normalizacao import normalizar_texto
+from servicos.repositorio import obter_repositorio
+from servicos.versoes import versoes
+
+TABELA_LEGISLACAO = "legislacao_ambiental"
+COLUNAS_LEGISLACAO = "id,titulo,resumo,tipo_norma,link_oficial,palavras_chave"
+
+# Peso de cada campo na frequência do termo (BM25F simplificado): palavras-chave valem mais
+PESOS_CAMPOS = {"titulo": 2.0, "resumo": 1.0, "palavras_chave": 3.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = set(normalizar_texto("""
+    a o as os um uma uns umas de do da dos das em no na nos nas por pelo pela pelos pelas para
+    com sem sob sobre entre ate e ou que se ao aos como mais menos seu sua seus suas ser sao foi
+    este esta estes estas esse essa isso aquele aquela nao ja tambem quando onde qual quais
+""").split())
+
+# Sufixos removidos pelo radicalizador leve, do mais longo para o mais curto (inspirado no RSLP)
+_SUFIXOS = (
+    "amentos", "imentos", "amento", "imento", "adoras", "adores", "acoes", "mente", "idades",
+    "idade", "ancias", "ancia", "encias", "encia", "istas", "ista", "ismos", "ismo", "ivas", "ivos",
+    "iva", "ivo", "acao", "icas", "icos", "ica", "ico", "ais", "al", "eis", "oes", "aes", "ns", "es", "as",
+    "os", "a", "o", "e", "s",
+)
+_TOKEN = re.compile(r"[A-Z0-9]+")
+
+
+def radical(palavra: str) -> str:
+    # Mantém pelo menos 3 letras para não colapsar palavras curtas ("lei", "app")
+    for sufixo in _SUFIXOS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= 3:
+            return palavra[: -len(sufixo)]
+    return palavra
+
+
+def tokenizar(texto: Optional[str]) -> List[str]:
+    if not texto:
+        return []
+    return [
+        radical(t.lower()) for t in _TOKEN.findall(normalizar_texto(texto))
+        if t not in STOPWORDS and len(t) > 1
+    ]
+
+
+def _impressao(linha: Dict[str, Any]) -> str:
+    # Identifica se o conteúdo indexável de uma norma mudou entre duas cargas
+    conteudo = "\x1f".join(str(linha.get(c)) for c in ("titulo", "resumo", "palavras_chave", "tipo_norma", "link_oficial"))
+    return hashlib.sha1(conteudo.encode("utf-8")).hexdigest()
+
+
+## ÍNDICE INVERTIDO EM MEMÓRIA COM RANKING BM25 ##
+class IndiceBM25:
+    """Índice invertido das normas; documentos podem ser incluídos e removidos individualmente."""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._termos_doc: Dict[int, List[str]] = {}
+        self._tamanho_doc: Dict[int, float] = {}
+        self._impressoes: Dict[int, str] = {}
+        self.documentos: Dict[int, Dict[str, Any]] = {}
+        self._soma_tamanhos = 0.0
+
+    def __len__(self) -> int:
+        return len(self.documentos)
+
+    def remover(self, id_doc: int) -> None:
+        for termo in self._termos_doc.pop(id_doc, []):
+            postings = self._postings.get(termo)
+            if postings is not None:
+                postings.pop(id_doc, None)
+                if not postings:
+                    del self._postings[termo]
+        self._soma_tamanhos -= self._tamanho_doc.pop(id_doc, 0.0)
+        self._impressoes.pop(id_doc, None)
+        self.documentos.pop(id_doc, None)
+
+    def adicionar(self, linha: Dict[str, Any]) -> None:
+        id_doc = linha["id"]
+        self.remover(id_doc)
+
+        frequencias: Counter = Counter()
+        for campo, peso in PESOS_CAMPOS.items():
+            valor = linha.get(campo)
+            texto = " ".join(valor) if isinstance(valor, list) else valor
+            for termo in tokenizar(texto):
+                frequencias[termo] += peso
+
+        for termo, frequencia in frequencias.items():
+            self._postings[termo][id_doc] = frequencia
+        tamanho = sum(frequencias.values())
+        self._termos_doc[id_doc] = list(frequencias)
+        self._tamanho_doc[id_doc] = tamanho
+        self._soma_tamanhos += tamanho
+        self._impressoes[id_doc] = _impressao(linha)
+        self.documentos[id_doc] = linha
+
+    def sincronizar(self, linhas: List[Dict[str, Any]]) -> Tuple[int, int]:
+        # Reindexa só as normas novas ou alteradas e remove as que saíram da tabela
+        ids_atuais = {linha["id"] for linha in linhas}
+        removidos = [id_doc for id_doc in self.documentos if id_doc not in ids_atuais]
+        for id_doc in removidos:
+            self.remover(id_doc)
+        alterados = 0
+        for linha in linhas:
+            if self._impressoes.get(linha["id"]) != _impressao(linha):
+                self.adicionar(linha)
+                alterados += 1
+        return alterados, len(removidos)
+
+    def buscar(self, consulta: str, limite: int = 10) -> List[Tuple[Dict[str, Any], float]]:
+        termos = set(tokenizar(consulta))
+        total_docs = len(self.documentos)
+        if not termos or not total_docs:
+            return []
+
+        tamanho_medio = self._soma_tamanhos / total_docs
+        pontuacoes: Dict[int, float] = defaultdict(float)
+        for termo in termos:
+            postings = self._postings.get(termo)
+            if not postings:
+                continue
+            idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for id_doc, frequencia in postings.items():
+                normalizacao = BM25_K1 * (1 - BM25_B + BM25_B * self._tamanho_doc[id_doc] / tamanho_medio)
+                pontuacoes[id_doc] += idf * frequencia * (BM25_K1 + 1) / (frequencia + normalizacao)
+
+        melhores = sorted(pontuacoes.items(), key=lambda item: (-item[1], item[0]))[:limite]
+        return [(self.documentos[id_doc], round(pontuacao, 4)) for id_doc, pontuacao in melhores]
+
+
+class BuscaLegislacao:
+    """Mantém o índice BM25 sincronizado com a versão da tabela publicada pelo ETL."""
+
+    def __init__(self):
+        self.indice = IndiceBM25()
+        self._versao_carregada: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    async def garantir_atualizado(self) -> None:
+        versao = await versoes.obter(TABELA_LEGISLACAO)
+        if versao == self._versao_carregada:
+            return
+        async with self._lock:
+            if versao == self._versao_carregada:
+                return
+            linhas = await obter_repositorio().selecionar_todos(TABELA_LEGISLACAO, colunas=COLUNAS_LEGISLACAO)
+            # Roda no próprio loop: o catálogo é pequeno e só as normas alteradas são retokenizadas
+            self.indice.sincronizar(linhas)
+            self._versao_carregada = versao
+
+    async def buscar(self, consulta: str, limite: int = 10) -> List[Tuple[Dict[str, Any], float]]:
+        await self.garantir_atualizado()
+        return self.indice.buscar(consulta, limite)
+
+
+busca_legislacao = BuscaLegislacao()
@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from servicos.busca_legislacao import TABELA_LEGISLACAO, tokenizar
+from servicos.repositorio import obter_repositorio
+from servicos.versoes import versoes
+
+COLUNAS_SEMANTICA = "id,titulo,resumo,tipo_norma,link_oficial,palavras_chave,embedding"
+
+
+def texto_para_embedding(linha: Dict[str, Any]) -> str:
+    # Mesmo texto usado pelo ETL ao gravar a coluna 'embedding' e pela API ao codificar normas sem vetor
+    palavras = " ".join(linha.get("palavras_chave") or [])
+    return ". ".join(p for p in (linha.get("titulo"), linha.get("resumo"), palavras) if p)
+
+
+class CodificadorIndisponivel(RuntimeError):
+    """O modelo de embeddings configurado não pode ser carregado (pacote ausente ou modelo não baixado)."""
+
+
+## CODIFICADORES DE TEXTO (PLUGÁVEIS) ##
+class CodificadorHash:
+    """Codificador determinístico (hashing de termos e bigramas), sem modelo e sem semântica: só para testes
+    e benchmarks, nunca como busca semântica de verdade."""
+
+    def __init__(self, dimensao: int):
+        self.dimensao = dimensao
+
+    def _vetor(self, texto: str) -> np.ndarray:
+        vetor = np.zeros(self.dimensao, dtype=np.float32)
+        termos = tokenizar(texto)
+        for termo in termos + [f"{a}_{b}" for a, b in zip(termos, termos[1:])]:
+            digest = hashlib.blake2b(termo.encode("utf-8"), digest_size=8).digest()
+            posicao = int.from_bytes(digest[:4], "little") % self.dimensao
+            vetor[posicao] += 1.0 if digest[4] & 1 else -1.0
+        return vetor
+
+    def codificar(self, textos: List[str]) -> np.ndarray:
+        return _normalizar(np.vstack([self._vetor(t) for t in textos]) if textos else np.zeros((0, self.dimensao), np.float32))
+
+
+class CodificadorSentenceTransformers:
+    """Modelo local do sentence-transformers (carregado sob demanda, roda sem acesso à internet se já baixado)."""
+
+    def __init__(self, modelo: str, dimensao: int):
+        self.modelo = modelo
+        self.dimensao = dimensao
+        self._modelo = None
+
+    def codificar(self, textos: List[str]) -> np.ndarray:
+        if self._modelo is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._modelo = SentenceTransformer(self.modelo)
+            except (ImportError, OSError) as e:
+                raise CodificadorIndisponivel(f"modelo '{self.modelo}' indisponível: {e}") from e
+        vetores = self._modelo.encode(textos, normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(vetores, dtype=np.float32)
+
+
+def criar_codificador(nome: Optional[str] = None):
+    nome = nome or settings.EMBEDDING_CODIFICADOR
+    if nome == "hash":
+        return CodificadorHash(settings.EMBEDDING_DIMENSAO)
+    if nome == "sentence-transformers":
+        return CodificadorSentenceTransformers(settings.EMBEDDING_MODELO, settings.EMBEDDING_DIMENSAO)
+    raise ValueError(f"Codificador de embeddings desconhecido: '{nome}'")
+
+
+def _normalizar(matriz: np.ndarray) -> np.ndarray:
+    normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+    normas[normas == 0] = 1.0
+    return (matriz / normas).astype(np.float32, copy=False)
+
+
+def _vetor_do_banco(valor: Any) -> Optional[List[float]]:
+    # O pgvector chega pelo PostgREST como texto "[0.1,0.2,...]"
+    if valor is None:
+        return None
+    return json.loads(valor) if isinstance(valor, str) else list(valor)
+
+
+## ÍNDICE VETORIAL EM MEMÓRIA (SIMILARIDADE DE COSSENO) ##
+class IndiceVetorial:
+    """Matriz float32 contígua com os vetores normalizados; busca exata em lote ou aproximada (IVF)."""
+
+    def __init__(self, vetores: np.ndarray, documentos: List[Dict[str, Any]], minimo_ann: int, sondas: int):
+        self.vetores = np.ascontiguousarray(_normalizar(vetores))
+        self.documentos = documentos
+        self.tipos = np.array([(d.get("tipo_norma") or "").lower() for d in documentos])
+        self._sondas = sondas
+        self._centroides: Optional[np.ndarray] = None
+        self._listas: List[np.ndarray] = []
+        if len(documentos) >= minimo_ann:
+            self._treinar_ivf()
+
+    def __len__(self) -> int:
+        return len(self.documentos)
+
+    def _treinar_ivf(self, iteracoes: int = 10) -> None:
+        # K-means simples: cada vetor fica na lista do centróide mais próximo
+        quantidade = max(1, int(np.sqrt(len(self.documentos))))
+        gerador = np.random.default_rng(0)
+        centroides = self.vetores[gerador.choice(len(self.vetores), quantidade, replace=False)]
+        for _ in range(iteracoes):
+            atribuicao = np.argmax(self.vetores @ centroides.T, axis=1)
+            for i in range(quantidade):
+                membros = self.vetores[atribuicao == i]
+                if len(membros):
+                    centroides[i] = membros.mean(axis=0)
+            centroides = _normalizar(centroides)
+        atribuicao = np.argmax(self.vetores @ centroides.T, axis=1)
+        self._centroides = centroides
+        self._listas = [np.flatnonzero(atribuicao == i) for i in range(quantidade)]
+
+    def _candidatos(self, consulta: np.ndarray) -> np.ndarray:
+        if self._centroides is None:
+            return np.arange(len(self.documentos))
+        sondas = min(self._sondas, len(self._centroides))
+        proximos = np.argsort(-(self._centroides @ consulta))[:sondas]
+        return np.concatenate([self._listas[i] for i in proximos])
+
+    def buscar(self, consulta: np.ndarray, limite: int, tipo_norma: Optional[str] = None) -> List[Tuple[Dict[str, Any], float]]:
+        candidatos = self._candidatos(consulta)
+        if tipo_norma:
+            candidatos = candidatos[self.tipos[candidatos] == tipo_norma.lower()]
+        if not len(candidatos):
+            return []
+
+        similaridades = self.vetores[candidatos] @ consulta
+        limite = min(limite, len(candidatos))
+        melhores = np.argpartition(-similaridades, limite - 1)[:limite]
+        melhores = melhores[np.argsort(-similaridades[melhores])]
+        return [(self.documentos[candidatos[i]], round(float(similaridades[i]), 4)) for i in melhores]
+
+
+class BuscaSemantica:
+    """Carrega os embeddings da tabela e mantém o índice alinhado à versão publicada pelo ETL."""
+
+    def __init__(self, codificador=None):
+        self._codificador = codificador
+        self.indice: Optional[IndiceVetorial] = None
+        self._versao_carregada: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def codificador(self):
+        if self._codificador is None:
+            self._codificador = criar_codificador()
+        return self._codificador
+
+    def _montar_indice(self, linhas: List[Dict[str, Any]]) -> IndiceVetorial:
+        vetores = [_vetor_do_banco(linha.pop("embedding", None)) for linha in linhas]
+        # Normas ainda sem embedding gravado pelo ETL são codificadas aqui com o mesmo codificador
+        faltantes = [i for i, v in enumerate(vetores) if v is None]
+        if faltantes:
+            codificados = self.codificador.codificar([texto_para_embedding(linhas[i]) for i in faltantes])
+            for i, vetor in zip(faltantes, codificados):
+                vetores[i] = vetor
+        matriz = np.asarray(vetores, dtype=np.float32).reshape(len(linhas), settings.EMBEDDING_DIMENSAO)
+        return IndiceVetorial(matriz, linhas, settings.EMBEDDING_ANN_MINIMO, settings.EMBEDDING_ANN_SONDAS)
+
+    async def garantir_atualizado(self) -> None:
+        versao = await versoes.obter(TABELA_LEGISLACAO)
+        if versao == self._versao_carregada:
+            return
+        async with self._lock:
+            if versao == self._versao_carregada:
+                return
+            linhas = await obter_repositorio().selecionar_todos(TABELA_LEGISLACAO, colunas=COLUNAS_SEMANTICA)
+            # Montagem e codificação são CPU pura: rodam numa thread e o índice novo é trocado de uma vez
+            self.indice = await asyncio.to_thread(self._montar_indice, linhas)
+            self._versao_carregada = versao
+
+    async def buscar(self, consulta: str, limite: int = 10, tipo_norma: Optional[str] = None) -> List[Tuple[Dict[str, Any], float]]:
+        await self.garantir_atualizado()
+        vetor = (await asyncio.to_thread(self.codificador.codificar, [consulta]))[0]
+        return self.indice.buscar(vetor, limite, tipo_norma)
+
+
+busca_semantica = BuscaSemantica()
@@ -0,0 +1,52 @@
+from typing import Any, Dict, Hashable, Tuple
+
+from cachetools import TTLCache
+
+from config import settings
+
+
+## CACHE EM MEMÓRIA (TTL + LRU) DOS RESULTADOS DE CONSULTA ##
+class CacheConsultas:
+    """Cache limitado por tamanho (descarta o menos usado) e por tempo de vida das entradas.
+
+    As chaves começam sempre pelo nome da tabela, o que permite descartar tudo
+    de uma tabela quando o ETL publica uma nova versão do dataset.
+    """
+
+    def __init__(self, tamanho_maximo: int, ttl_segundos: float):
+        self._cache: TTLCache = TTLCache(maxsize=tamanho_maximo, ttl=ttl_segundos)
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave: Tuple[Hashable, ...]) -> Tuple[bool, Any]:
+        try:
+            valor = self._cache[chave]
+        except KeyError:
+            self.falhas += 1
+            return False, None
+        self.acertos += 1
+        return True, valor
+
+    def guardar(self, chave: Tuple[Hashable, ...], valor: Any) -> None:
+        self._cache[chave] = valor
+
+    def invalidar_tabela(self, tabela: str, _versao: int = 0) -> None:
+        for chave in [c for c in list(self._cache.keys()) if c[0] == tabela]:
+            self._cache.pop(chave, None)
+
+    def limpar(self) -> None:
+        self._cache.clear()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        total = self.acertos + self.falhas
+        return {
+            "entradas": len(self._cache),
+            "tamanho_maximo": int(self._cache.maxsize),
+            "ttl_segundos": self._cache.ttl,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / total, 4) if total else 0.0,
+        }
+
+
+cache_consultas = CacheConsultas(settings.CACHE_TAMANHO_MAXIMO, settings.CACHE_TTL_SEGUNDOS)
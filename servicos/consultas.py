@@ -0,0 +1,173 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import settings
+from servicos.cache import cache_consultas
+from servicos.documentos_conhecidos import documentos_conhecidos
+from servicos.municipios import municipios
+from servicos.projecao import incluir_coluna, projetar
+from servicos.repositorio import Filtro, obter_repositorio, eq, gt, ilike, in_
+from servicos.snapshot import snapshots
+from servicos.versoes import versoes
+
+# Quando o ETL publica uma nova versão, as entradas antigas da tabela saem do cache
+versoes.ao_mudar(cache_consultas.invalidar_tabela)
+
+
+## CONSULTA POR DOCUMENTO (CPF/CNPJ): SNAPSHOT LOCAL -> ÍNDICE DE DOCUMENTOS -> CACHE -> SUPABASE ##
+async def buscar_por_documento(
+    tabela: str, coluna: str, documento: str, limite: Optional[int] = None, colunas: str = "*"
+) -> List[Dict[str, Any]]:
+    dados = snapshots.buscar_por_chave(tabela, coluna, documento, limite)
+    if dados is not None:
+        return projetar(dados, colunas)
+
+    # A maioria dos documentos consultados não tem registros: o índice local responde sem ir ao banco
+    if not await documentos_conhecidos.pode_existir(tabela, coluna, documento):
+        return []
+
+    versao = await versoes.obter(tabela)
+    chave = (tabela, versao, coluna, documento, limite, colunas)
+
+    encontrado, dados = cache_consultas.obter(chave)
+    if encontrado:
+        return dados
+
+    resultado = await obter_repositorio().selecionar(
+        tabela, colunas=colunas, filtros=[eq(coluna, documento)], limite=limite
+    )
+    # Resultados vazios também são guardados: a maioria dos documentos consultados não tem registros
+    cache_consultas.guardar(chave, resultado.dados)
+    return resultado.dados
+
+
+async def buscar_autuacoes(documento: str, colunas: str = "*") -> List[Dict[str, Any]]:
+    return await buscar_por_documento('autuacoes_ibama', 'cpf_cnpj', documento, colunas=colunas)
+
+
+async def buscar_embargos(documento: str, colunas: str = "*") -> List[Dict[str, Any]]:
+    return await buscar_por_documento('termos_embargo', 'cpf_cnpj', documento, colunas=colunas)
+
+
+async def buscar_ctf(cnpj: str, colunas: str = "*") -> Optional[Dict[str, Any]]:
+    dados = await buscar_por_documento('cadastro_tecnico_federal', 'cnpj', cnpj, limite=1, colunas=colunas)
+    return dados[0] if dados else None
+
+
+## CONSULTA DE MUITOS DOCUMENTOS DE UMA VEZ (TRIAGEM EM LOTE) ##
+async def buscar_por_documentos(
+    tabela: str, coluna: str, documentos: Sequence[str], limite: Optional[int] = None, colunas: str = "*"
+) -> Dict[str, List[Dict[str, Any]]]:
+    # Mesmo caminho da consulta individual (snapshot -> índice -> cache -> Supabase), mas os documentos que
+    # faltam são buscados com filtros in.(...) em lotes, em vez de uma requisição por documento
+    colunas = incluir_coluna(colunas, coluna)
+    snapshot = snapshots.obter(tabela)
+    if snapshot is not None and snapshot.chave == coluna:
+        return {documento: projetar(snapshot.buscar_por_chave(documento, limite), colunas) for documento in documentos}
+
+    versao = await versoes.obter(tabela)
+    resultado: Dict[str, List[Dict[str, Any]]] = {}
+    faltantes: List[str] = []
+    for documento in documentos:
+        if not await documentos_conhecidos.pode_existir(tabela, coluna, documento):
+            resultado[documento] = []
+            continue
+        encontrado, dados = cache_consultas.obter((tabela, versao, coluna, documento, limite, colunas))
+        if encontrado:
+            resultado[documento] = dados
+        else:
+            faltantes.append(documento)
+
+    if faltantes:
+        repositorio = obter_repositorio()
+        tamanho = settings.CONSULTA_LOTE_DOCUMENTOS
+        lotes = [faltantes[i:i + tamanho] for i in range(0, len(faltantes), tamanho)]
+        # Cada lote é paginado por 'id', pois um documento pode ter mais linhas que o limite do PostgREST
+        colunas_lote = incluir_coluna(colunas, 'id')
+        respostas = await asyncio.gather(*(
+            repositorio.selecionar_todos(tabela, colunas=colunas_lote, filtros=[in_(coluna, lote)]) for lote in lotes
+        ))
+        linhas_por_documento: Dict[str, List[Dict[str, Any]]] = {documento: [] for documento in faltantes}
+        for linhas in respostas:
+            for linha in linhas:
+                linhas_por_documento[linha[coluna]].append(linha)
+        for documento, linhas in linhas_por_documento.items():
+            linhas = linhas[:limite] if limite is not None else linhas
+            cache_consultas.guardar((tabela, versao, coluna, documento, limite, colunas), linhas)
+            resultado[documento] = linhas
+
+    return resultado
+
+
+async def triagem_documentos(
+    documentos: Sequence[str], colunas_autuacoes: str = "*", colunas_embargos: str = "*", colunas_ctf: str = "*"
+) -> Dict[str, Dict[str, Any]]:
+    # Autuações, embargos e CTF (só para CNPJs) dos documentos, com as três tabelas consultadas em paralelo
+    cnpjs = [d for d in documentos if len(d) == 14]
+    autuacoes, embargos, ctf = await asyncio.gather(
+        buscar_por_documentos('autuacoes_ibama', 'cpf_cnpj', documentos, colunas=colunas_autuacoes),
+        buscar_por_documentos('termos_embargo', 'cpf_cnpj', documentos, colunas=colunas_embargos),
+        buscar_por_documentos('cadastro_tecnico_federal', 'cnpj', cnpjs, limite=1, colunas=colunas_ctf),
+    )
+    return {
+        documento: {
+            "autuacoes": autuacoes[documento],
+            "embargos": embargos[documento],
+            "ctf": (ctf.get(documento) or [None])[0],
+        }
+        for documento in documentos
+    }
+
+
+## LISTAGENS PAGINADAS POR CHAVE (KEYSET EM 'id') ##
+@dataclass
+class Pagina:
+    itens: List[Dict[str, Any]]
+    next_cursor: Optional[int] = None
+    total: Optional[int] = None
+
+
+async def buscar_pagina(
+    tabela: str,
+    filtros: Sequence[Filtro],
+    limite: int,
+    cursor: Optional[int] = None,
+    contar: bool = False,
+    colunas: str = "*",
+) -> Pagina:
+    repositorio = obter_repositorio()
+    filtros_pagina = list(filtros) + ([gt('id', cursor)] if cursor is not None else [])
+
+    # Busca uma linha a mais para saber se existe próxima página sem precisar contar.
+    # O 'id' é sempre buscado, pois é o cursor da próxima página
+    consultas = [repositorio.selecionar(
+        tabela, colunas=incluir_coluna(colunas, 'id'), filtros=filtros_pagina, ordem='id.asc', limite=limite + 1
+    )]
+    if contar:
+        # A contagem ignora o cursor: é o total da consulta, não o que resta a paginar
+        consultas.append(repositorio.selecionar(tabela, colunas='id', filtros=filtros, limite=0, contar=True))
+    resultados = await asyncio.gather(*consultas)
+
+    itens = resultados[0].dados
+    proximo_cursor = None
+    if len(itens) > limite:
+        itens = itens[:limite]
+        proximo_cursor = itens[-1]['id']
+
+    return Pagina(itens=itens, next_cursor=proximo_cursor, total=resultados[1].total if contar else None)
+
+
+## FILTRO POR MUNICÍPIO: IGUALDADE NA CHAVE NORMALIZADA (COLUNA INDEXADA) ##
+async def filtros_por_municipio(nome: str, uf: Optional[str] = None) -> Tuple[List[Filtro], List[str]]:
+    # Retorna os filtros da consulta e, quando o nome não pôde ser resolvido, sugestões de municípios
+    await municipios.garantir_carregado()
+
+    if not municipios.disponivel:
+        # Sem o dicionário (ex.: ETL ainda não gerou as chaves), volta à busca por substring
+        return [ilike('municipio', f'*{nome}*')] + ([eq('uf', uf.upper())] if uf else []), []
+
+    resolucao = municipios.resolver(nome, uf)
+    if not resolucao.chaves:
+        return [], resolucao.sugestoes
+    return [in_('municipio_chave', resolucao.chaves)], []
@@ -0,0 +1,145 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from servicos.metricas import Contador, registro
+from servicos.versoes import versoes
+
+# Tabelas com índice de documentos: a coluna indexada de cada uma
+TABELAS_INDICE: Dict[str, str] = {
+    "autuacoes_ibama": "cpf_cnpj",
+    "termos_embargo": "cpf_cnpj",
+}
+
+negativos_locais = registro.registrar(Contador(
+    "ecobot_documentos_negativos_locais_total",
+    "Consultas por documento respondidas como vazias pelo índice local, sem acessar o banco.", ("tabela",)
+))
+
+
+def caminho_indice(tabela: str, versao: int) -> Path:
+    # A versão faz parte do nome: a API só usa o arquivo da versão publicada que ela conhece
+    return Path(settings.INDICE_DOCUMENTOS_DIR) / f"{tabela}.documentos.{versao}.npy"
+
+
+## CODIFICAÇÃO DO CPF/CNPJ EM UM INTEIRO DE 64 BITS ##
+# O bit menos significativo separa CPF de CNPJ, para '00012345678901' (CNPJ) não colidir com '12345678901' (CPF)
+def codificar(documento: str) -> Optional[int]:
+    if len(documento) not in (11, 14) or not documento.isdigit():
+        return None
+    return int(documento) << 1 | (len(documento) == 14)
+
+
+def codificar_serie(documentos) -> np.ndarray:
+    # Versão vetorizada para as colunas (pandas.Series) do ETL; documentos fora do formato são ignorados
+    documentos = documentos.dropna().astype(str)
+    documentos = documentos[documentos.str.fullmatch(r"\d{11}|\d{14}")]
+    numeros = documentos.astype("uint64").to_numpy()
+    return (numeros << np.uint64(1)) | (documentos.str.len() == 14).to_numpy().astype("uint64")
+
+
+## ACUMULA OS DOCUMENTOS DE CADA PEDAÇO E GRAVA O VETOR ORDENADO (LADO DO ETL) ##
+class AcumuladorDocumentos:
+    """Conjunto dos documentos presentes na tabela, gravado como um vetor uint64 ordenado e sem repetições."""
+
+    def __init__(self, coluna: str):
+        self.coluna = coluna
+        self._partes: List[np.ndarray] = []
+
+    def adicionar(self, df) -> None:
+        self._partes.append(np.unique(codificar_serie(df[self.coluna])))
+        # Compacta de tempos em tempos para a memória acompanhar os documentos distintos, não as linhas
+        if len(self._partes) >= 20:
+            self._partes = [self.documentos()]
+
+    def documentos(self) -> np.ndarray:
+        if not self._partes:
+            return np.empty(0, dtype=np.uint64)
+        return np.unique(np.concatenate(self._partes))
+
+    def gravar(self, tabela: str, versao: int) -> int:
+        documentos = self.documentos()
+        destino = caminho_indice(tabela, versao)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        # Grava em arquivo temporário e troca atomicamente, para a API nunca ler um arquivo pela metade
+        temporario = destino.with_suffix(".tmp")
+        with open(temporario, "wb") as arquivo:
+            np.save(arquivo, documentos)
+        os.replace(temporario, destino)
+        return len(documentos)
+
+
+def remover_indices_antigos(tabela: str, versao: int) -> None:
+    """Apaga os índices de versões anteriores, mantendo a versão publicada e a imediatamente anterior.
+
+    Chamado só depois do registro da versão: até lá a API continua usando o índice da versão anterior,
+    e os workers que ainda não viram a nova versão (intervalo de verificação) também precisam dele.
+    """
+    versoes_gravadas = {}
+    for arquivo in caminho_indice(tabela, versao).parent.glob(f"{tabela}.documentos.*.npy"):
+        try:
+            versoes_gravadas[int(arquivo.name.split(".")[-2])] = arquivo
+        except ValueError:
+            continue
+    anteriores = sorted(v for v in versoes_gravadas if v < versao)
+    for antiga in anteriores[:-1]:
+        versoes_gravadas[antiga].unlink(missing_ok=True)
+
+
+## CONSULTA AO ÍNDICE (LADO DA API) ##
+class IndiceDocumentos:
+    """Responde localmente que um documento não tem registros numa tabela, antes de qualquer consulta ao banco.
+
+    O vetor é aberto por memory-map (compartilhado entre os workers pelo cache do SO) e consultado por
+    busca binária. Sem o arquivo da versão publicada, ou para documentos fora do formato, a resposta é
+    sempre 'pode existir', e a consulta segue para o Supabase como antes.
+    """
+
+    def __init__(self):
+        # Por tabela: (versão, vetor ordenado ou None se o arquivo dessa versão não existe)
+        self._carregados: Dict[str, Tuple[int, Optional[np.ndarray]]] = {}
+
+    def _carregar(self, tabela: str, versao: int) -> Optional[np.ndarray]:
+        try:
+            documentos = np.load(caminho_indice(tabela, versao), mmap_mode="r")
+        except (OSError, ValueError) as e:
+            print(f"Aviso: índice de documentos de '{tabela}' (versão {versao}) indisponível: {e}")
+            documentos = None
+        self._carregados[tabela] = (versao, documentos)
+        return documentos
+
+    async def _vetor(self, tabela: str) -> Optional[np.ndarray]:
+        versao = await versoes.obter(tabela)
+        if not versao:
+            return None
+        carregado = self._carregados.get(tabela)
+        if carregado is not None and carregado[0] == versao:
+            return carregado[1]
+        return await asyncio.to_thread(self._carregar, tabela, versao)
+
+    async def garantir_atualizado(self) -> None:
+        # Abre os índices da versão publicada já na subida da API
+        if settings.INDICE_DOCUMENTOS_ATIVO:
+            for tabela in TABELAS_INDICE:
+                await self._vetor(tabela)
+
+    async def pode_existir(self, tabela: str, coluna: str, documento: str) -> bool:
+        if not settings.INDICE_DOCUMENTOS_ATIVO or TABELAS_INDICE.get(tabela) != coluna:
+            return True
+        codigo = codificar(documento)
+        documentos = await self._vetor(tabela) if codigo is not None else None
+        if documentos is None:
+            return True
+
+        posicao = int(np.searchsorted(documentos, np.uint64(codigo)))
+        encontrado = posicao < len(documentos) and int(documentos[posicao]) == codigo
+        if not encontrado:
+            negativos_locais.incrementar(tabela)
+        return encontrado
+
+
+documentos_conhecidos = IndiceDocumentos()
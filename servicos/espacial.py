@@ -0,0 +1,127 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+
+from config import settings
+from servicos.repositorio import in_, obter_repositorio
+from servicos.versoes import versoes
+
+try:
+    import shapely
+except ImportError:  # shapely é opcional: sem ele as consultas espaciais ficam indisponíveis
+    shapely = None
+
+TABELA_EMBARGOS = "termos_embargo"
+COLUNAS_RETANGULO = "id,bbox_xmin,bbox_ymin,bbox_xmax,bbox_ymax"
+
+
+def _geometria_do_banco(valor: str):
+    # O PostgREST devolve o BYTEA como texto hexadecimal com o prefixo '\x'
+    return shapely.from_wkb(bytes.fromhex(valor[2:] if valor.startswith("\\x") else valor))
+
+
+## ÍNDICE ESPACIAL EM MEMÓRIA (STR-TREE) DOS RETÂNGULOS DOS EMBARGOS ##
+class IndiceEspacial:
+    """Árvore STR só com os retângulos envolventes (colunas bbox_* gravadas pelo ETL). A árvore dá os
+    candidatos; as geometrias são buscadas sob demanda apenas para o teste exato de interseção."""
+
+    def __init__(self, ids: np.ndarray, retangulos: np.ndarray):
+        self.ids = ids
+        self._arvore = shapely.STRtree(retangulos)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def candidatos(self, geometria) -> List[int]:
+        return sorted(int(i) for i in self.ids[self._arvore.query(geometria)])
+
+
+def _montar_indice(linhas: List[Dict[str, Any]]) -> IndiceEspacial:
+    ids = np.array([linha["id"] for linha in linhas], dtype=np.int64)
+    limites = np.array(
+        [(linha["bbox_xmin"], linha["bbox_ymin"], linha["bbox_xmax"], linha["bbox_ymax"]) for linha in linhas],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+    return IndiceEspacial(ids, shapely.box(limites[:, 0], limites[:, 1], limites[:, 2], limites[:, 3]))
+
+
+def _decodificar(linhas: List[Dict[str, Any]]) -> Dict[int, Any]:
+    # Linhas sem WKB (geometria inválida na origem) ficam com None e nunca intersectam
+    return {
+        linha["id"]: _geometria_do_banco(linha["wkb_geometria"]) if linha.get("wkb_geometria") else None
+        for linha in linhas
+    }
+
+
+class BuscaEspacial:
+    """Mantém o índice dos retângulos alinhado à versão de 'termos_embargo' publicada pelo ETL, com um
+    cache LRU das geometrias já decodificadas (trocado junto com o índice a cada nova versão)."""
+
+    def __init__(self):
+        self.indice: Optional[IndiceEspacial] = None
+        self._geometrias: LRUCache = LRUCache(maxsize=settings.ESPACIAL_CACHE_GEOMETRIAS)
+        self._versao_carregada: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def disponivel(self) -> bool:
+        return shapely is not None
+
+    async def garantir_atualizado(self) -> None:
+        if not self.disponivel:
+            return
+        versao = await versoes.obter(TABELA_EMBARGOS)
+        if versao == self._versao_carregada:
+            return
+        async with self._lock:
+            if versao == self._versao_carregada:
+                return
+            linhas = await obter_repositorio().selecionar_todos(
+                TABELA_EMBARGOS, colunas=COLUNAS_RETANGULO, filtros=[("bbox_xmin", "not.is.null")]
+            )
+            # Montar a árvore é CPU pura: roda numa thread e índice e cache são trocados de uma vez
+            indice = await asyncio.to_thread(_montar_indice, linhas)
+            self.indice, self._geometrias = indice, LRUCache(maxsize=settings.ESPACIAL_CACHE_GEOMETRIAS)
+            self._versao_carregada = versao
+
+    async def _obter_geometrias(self, ids: List[int], cache: LRUCache) -> Dict[int, Any]:
+        geometrias = {i: cache[i] for i in ids if i in cache}
+        faltantes = [i for i in ids if i not in geometrias]
+        if faltantes:
+            repositorio = obter_repositorio()
+            tamanho = settings.CONSULTA_LOTE_DOCUMENTOS
+            respostas = await asyncio.gather(*(
+                repositorio.selecionar(TABELA_EMBARGOS, colunas="id,wkb_geometria", filtros=[in_("id", faltantes[i:i + tamanho])])
+                for i in range(0, len(faltantes), tamanho)
+            ))
+            linhas = [linha for resposta in respostas for linha in resposta.dados]
+            novas = await asyncio.to_thread(_decodificar, linhas)
+            for i, geometria in novas.items():
+                cache[i] = geometria
+            geometrias.update(novas)
+        return geometrias
+
+    async def _intersectando(self, geometria) -> List[int]:
+        await self.garantir_atualizado()
+        # Índice e cache lidos juntos: uma troca de versão no meio da consulta não mistura os dois
+        indice, cache = self.indice, self._geometrias
+        ids = indice.candidatos(geometria)
+        if not ids:
+            return []
+        geometrias = await self._obter_geometrias(ids, cache)
+        candidatos: List[Tuple[int, Any]] = [(i, geometrias[i]) for i in ids if geometrias.get(i) is not None]
+        if not candidatos:
+            return []
+        exatos = shapely.intersects(np.array([g for _, g in candidatos], dtype=object), geometria)
+        return [i for (i, _), intersecta in zip(candidatos, exatos) if intersecta]
+
+    async def embargos_no_ponto(self, longitude: float, latitude: float) -> List[int]:
+        return await self._intersectando(shapely.Point(longitude, latitude))
+
+    async def embargos_na_area(self, xmin: float, ymin: float, xmax: float, ymax: float) -> List[int]:
+        return await self._intersectando(shapely.box(xmin, ymin, xmax, ymax))
+
+
+busca_espacial = BuscaEspacial()
@@ -0,0 +1,127 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from servicos.repositorio import eq, lte, obter_repositorio
+from servicos.versoes import versoes
+
+# Tabelas gravadas pelo ETL com os agregados e os rankings de cada dataset
+TABELA_ESTATISTICAS = "estatisticas_agregadas"
+TABELA_RANKING = "ranking_documentos"
+COLUNAS_ESTATISTICAS = "id,uf,municipio_chave,ano,mes,quantidade,quantidade_com_valor,valor_total,valor_medio,valor_maximo"
+COLUNAS_RANKING = "id,uf,ano,posicao,cpf_cnpj,nome,quantidade,valor_total"
+
+# Conjuntos expostos na API -> dataset de origem
+CONJUNTOS = {"autuacoes": "autuacoes_ibama", "embargos": "termos_embargo"}
+
+_CAMPOS_AGREGADO = ("quantidade", "quantidade_com_valor", "valor_total", "valor_medio", "valor_maximo")
+
+
+@dataclass
+class EstatisticasDataset:
+    versao: Optional[int] = None  # versão a que os números se referem (None: ETL ainda não calculou)
+    # (uf, ano, mes) -> agregado; dimensão None = todas
+    por_uf: Dict[Tuple[Optional[str], Optional[int], Optional[int]], Dict[str, Any]] = field(default_factory=dict)
+    # (municipio_chave, ano, mes) -> agregado
+    por_municipio: Dict[Tuple[str, Optional[int], Optional[int]], Dict[str, Any]] = field(default_factory=dict)
+    # (uf, ano) -> ranking já ordenado pela posição
+    rankings: Dict[Tuple[Optional[str], Optional[int]], List[Dict[str, Any]]] = field(default_factory=dict)
+
+
+def _agregado(linha: Dict[str, Any]) -> Dict[str, Any]:
+    return {campo: linha.get(campo) for campo in _CAMPOS_AGREGADO}
+
+
+def _montar(versao: int, linhas: List[Dict[str, Any]], ranking: List[Dict[str, Any]]) -> EstatisticasDataset:
+    dados = EstatisticasDataset(versao=versao)
+    for linha in linhas:
+        if linha["municipio_chave"] is not None:
+            dados.por_municipio[(linha["municipio_chave"], linha["ano"], linha["mes"])] = _agregado(linha)
+        else:
+            dados.por_uf[(linha["uf"], linha["ano"], linha["mes"])] = _agregado(linha)
+    for linha in sorted(ranking, key=lambda l: l["posicao"]):
+        item = {c: linha[c] for c in ("posicao", "cpf_cnpj", "nome", "quantidade", "valor_total")}
+        dados.rankings.setdefault((linha["uf"], linha["ano"]), []).append(item)
+    return dados
+
+
+def _combinar(agregados: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # Soma de municípios homônimos (mesmo nome em UFs diferentes): a média é recalculada pelos totais
+    valores = [a["valor_total"] for a in agregados if a["valor_total"] is not None]
+    maximos = [a["valor_maximo"] for a in agregados if a["valor_maximo"] is not None]
+    quantidade_com_valor = sum(a["quantidade_com_valor"] for a in agregados)
+    valor_total = round(sum(valores), 2) if valores else None
+    return {
+        "quantidade": sum(a["quantidade"] for a in agregados),
+        "quantidade_com_valor": quantidade_com_valor,
+        "valor_total": valor_total,
+        "valor_medio": round(valor_total / quantidade_com_valor, 2) if valor_total is not None and quantidade_com_valor else None,
+        "valor_maximo": max(maximos) if maximos else None,
+    }
+
+
+## ESTATÍSTICAS PRÉ-CALCULADAS EM MEMÓRIA (CONSULTA POR CHAVE, SEM VARRER A TABELA) ##
+class EstatisticasAgregadas:
+    """Carrega os agregados e rankings gravados pelo ETL e os mantém alinhados à versão de cada dataset."""
+
+    def __init__(self):
+        self._dados: Dict[str, EstatisticasDataset] = {}
+        self._versoes_carregadas: Dict[str, int] = {}
+        self._lock = asyncio.Lock()
+
+    async def garantir_atualizado(self, tabela: Optional[str] = None) -> None:
+        for nome in ([tabela] if tabela else CONJUNTOS.values()):
+            versao = await versoes.obter(nome)
+            if versao == self._versoes_carregadas.get(nome):
+                continue
+            async with self._lock:
+                if versao != self._versoes_carregadas.get(nome):
+                    self._dados[nome] = await self._carregar(nome, versao)
+                    self._versoes_carregadas[nome] = versao
+
+    async def _carregar(self, tabela: str, versao: int) -> EstatisticasDataset:
+        repositorio = obter_repositorio()
+        # A última versão calculada até a publicada: se o ETL não conseguiu gravar as estatísticas
+        # da carga mais recente, as da anterior continuam valendo
+        resultado = await repositorio.selecionar(
+            TABELA_ESTATISTICAS, colunas="versao", filtros=[eq("tabela", tabela), lte("versao", versao)],
+            ordem="versao.desc", limite=1,
+        )
+        if not resultado.dados:
+            return EstatisticasDataset()
+        versao_dados = int(resultado.dados[0]["versao"])
+        filtros = [eq("tabela", tabela), eq("versao", versao_dados)]
+        linhas, ranking = await asyncio.gather(
+            repositorio.selecionar_todos(TABELA_ESTATISTICAS, colunas=COLUNAS_ESTATISTICAS, filtros=filtros),
+            repositorio.selecionar_todos(TABELA_RANKING, colunas=COLUNAS_RANKING, filtros=filtros),
+        )
+        return _montar(versao_dados, linhas, ranking)
+
+    async def obter(self, tabela: str) -> EstatisticasDataset:
+        await self.garantir_atualizado(tabela)
+        return self._dados.get(tabela) or EstatisticasDataset()
+
+    async def consultar(
+        self,
+        tabela: str,
+        uf: Optional[str] = None,
+        municipios: Optional[List[str]] = None,
+        ano: Optional[int] = None,
+        mes: Optional[int] = None,
+    ) -> Tuple[Optional[int], Dict[str, Any]]:
+        dados = await self.obter(tabela)
+        # Combinação sem nenhum registro não é gravada pelo ETL: equivale a zero
+        vazio = {"quantidade": 0, "quantidade_com_valor": 0, "valor_total": None, "valor_medio": None, "valor_maximo": None}
+        if municipios:
+            agregados = [dados.por_municipio.get((chave, ano, mes)) for chave in municipios]
+            return dados.versao, _combinar([a or vazio for a in agregados])
+        return dados.versao, dict(dados.por_uf.get((uf, ano, mes)) or vazio)
+
+    async def ranking(
+        self, tabela: str, uf: Optional[str] = None, ano: Optional[int] = None, limite: int = 10
+    ) -> Tuple[Optional[int], List[Dict[str, Any]]]:
+        dados = await self.obter(tabela)
+        return dados.versao, dados.rankings.get((uf, ano), [])[:limite]
+
+
+estatisticas = EstatisticasAgregadas()
@@ -0,0 +1,143 @@
+import csv
+import io
+import json
+import zlib
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from config import settings
+from servicos.projecao import incluir_coluna
+from servicos.repositorio import Filtro, obter_repositorio
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele as linhas usam o json padrão
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele a exportação é comprimida só com gzip
+    brotli = None
+
+FORMATOS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+## SERIALIZAÇÃO DE UMA PÁGINA DE LINHAS ##
+def _ndjson(linhas: List[Dict[str, Any]]) -> bytes:
+    if orjson is not None:
+        return b"".join(orjson.dumps(linha) + b"\n" for linha in linhas)
+    return "".join(json.dumps(linha, ensure_ascii=False, default=str) + "\n" for linha in linhas).encode()
+
+
+class _EscritorCsv:
+    """Escreve páginas de linhas em CSV; o cabeçalho sai antes da primeira página."""
+
+    def __init__(self, colunas: Sequence[str]):
+        self.colunas = list(colunas)
+        self._buffer = io.StringIO()
+        self._escritor = csv.DictWriter(self._buffer, fieldnames=self.colunas, extrasaction="ignore")
+
+    def _esvaziar(self) -> bytes:
+        texto = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return texto.encode()
+
+    def cabecalho(self) -> bytes:
+        self._escritor.writeheader()
+        return self._esvaziar()
+
+    def pagina(self, linhas: List[Dict[str, Any]]) -> bytes:
+        self._escritor.writerows(linhas)
+        return self._esvaziar()
+
+
+## COMPRESSÃO NEGOCIADA PELO Accept-Encoding ##
+class _Compressor:
+    def __init__(self, codificacao: str):
+        self.codificacao = codificacao
+        if codificacao == "br":
+            self._br = brotli.Compressor(quality=settings.EXPORTACAO_NIVEL_BROTLI)
+        else:
+            # wbits=31: formato gzip (cabeçalho e CRC), não o zlib cru
+            self._zlib = zlib.compressobj(settings.EXPORTACAO_NIVEL_GZIP, zlib.DEFLATED, 31)
+
+    def comprimir(self, dados: bytes) -> bytes:
+        # Cada página sai já comprimida (flush), para o cliente receber os bytes sem esperar o fim
+        if self.codificacao == "br":
+            return self._br.process(dados) + self._br.flush()
+        return self._zlib.compress(dados) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finalizar(self) -> bytes:
+        return self._br.finish() if self.codificacao == "br" else self._zlib.flush(zlib.Z_FINISH)
+
+
+def _aceitas(cabecalho: str) -> Dict[str, float]:
+    # 'gzip;q=0.8, br' -> {'gzip': 0.8, 'br': 1.0}
+    aceitas = {}
+    for item in cabecalho.split(","):
+        nome, _, parametros = item.strip().partition(";")
+        peso = 1.0
+        if parametros.strip().startswith("q="):
+            try:
+                peso = float(parametros.strip()[2:])
+            except ValueError:
+                peso = 0.0
+        if nome:
+            aceitas[nome.strip().lower()] = peso
+    return aceitas
+
+
+def escolher_codificacao(cabecalho: Optional[str]) -> Optional[str]:
+    # Prefere brotli (menor) quando disponível; 'identity' (sem compressão) se o cliente não aceitar nenhuma
+    aceitas = _aceitas(cabecalho or "")
+    candidatas = (["br"] if brotli is not None else []) + ["gzip"]
+    melhores = [c for c in candidatas if aceitas.get(c, aceitas.get("*", 0.0)) > 0]
+    return max(melhores, key=lambda c: aceitas.get(c, aceitas.get("*", 0.0)), default=None)
+
+
+## EXPORTAÇÃO EM STREAMING (NDJSON/CSV), PÁGINA A PÁGINA DO BANCO ##
+async def _corpo(paginas: AsyncIterator[List[Dict[str, Any]]], formato: str, colunas: List[str],
+                 codificacao: Optional[str]) -> AsyncIterator[bytes]:
+    compressor = _Compressor(codificacao) if codificacao else None
+    escritor = _EscritorCsv(colunas) if formato == "csv" else None
+
+    async def blocos() -> AsyncIterator[bytes]:
+        if escritor is not None:
+            yield escritor.cabecalho()
+        async for pagina in paginas:
+            yield escritor.pagina(pagina) if escritor is not None else _ndjson(pagina)
+
+    async for bloco in blocos():
+        bloco = compressor.comprimir(bloco) if compressor is not None else bloco
+        if bloco:
+            yield bloco
+    if compressor is not None:
+        yield compressor.finalizar()
+
+
+def exportar(request: Request, tabela: str, filtros: Sequence[Filtro], colunas: str, formato: str,
+             nome_arquivo: str) -> StreamingResponse:
+    """Resposta que percorre a consulta no banco por páginas do 'id' e envia cada página assim que chega.
+
+    A memória usada não depende do tamanho do resultado: só uma página fica em memória de cada vez.
+    """
+    # O 'id' é a chave da paginação interna, então sempre vai junto
+    colunas = incluir_coluna(colunas, "id")
+    nomes_colunas = colunas.split(",")
+    paginas = obter_repositorio().percorrer(
+        tabela, colunas=colunas, filtros=filtros, tamanho_pagina=settings.EXPORTACAO_TAMANHO_PAGINA
+    )
+    codificacao = escolher_codificacao(request.headers.get("accept-encoding"))
+
+    cabecalhos = {
+        "Content-Disposition": f'attachment; filename="{nome_arquivo}.{formato}"',
+        "Vary": "Accept-Encoding",
+    }
+    if codificacao:
+        cabecalhos["Content-Encoding"] = codificacao
+    return StreamingResponse(
+        _corpo(paginas, formato, nomes_colunas, codificacao), media_type=FORMATOS[formato], headers=cabecalhos
+    )
@@ -0,0 +1,130 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from servicos.normalizacao import normalizar_texto
+from servicos.repositorio import obter_repositorio
+from servicos.versoes import versoes
+
+TABELA_GLOSSARIO = "termos_glossario"
+COLUNAS_GLOSSARIO = "id,termo,definicao,categoria"
+
+
+def distancia_edicao(a: str, b: str, maximo: int) -> int:
+    # Levenshtein com corte: devolve maximo + 1 assim que a distância passa do limite
+    if abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        atual = [i]
+        for j, cb in enumerate(b, 1):
+            atual.append(min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        if min(atual) > maximo:
+            return maximo + 1
+        anterior = atual
+    return anterior[-1]
+
+
+def tolerancia(termo: str) -> int:
+    # Siglas curtas aceitam um erro; termos maiores, dois
+    return 1 if len(termo) <= 5 else 2
+
+
+class _NoTrie:
+    __slots__ = ("filhos", "termo")
+
+    def __init__(self):
+        self.filhos: Dict[str, "_NoTrie"] = {}
+        self.termo: Optional[str] = None
+
+
+## ÍNDICE EM MEMÓRIA DO GLOSSÁRIO: MAPA NORMALIZADO + TRIE PARA AUTOCOMPLETAR ##
+class IndiceGlossario:
+    def __init__(self, linhas: List[Dict[str, Any]]):
+        self._por_termo: Dict[str, Dict[str, Any]] = {}
+        self._raiz = _NoTrie()
+        for linha in linhas:
+            chave = normalizar_texto(linha["termo"])
+            self._por_termo[chave] = linha
+            no = self._raiz
+            for caractere in chave:
+                no = no.filhos.setdefault(caractere, _NoTrie())
+            no.termo = chave
+
+    def __len__(self) -> int:
+        return len(self._por_termo)
+
+    def obter(self, termo: str) -> Optional[Dict[str, Any]]:
+        return self._por_termo.get(normalizar_texto(termo))
+
+    def com_prefixo(self, prefixo: str, limite: int) -> List[str]:
+        no = self._raiz
+        for caractere in normalizar_texto(prefixo):
+            no = no.filhos.get(caractere)
+            if no is None:
+                return []
+        # Percorre a subárvore em ordem alfabética até completar o limite
+        encontrados: List[str] = []
+        pilha = [no]
+        while pilha and len(encontrados) < limite:
+            atual = pilha.pop()
+            if atual.termo is not None:
+                encontrados.append(self._por_termo[atual.termo]["termo"])
+            pilha.extend(atual.filhos[c] for c in sorted(atual.filhos, reverse=True))
+        return encontrados
+
+    def aproximados(self, termo: str, limite: int) -> List[Dict[str, Any]]:
+        chave = normalizar_texto(termo)
+        maximo = tolerancia(chave)
+        candidatos = []
+        for outro, linha in self._por_termo.items():
+            distancia = distancia_edicao(chave, outro, maximo)
+            if distancia <= maximo:
+                candidatos.append((distancia, outro, linha))
+        candidatos.sort(key=lambda c: (c[0], c[1]))
+        return [{"distancia": d, "linha": linha} for d, _, linha in candidatos[:limite]]
+
+
+class Glossario:
+    """Glossário carregado na subida da API e recarregado quando a versão da tabela muda."""
+
+    def __init__(self):
+        self.indice = IndiceGlossario([])
+        self._versao_carregada: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    async def garantir_atualizado(self) -> None:
+        versao = await versoes.obter(TABELA_GLOSSARIO)
+        if versao == self._versao_carregada:
+            return
+        async with self._lock:
+            if versao == self._versao_carregada:
+                return
+            linhas = await obter_repositorio().selecionar_todos(TABELA_GLOSSARIO, colunas=COLUNAS_GLOSSARIO)
+            self.indice = IndiceGlossario(linhas)
+            self._versao_carregada = versao
+
+    async def buscar(self, termo: str) -> Optional[Dict[str, Any]]:
+        await self.garantir_atualizado()
+        linha = self.indice.obter(termo)
+        if linha is not None:
+            return linha
+        # Erro de digitação: aceita o termo mais próximo só quando ele é o único com a menor distância
+        aproximados = self.indice.aproximados(termo, 2)
+        if len(aproximados) == 1 or (len(aproximados) == 2 and aproximados[0]["distancia"] < aproximados[1]["distancia"]):
+            return aproximados[0]["linha"]
+        return None
+
+    async def sugestoes(self, termo: str, limite: int = 5) -> List[str]:
+        await self.garantir_atualizado()
+        sugestoes = [a["linha"]["termo"] for a in self.indice.aproximados(termo, limite)]
+        for candidato in self.indice.com_prefixo(termo, limite):
+            if candidato not in sugestoes:
+                sugestoes.append(candidato)
+        return sugestoes[:limite]
+
+    async def autocompletar(self, prefixo: str, limite: int = 10) -> List[str]:
+        await self.garantir_atualizado()
+        return self.indice.com_prefixo(prefixo, limite)
+
+
+glossario = Glossario()
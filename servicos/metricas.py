@@ -0,0 +1,225 @@
+import bisect
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.routing import Match
+
+from config import settings
+
+Rotulos = Tuple[str, ...]
+
+# Limites (segundos) dos histogramas de latência: de 1 ms a 10 s
+LIMITES_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence[str], extra: str = "") -> str:
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+## MÉTRICAS NO FORMATO DE TEXTO DO PROMETHEUS ##
+class Contador:
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores: Dict[Rotulos, float] = {}
+
+    def incrementar(self, *valores: str, quantidade: float = 1.0) -> None:
+        self._valores[valores] = self._valores.get(valores, 0.0) + quantidade
+
+    def amostras(self) -> Iterator[str]:
+        for valores, total in sorted(self._valores.items()):
+            yield f"{self.nome}{_formatar_rotulos(self.rotulos, valores)} {_formatar_numero(total)}"
+
+
+class Medidor(Contador):
+    """Valor que sobe e desce (ex.: requisições em andamento)."""
+    tipo = "gauge"
+
+    def definir(self, *valores: str, valor: float) -> None:
+        self._valores[valores] = valor
+
+
+class Histograma:
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (), limites: Sequence[float] = LIMITES_LATENCIA):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.limites = tuple(sorted(limites))
+        # Por combinação de rótulos: contagem de cada faixa (não acumulada), soma e total de observações
+        self._series: Dict[Rotulos, Tuple[List[int], List[float]]] = {}
+
+    def observar(self, valor: float, *valores: str) -> None:
+        faixas, soma = self._series.setdefault(valores, ([0] * (len(self.limites) + 1), [0.0]))
+        faixas[bisect.bisect_left(self.limites, valor)] += 1
+        soma[0] += valor
+
+    def amostras(self) -> Iterator[str]:
+        for valores, (faixas, soma) in sorted(self._series.items()):
+            acumulado = 0
+            for limite, quantidade in zip(self.limites + (float("inf"),), faixas):
+                acumulado += quantidade
+                rotulos = _formatar_rotulos(self.rotulos, valores, f'le="{_formatar_numero(limite)}"')
+                yield f"{self.nome}_bucket{rotulos} {acumulado}"
+            yield f"{self.nome}_sum{_formatar_rotulos(self.rotulos, valores)} {soma[0]!r}"
+            yield f"{self.nome}_count{_formatar_rotulos(self.rotulos, valores)} {acumulado}"
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._metricas: Dict[str, object] = {}
+
+    def registrar(self, metrica):
+        self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def expor(self) -> str:
+        linhas = []
+        for metrica in self._metricas.values():
+            linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(metrica.amostras())
+        return "\n".join(linhas) + "\n"
+
+
+registro = RegistroMetricas()
+
+requisicoes_total = registro.registrar(Contador(
+    "ecobot_http_requisicoes_total", "Requisições HTTP atendidas, por rota, método e status.", ("rota", "metodo", "status")
+))
+requisicoes_duracao = registro.registrar(Histograma(
+    "ecobot_http_requisicao_duracao_segundos", "Latência das requisições HTTP, por rota e método.", ("rota", "metodo")
+))
+requisicoes_em_andamento = registro.registrar(Medidor(
+    "ecobot_http_requisicoes_em_andamento", "Requisições HTTP sendo atendidas no momento, por rota e método.",
+    ("rota", "metodo")
+))
+backend_duracao = registro.registrar(Histograma(
+    "ecobot_backend_duracao_segundos", "Latência das chamadas ao Supabase/PostgREST, por tabela e operação.",
+    ("tabela", "operacao")
+))
+backend_erros = registro.registrar(Contador(
+    "ecobot_backend_erros_total", "Chamadas ao Supabase/PostgREST que falharam, por tabela e operação.",
+    ("tabela", "operacao")
+))
+consultas_coalescidas = registro.registrar(Contador(
+    "ecobot_backend_coalescidas_total", "Consultas que aguardaram uma chamada idêntica já em andamento, por tabela.",
+    ("tabela",)
+))
+cache_consultas_eventos = registro.registrar(Medidor(
+    "ecobot_cache_consultas", "Acertos, falhas e entradas do cache de consultas.", ("tipo",)
+))
+
+
+## TEMPOS DA REQUISIÇÃO ATUAL (CABEÇALHO Server-Timing) ##
+# Lista de (nome, segundos) da requisição em andamento; as tarefas criadas por ela herdam a mesma lista
+_tempos_requisicao: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "tempos_requisicao", default=None
+)
+
+
+@contextmanager
+def medir_backend(tabela: str, operacao: str) -> Iterator[None]:
+    inicio = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        backend_erros.incrementar(tabela, operacao)
+        raise
+    finally:
+        duracao = time.perf_counter() - inicio
+        backend_duracao.observar(duracao, tabela, operacao)
+        tempos = _tempos_requisicao.get()
+        if tempos is not None:
+            tempos.append((f"db_{tabela}_{operacao}", duracao))
+
+
+def registrar_tempo(nome: str, duracao: float) -> None:
+    # Entrada do Server-Timing que não é uma chamada medida por medir_backend (ex.: espera por uma consulta
+    # coalescida, que roda no contexto da requisição que a disparou)
+    tempos = _tempos_requisicao.get()
+    if tempos is not None:
+        tempos.append((nome, duracao))
+
+
+def _cabecalho_server_timing(tempos: List[Tuple[str, float]], total: float) -> bytes:
+    # Chamadas repetidas à mesma tabela/operação são somadas numa única entrada
+    somas: Dict[str, List[float]] = {}
+    for nome, duracao in tempos:
+        soma = somas.setdefault(nome, [0.0, 0])
+        soma[0] += duracao
+        soma[1] += 1
+    partes = [f'{nome};desc="{int(n)}x";dur={s * 1000:.1f}' for nome, (s, n) in somas.items()]
+    partes.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(partes).encode("latin-1")
+
+
+def _rota(scope) -> str:
+    # O modelo da rota ('/api/embargos/documento/{cpf_cnpj}'), nunca o caminho real: limita a cardinalidade.
+    # A rota é resolvida antes de a requisição ser atendida, para o medidor de requisições em andamento
+    # usar o mesmo rótulo na entrada e na saída
+    app = scope.get("app")
+    parcial = None
+    for rota in getattr(getattr(app, "router", None), "routes", ()):
+        correspondencia, _ = rota.matches(scope)
+        if correspondencia == Match.FULL:
+            return rota.path
+        if correspondencia == Match.PARTIAL and parcial is None:
+            parcial = rota.path  # caminho certo com o método errado (405)
+    return parcial or "nao_mapeada"
+
+
+## MIDDLEWARE ASGI DE INSTRUMENTAÇÃO ##
+class MiddlewareMetricas:
+    """Mede cada requisição HTTP e acrescenta o cabeçalho Server-Timing com os tempos do backend."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICAS_ATIVAS:
+            await self.app(scope, receive, send)
+            return
+
+        metodo = scope["method"]
+        rota = _rota(scope)
+        inicio = time.perf_counter()
+        tempos: List[Tuple[str, float]] = []
+        token = _tempos_requisicao.set(tempos)
+        status = 500
+        requisicoes_em_andamento.incrementar(rota, metodo)
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+                cabecalho = _cabecalho_server_timing(tempos, time.perf_counter() - inicio)
+                mensagem["headers"] = list(mensagem.get("headers", [])) + [(b"server-timing", cabecalho)]
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _tempos_requisicao.reset(token)
+            requisicoes_em_andamento.incrementar(rota, metodo, quantidade=-1)
+            requisicoes_total.incrementar(rota, metodo, str(status))
+            requisicoes_duracao.observar(time.perf_counter() - inicio, rota, metodo)
@@ -0,0 +1,125 @@
+import asyncio
+import bisect
+import difflib
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from servicos.normalizacao import normalizar_texto
+from servicos.repositorio import obter_repositorio
+from servicos.versoes import versoes
+
+# View materializada com as chaves distintas de 'autuacoes_ibama' e 'termos_embargo'
+VIEW_MUNICIPIOS = "municipios_chaves"
+TABELAS_ORIGEM = ("autuacoes_ibama", "termos_embargo")
+
+# "Belém - PA", "Belem/pa", "belem pa" -> nome e UF separados
+_SUFIXO_UF = re.compile(r'^(.+?)\s+([A-Z]{2})$')
+_LIMITE_SUGESTOES = 5
+
+
+@dataclass
+class ResolucaoMunicipio:
+    chaves: List[str] = field(default_factory=list)
+    sugestoes: List[str] = field(default_factory=list)
+
+
+## DICIONÁRIO EM MEMÓRIA DOS MUNICÍPIOS (NOME NORMALIZADO -> CHAVES EXATAS) ##
+class DicionarioMunicipios:
+    """Resolve o texto digitado pelo usuário para as chaves exatas da coluna 'municipio_chave'."""
+
+    def __init__(self):
+        self._por_nome: Dict[str, List[str]] = {}
+        self._nomes_ordenados: List[str] = []
+        self._exibicao: Dict[str, str] = {}
+        self._ufs: set = set()
+        self._versao_carregada: Optional[Tuple[int, ...]] = None
+        # Depois de uma falha de carga, instante (time.monotonic) a partir do qual uma nova tentativa é feita
+        self._proxima_tentativa = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def disponivel(self) -> bool:
+        return bool(self._por_nome)
+
+    async def garantir_carregado(self) -> None:
+        versao = tuple([await versoes.obter(t) for t in TABELAS_ORIGEM])
+        if versao == self._versao_carregada or time.monotonic() < self._proxima_tentativa:
+            return
+        async with self._lock:
+            if versao == self._versao_carregada or time.monotonic() < self._proxima_tentativa:
+                return
+            try:
+                linhas = await obter_repositorio().selecionar_todos(
+                    VIEW_MUNICIPIOS, colunas="municipio_chave,municipio,uf", chave="municipio_chave"
+                )
+            except Exception as e:
+                # Sem o dicionário as rotas voltam à busca por substring (ou ao dicionário da versão anterior).
+                # A versão não é marcada como carregada: uma falha passageira é tentada de novo após a espera
+                print(f"Aviso: não foi possível carregar o dicionário de municípios: {e}")
+                self._proxima_tentativa = time.monotonic() + settings.MUNICIPIOS_ESPERA_NOVA_TENTATIVA
+                return
+            self._proxima_tentativa = 0.0
+            self._carregar(linhas)
+            self._versao_carregada = versao
+
+    def _carregar(self, linhas) -> None:
+        por_nome: Dict[str, List[str]] = {}
+        exibicao: Dict[str, str] = {}
+        for linha in linhas:
+            chave = linha["municipio_chave"]
+            nome, _, uf = chave.rpartition("/")
+            por_nome.setdefault(nome, []).append(chave)
+            exibicao[chave] = f"{linha.get('municipio') or nome} - {uf}"
+        self._por_nome = por_nome
+        self._nomes_ordenados = sorted(por_nome)
+        self._exibicao = exibicao
+        self._ufs = {chave.rpartition("/")[2] for chave in exibicao}
+
+    def _chaves_do_nome(self, nome: str, uf: Optional[str]) -> List[str]:
+        chaves = self._por_nome.get(nome, [])
+        return [c for c in chaves if c.endswith(f"/{uf}")] if uf else list(chaves)
+
+    def _nomes_com_prefixo(self, prefixo: str) -> List[str]:
+        inicio = bisect.bisect_left(self._nomes_ordenados, prefixo)
+        nomes = []
+        for nome in self._nomes_ordenados[inicio:]:
+            if not nome.startswith(prefixo):
+                break
+            nomes.append(nome)
+        return nomes
+
+    def resolver(self, texto: str, uf: Optional[str] = None) -> ResolucaoMunicipio:
+        nome = normalizar_texto(texto)
+        uf = uf.strip().upper() if uf else None
+
+        # A UF pode vir junto do nome ("Belém - PA") quando o nome completo não é um município
+        sufixo = _SUFIXO_UF.match(nome)
+        if not uf and nome not in self._por_nome and sufixo and sufixo.group(2) in self._ufs:
+            nome, uf = sufixo.group(1), sufixo.group(2)
+
+        # 1) nome exato (o mesmo nome pode existir em várias UFs)
+        chaves = self._chaves_do_nome(nome, uf)
+        if chaves:
+            return ResolucaoMunicipio(chaves=chaves)
+
+        # 2) prefixo, aceito apenas quando leva a um único município
+        candidatos = [n for n in self._nomes_com_prefixo(nome) if self._chaves_do_nome(n, uf)] if nome else []
+        # 3) aproximação por similaridade para erros de digitação
+        if not candidatos and nome:
+            candidatos = [
+                n for n in difflib.get_close_matches(nome, self._nomes_ordenados, n=_LIMITE_SUGESTOES, cutoff=0.8)
+                if self._chaves_do_nome(n, uf)
+            ]
+        if len(candidatos) == 1:
+            return ResolucaoMunicipio(chaves=self._chaves_do_nome(candidatos[0], uf))
+
+        sugestoes = [
+            self._exibicao[c] for n in candidatos[:_LIMITE_SUGESTOES] for c in self._chaves_do_nome(n, uf)
+        ]
+        return ResolucaoMunicipio(sugestoes=sugestoes[:_LIMITE_SUGESTOES])
+
+
+municipios = DicionarioMunicipios()
@@ -0,0 +1,56 @@
+import re
+import unicodedata
+from typing import Optional
+
+_NAO_ALFANUMERICO = re.compile(r'[^A-Z0-9]+')
+
+
+## FUNÇÕES DE NORMALIZAÇÃO COMPARTILHADAS ENTRE OS ROUTERS E O ETL ##
+
+def limpar_documento(documento: str) -> str:
+    # Mantém apenas os dígitos do CPF/CNPJ (remove pontos, barras e traços)
+    return "".join(filter(str.isdigit, documento))
+
+
+def digito_verificador(digitos: str, pesos) -> str:
+    resto = sum(int(d) * p for d, p in zip(digitos, pesos)) % 11
+    return "0" if resto < 2 else str(11 - resto)
+
+
+def documento_valido(documento: str, verificar_digitos: bool = True) -> bool:
+    # CPF (11 dígitos) ou CNPJ (14 dígitos), já limpo, com os dois dígitos verificadores (módulo 11) corretos
+    if len(documento) not in (11, 14) or not documento.isdigit():
+        return False
+    if not verificar_digitos:
+        return True
+    if documento == documento[0] * len(documento):
+        return False
+    if len(documento) == 11:
+        pesos = range(10, 1, -1)
+        primeiro = digito_verificador(documento[:9], pesos)
+        return documento[9:] == primeiro + digito_verificador(documento[:9] + primeiro, range(11, 1, -1))
+    pesos = (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+    primeiro = digito_verificador(documento[:12], pesos)
+    return documento[12:] == primeiro + digito_verificador(documento[:12] + primeiro, (6,) + pesos)
+
+
+def normalizar_texto(texto: str) -> str:
+    # "São João d'Aliança" -> "SAO JOAO D ALIANCA": sem acentos, maiúsculo e só letras/dígitos
+    sem_acentos = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return _NAO_ALFANUMERICO.sub(' ', sem_acentos.upper()).strip()
+
+
+def chave_municipio(nome: str, uf: Optional[str]) -> str:
+    # Chave exata gravada pelo ETL na coluna 'municipio_chave', ex.: "SAO PAULO/SP"
+    return f"{normalizar_texto(nome)}/{(uf or '').strip().upper()}"
+
+
+def chave_municipio_serie(municipios, ufs):
+    # Versão vetorizada de chave_municipio para as colunas (pandas.Series) do ETL
+    nomes = (
+        municipios.astype(str)
+        .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+        .str.upper().str.replace(_NAO_ALFANUMERICO.pattern, ' ', regex=True).str.strip()
+    )
+    chaves = nomes + '/' + ufs.astype(str).str.strip().str.upper()
+    return chaves.where(municipios.notna() & ufs.notna())
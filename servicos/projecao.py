@@ -0,0 +1,59 @@
+from typing import List, Optional, Sequence, Type
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+
+from schemas.sch_base_consultas import AutuacaoSchema, CadastroTecnicoFederalSchema, TermoEmbargoSchema
+
+
+## PROJEÇÃO DE COLUNAS (?fields=) A PARTIR DO SCHEMA DE RESPOSTA ##
+class CamposConsulta:
+    """Dependência que traduz o parâmetro ?fields= na lista de colunas pedida ao banco.
+
+    Sem o parâmetro, só as colunas declaradas pelo schema são buscadas (menos as excluídas por padrão,
+    como a geometria dos embargos). Campos obrigatórios do schema, como 'id', vêm sempre.
+    """
+
+    def __init__(self, schema: Type[BaseModel], excluir_por_padrao: Sequence[str] = ()):
+        self.permitidos: List[str] = list(schema.model_fields)
+        self.obrigatorios = [nome for nome, campo in schema.model_fields.items() if campo.is_required()]
+        self.colunas_padrao = ",".join(c for c in self.permitidos if c not in excluir_por_padrao)
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(
+            None, description="Campos a retornar, separados por vírgula (ex.: 'data_auto,valor_multa')"
+        ),
+    ) -> str:
+        if not fields:
+            return self.colunas_padrao
+        pedidos = [c.strip() for c in fields.split(",") if c.strip()]
+        desconhecidos = [c for c in pedidos if c not in self.permitidos]
+        if desconhecidos:
+            raise HTTPException(
+                status_code=400,
+                detail={"mensagem": f"Campos desconhecidos: {', '.join(desconhecidos)}", "campos_disponiveis": self.permitidos},
+            )
+        return ",".join(dict.fromkeys(self.obrigatorios + pedidos))
+
+
+def projetar(linhas: List[dict], colunas: str) -> List[dict]:
+    # Aplica a projeção a linhas que já vieram completas (ex.: do snapshot local)
+    if colunas == "*":
+        return linhas
+    nomes = colunas.split(",")
+    return [{c: linha.get(c) for c in nomes} for linha in linhas]
+
+
+def incluir_coluna(colunas: str, coluna: str) -> str:
+    # Garante uma coluna necessária internamente (ex.: o documento, para agrupar a triagem)
+    if colunas == "*" or coluna in colunas.split(","):
+        return colunas
+    return f"{colunas},{coluna}"
+
+
+## COLUNAS DAS CONSULTAS QUE JUNTAM VÁRIAS FONTES (DOSSIÊ E TRIAGEM) ##
+# Só as colunas que os schemas de resposta declaram (sem a geometria dos embargos)
+COLUNAS_AUTUACOES = CamposConsulta(AutuacaoSchema).colunas_padrao
+COLUNAS_EMBARGOS = CamposConsulta(TermoEmbargoSchema, excluir_por_padrao=("wkt_geometria",)).colunas_padrao
+COLUNAS_CTF = CamposConsulta(CadastroTecnicoFederalSchema).colunas_padrao
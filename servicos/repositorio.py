@@ -0,0 +1,249 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import httpx
+
+from config import settings
+from servicos.metricas import consultas_coalescidas, medir_backend, registrar_tempo
+
+# Um filtro do PostgREST é um par (coluna, "operador.valor"), ex.: ("cpf_cnpj", "eq.123")
+Filtro = Tuple[str, str]
+
+# Caracteres que obrigam o valor a ser colocado entre aspas nas listas do PostgREST
+_CARACTERES_RESERVADOS = set(',.:()" \\')
+
+
+class ErroBancoDados(Exception):
+    """Falha de comunicação ou erro retornado pelo PostgREST do Supabase."""
+
+
+@dataclass
+class ResultadoConsulta:
+    dados: List[Dict[str, Any]]
+    total: Optional[int] = None
+
+
+## FUNÇÕES AUXILIARES PARA MONTAR OS FILTROS ##
+def _valor_lista(valor: Any) -> str:
+    texto = str(valor)
+    if any(c in _CARACTERES_RESERVADOS for c in texto):
+        texto = '"' + texto.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return texto
+
+
+def eq(coluna: str, valor: Any) -> Filtro:
+    return coluna, f"eq.{valor}"
+
+
+def gt(coluna: str, valor: Any) -> Filtro:
+    return coluna, f"gt.{valor}"
+
+
+def lte(coluna: str, valor: Any) -> Filtro:
+    return coluna, f"lte.{valor}"
+
+
+def ilike(coluna: str, padrao: str) -> Filtro:
+    # No PostgREST o curinga do LIKE na URL é '*'
+    return coluna, f"ilike.{padrao}"
+
+
+def in_(coluna: str, valores: Iterable[Any]) -> Filtro:
+    return coluna, "in.(" + ",".join(_valor_lista(v) for v in valores) + ")"
+
+
+def ou(*condicoes: str) -> Filtro:
+    return "or", "(" + ",".join(condicoes) + ")"
+
+
+def condicao_ilike(coluna: str, padrao: str) -> str:
+    # Condição para uso dentro de ou(), com o valor protegido por aspas
+    return f"{coluna}.ilike.{_valor_lista(padrao)}"
+
+
+def _total_content_range(cabecalho: Optional[str]) -> Optional[int]:
+    # Formato: "0-24/3573" ou "*/0"
+    if not cabecalho or "/" not in cabecalho:
+        return None
+    total = cabecalho.rsplit("/", 1)[1]
+    return int(total) if total.isdigit() else None
+
+
+## REPOSITÓRIO ASSÍNCRONO SOBRE O POSTGREST DO SUPABASE ##
+class RepositorioAsync:
+    """Acesso assíncrono às tabelas via PostgREST, com um único cliente HTTP/2 em pool."""
+
+    def __init__(self, url: str, chave: str):
+        self._url_base = f"{url.rstrip('/')}/rest/v1"
+        self._cabecalhos = {
+            "apikey": chave,
+            "Authorization": f"Bearer {chave}",
+            "Accept": "application/json",
+        }
+        self._cliente: Optional[httpx.AsyncClient] = None
+        self._transporte: Optional[httpx.AsyncBaseTransport] = None
+        # Chamadas em andamento: chave da consulta -> [tarefa, requisições aguardando]
+        self._em_andamento: Dict[Tuple, List] = {}
+        self.coalescidas = 0  # requisições atendidas por uma chamada idêntica já em andamento
+
+    def usar_transporte(self, transporte: Optional[httpx.AsyncBaseTransport]) -> None:
+        # Substitui a rede por outro transporte HTTP (ex.: o PostgREST em memória dos benchmarks)
+        self._transporte = transporte
+        self._cliente = None
+
+    def _criar_cliente(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self._url_base,
+            headers=self._cabecalhos,
+            transport=self._transporte,
+            http2=settings.DB_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.DB_MAX_CONEXOES,
+                max_keepalive_connections=settings.DB_MAX_CONEXOES_KEEPALIVE,
+                keepalive_expiry=settings.DB_KEEPALIVE_EXPIRACAO,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.DB_TIMEOUT_CONEXAO,
+                read=settings.DB_TIMEOUT_LEITURA,
+                write=settings.DB_TIMEOUT_LEITURA,
+                pool=settings.DB_TIMEOUT_POOL,
+            ),
+        )
+
+    @property
+    def cliente(self) -> httpx.AsyncClient:
+        if self._cliente is None or self._cliente.is_closed:
+            self._cliente = self._criar_cliente()
+        return self._cliente
+
+    async def iniciar(self) -> None:
+        # Cria o pool na inicialização da aplicação (lifespan)
+        _ = self.cliente
+
+    async def fechar(self) -> None:
+        if self._cliente is not None:
+            await self._cliente.aclose()
+            self._cliente = None
+
+    async def selecionar(
+        self,
+        tabela: str,
+        colunas: str = "*",
+        filtros: Sequence[Filtro] = (),
+        ordem: Optional[str] = None,
+        limite: Optional[int] = None,
+        contar: bool = False,
+    ) -> ResultadoConsulta:
+        if not settings.DB_COALESCER_CONSULTAS:
+            return await self._selecionar(tabela, colunas, filtros, ordem, limite, contar)
+
+        # Consultas idênticas simultâneas (ex.: vários usuários perguntando pelo mesmo CNPJ) esperam
+        # uma única chamada ao PostgREST e recebem o mesmo resultado, que deve ser tratado como somente leitura
+        chave = (tabela, colunas, tuple(filtros), ordem, limite, contar)
+        em_andamento = self._em_andamento.get(chave)
+        coalescida = em_andamento is not None
+        inicio = time.perf_counter()
+        if em_andamento is None:
+            tarefa = asyncio.ensure_future(self._selecionar(tabela, colunas, filtros, ordem, limite, contar))
+            em_andamento = self._em_andamento[chave] = [tarefa, 0]
+            tarefa.add_done_callback(lambda t: self._concluir_em_andamento(chave, t))
+        else:
+            self.coalescidas += 1
+            consultas_coalescidas.incrementar(tabela)
+        tarefa = em_andamento[0]
+        em_andamento[1] += 1
+        try:
+            # shield: se quem disparou a chamada for cancelado (cliente desconectou), os demais continuam esperando
+            return await asyncio.shield(tarefa)
+        except asyncio.CancelledError:
+            # A chamada só é cancelada quando não sobra ninguém interessado no resultado
+            if em_andamento[1] == 1 and not tarefa.done():
+                tarefa.cancel()
+                self._concluir_em_andamento(chave, tarefa)
+            raise
+        finally:
+            em_andamento[1] -= 1
+            if coalescida:
+                # A chamada é medida no contexto de quem a disparou; aqui fica o tempo que esta requisição esperou
+                registrar_tempo(f"db_{tabela}_select_coalescida", time.perf_counter() - inicio)
+
+    def _concluir_em_andamento(self, chave: Tuple, tarefa: asyncio.Future) -> None:
+        # Só remove a entrada se ainda for desta tarefa (uma chamada cancelada pode já ter sido substituída)
+        em_andamento = self._em_andamento.get(chave)
+        if em_andamento is not None and em_andamento[0] is tarefa:
+            del self._em_andamento[chave]
+        # Marca o erro como lido: se todos os interessados desistiram, ninguém mais vai recebê-lo
+        if tarefa.done() and not tarefa.cancelled():
+            tarefa.exception()
+
+    async def _selecionar(
+        self,
+        tabela: str,
+        colunas: str,
+        filtros: Sequence[Filtro],
+        ordem: Optional[str],
+        limite: Optional[int],
+        contar: bool,
+    ) -> ResultadoConsulta:
+        parametros: List[Filtro] = [("select", colunas), *filtros]
+        if ordem:
+            parametros.append(("order", ordem))
+        if limite is not None:
+            parametros.append(("limit", str(limite)))
+        cabecalhos = {"Prefer": "count=exact"} if contar else None
+
+        with medir_backend(tabela, "select"):
+            try:
+                resposta = await self.cliente.get(f"/{tabela}", params=parametros, headers=cabecalhos)
+            except httpx.HTTPError as e:
+                raise ErroBancoDados(f"falha de comunicação com o Supabase: {e!r}") from e
+
+            if resposta.status_code >= 400:
+                raise ErroBancoDados(f"PostgREST respondeu {resposta.status_code}: {resposta.text}")
+
+        total = _total_content_range(resposta.headers.get("content-range")) if contar else None
+        return ResultadoConsulta(dados=resposta.json(), total=total)
+
+    async def percorrer(
+        self,
+        tabela: str,
+        colunas: str = "*",
+        filtros: Sequence[Filtro] = (),
+        chave: str = "id",
+        tamanho_pagina: int = 1000,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        # O PostgREST limita as linhas por resposta; percorre a tabela em páginas ordenadas pela chave,
+        # entregando uma página de cada vez (só uma fica em memória)
+        ultimo = None
+        while True:
+            filtros_pagina = list(filtros) + ([gt(chave, ultimo)] if ultimo is not None else [])
+            resultado = await self.selecionar(
+                tabela, colunas=colunas, filtros=filtros_pagina, ordem=f"{chave}.asc", limite=tamanho_pagina
+            )
+            if resultado.dados:
+                yield resultado.dados
+            if len(resultado.dados) < tamanho_pagina:
+                return
+            ultimo = resultado.dados[-1][chave]
+
+    async def selecionar_todos(
+        self,
+        tabela: str,
+        colunas: str = "*",
+        filtros: Sequence[Filtro] = (),
+        chave: str = "id",
+        tamanho_pagina: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        linhas: List[Dict[str, Any]] = []
+        async for pagina in self.percorrer(tabela, colunas, filtros, chave, tamanho_pagina):
+            linhas.extend(pagina)
+        return linhas
+
+
+_repositorio = RepositorioAsync(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+
+
+def obter_repositorio() -> RepositorioAsync:
+    return _repositorio
@@ -0,0 +1,166 @@
+import bisect
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import settings
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow é opcional: sem ele o modo snapshot fica desativado
+    pa = None
+
+
+# Colunas gravadas no snapshot de cada tabela e a coluna usada como chave de busca (consultas por documento).
+# As tabelas são gravadas ordenadas pela chave, permitindo busca binária direto no arquivo mapeado.
+# O glossário e a legislação não entram: a API os mantém inteiros em memória, recarregados pela versão
+TABELAS_SNAPSHOT: Dict[str, Dict[str, Any]] = {
+    "autuacoes_ibama": {
+        "chave": "cpf_cnpj",
+        "colunas": ["id", "cpf_cnpj", "nome_autuado", "data_auto", "valor_multa",
+                    "descricao_infracao", "municipio", "uf", "created_at"],
+    },
+    "termos_embargo": {
+        "chave": "cpf_cnpj",
+        "colunas": ["id", "cpf_cnpj", "nome_embargado", "data_embargo", "justificativa",
+                    "municipio", "uf", "wkt_geometria", "created_at"],
+    },
+    "cadastro_tecnico_federal": {
+        "chave": "cnpj",
+        "colunas": ["id", "cnpj", "razao_social", "situacao_cadastro", "data_situacao_cadastral",
+                    "uf", "created_at"],
+    },
+}
+
+
+def _esquema(colunas: List[str]):
+    tipos_especiais = {
+        "id": pa.int64(),
+        "valor_multa": pa.float64(),
+    }
+    return pa.schema([(c, tipos_especiais.get(c, pa.string())) for c in colunas])
+
+
+def caminho_snapshot(tabela: str) -> Path:
+    return Path(settings.SNAPSHOT_DIR) / f"{tabela}.arrow"
+
+
+## EXPORTAÇÃO DO SNAPSHOT (LADO DO ETL, CLIENTE SÍNCRONO DO SUPABASE) ##
+def exportar_snapshot(supabase, tabela: str, tamanho_pagina: int = 1000) -> int:
+    if pa is None:
+        raise RuntimeError("O modo snapshot requer o pacote 'pyarrow'.")
+
+    definicao = TABELAS_SNAPSHOT[tabela]
+    colunas = definicao["colunas"]
+    esquema = _esquema(colunas)
+
+    # Percorre a tabela em páginas ordenadas por 'id' (paginação por chave, sem OFFSET)
+    lotes = []
+    ultimo_id = 0
+    while True:
+        pagina = (
+            supabase.table(tabela).select(",".join(colunas))
+            .gt("id", ultimo_id).order("id").limit(tamanho_pagina).execute().data
+        )
+        if not pagina:
+            break
+        lotes.append(pa.RecordBatch.from_pylist(pagina, schema=esquema))
+        ultimo_id = pagina[-1]["id"]
+        if len(pagina) < tamanho_pagina:
+            break
+
+    dados = pa.Table.from_batches(lotes, schema=esquema)
+    dados = dados.sort_by([(definicao["chave"], "ascending")])
+    # Um único bloco por coluna: o acesso por posição no arquivo mapeado fica O(1)
+    dados = dados.combine_chunks()
+
+    # Grava em arquivo temporário e troca atomicamente, para os workers nunca lerem um arquivo pela metade
+    destino = caminho_snapshot(tabela)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporario = destino.with_suffix(".arrow.tmp")
+    with pa.OSFile(str(temporario), "wb") as arquivo:
+        with pa.ipc.new_file(arquivo, dados.schema) as escritor:
+            escritor.write_table(dados)
+    os.replace(temporario, destino)
+    return dados.num_rows
+
+
+## LEITURA DO SNAPSHOT (LADO DA API) ##
+class _VisaoColuna:
+    # Adapta uma coluna Arrow à interface de sequência usada pelo módulo bisect
+    def __init__(self, coluna):
+        self._coluna = coluna
+
+    def __len__(self) -> int:
+        return len(self._coluna)
+
+    def __getitem__(self, posicao: int):
+        return self._coluna[posicao].as_py()
+
+
+class SnapshotTabela:
+    """Snapshot de uma tabela aberto por memory-map; as páginas são compartilhadas entre workers pelo cache do SO."""
+
+    def __init__(self, tabela: str, caminho: Path):
+        self.tabela = tabela
+        self.mtime = caminho.stat().st_mtime
+        fonte = pa.memory_map(str(caminho), "r")
+        self.dados = pa.ipc.open_file(fonte).read_all()
+        self.chave = TABELAS_SNAPSHOT[tabela]["chave"]
+
+        coluna = self.dados.column(self.chave).chunk(0) if self.dados.num_rows else pa.array([], pa.string())
+        self._chaves = _VisaoColuna(coluna)
+        # Os nulos ficam no fim do arquivo ordenado e não participam da busca
+        self._fim_busca = len(coluna) - coluna.null_count
+
+    def buscar_por_chave(self, valor: str, limite: Optional[int] = None) -> List[Dict[str, Any]]:
+        inicio = bisect.bisect_left(self._chaves, valor, 0, self._fim_busca)
+        fim = bisect.bisect_right(self._chaves, valor, inicio, self._fim_busca)
+        if limite is not None:
+            fim = min(fim, inicio + limite)
+        return self.dados.slice(inicio, fim - inicio).to_pylist()
+
+
+class GerenciadorSnapshots:
+    """Abre os snapshots sob demanda e os reabre quando o ETL grava um arquivo novo."""
+
+    def __init__(self, intervalo_verificacao: float):
+        self._intervalo = intervalo_verificacao
+        self._abertos: Dict[str, SnapshotTabela] = {}
+        self._verificado_em: Dict[str, float] = {}
+
+    @property
+    def ativo(self) -> bool:
+        return settings.SNAPSHOT_ATIVO and pa is not None
+
+    def obter(self, tabela: str) -> Optional[SnapshotTabela]:
+        if not self.ativo or tabela not in TABELAS_SNAPSHOT:
+            return None
+
+        agora = time.monotonic()
+        atual = self._abertos.get(tabela)
+        if atual is not None and agora - self._verificado_em.get(tabela, 0.0) < self._intervalo:
+            return atual
+        self._verificado_em[tabela] = agora
+
+        caminho = caminho_snapshot(tabela)
+        try:
+            if atual is None or caminho.stat().st_mtime != atual.mtime:
+                atual = SnapshotTabela(tabela, caminho)
+                self._abertos[tabela] = atual
+        except (OSError, pa.ArrowInvalid) as e:
+            # Sem arquivo (ou arquivo inválido) a consulta volta a usar o Supabase
+            if atual is None:
+                print(f"Aviso: snapshot de '{tabela}' indisponível: {e}")
+        return atual
+
+    def buscar_por_chave(self, tabela: str, coluna: str, valor: str,
+                         limite: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        snapshot = self.obter(tabela)
+        if snapshot is None or snapshot.chave != coluna:
+            return None
+        return snapshot.buscar_por_chave(valor, limite)
+
+
+snapshots = GerenciadorSnapshots(settings.VERSAO_INTERVALO_VERIFICACAO)
@@ -0,0 +1,46 @@
+import hashlib
+from typing import List, Optional
+
+from fastapi import HTTPException, Request, Response
+
+from config import settings
+from servicos.versoes import versoes
+
+
+def _etags(cabecalho: str) -> List[str]:
+    # If-None-Match usa comparação fraca: 'W/"x"' e '"x"' são a mesma validação
+    return [etag.strip().removeprefix("W/") for etag in cabecalho.split(",") if etag.strip()]
+
+
+## VALIDADORES HTTP (ETag / Cache-Control) DERIVADOS DAS VERSÕES DOS DATASETS ##
+class ValidadorVersao:
+    """Dependência do FastAPI que identifica a resposta pela versão dos datasets consultados.
+
+    Os resultados só mudam quando um ETL publica nova versão, então a mesma URL com as mesmas
+    versões produz sempre o mesmo corpo: o ETag é o hash dos dois. Se o cliente (ou um proxy)
+    já tem essa versão em If-None-Match, a resposta é um 304 sem corpo, antes de qualquer
+    consulta ao banco. Tabelas sem versão registrada não recebem validadores.
+    """
+
+    def __init__(self, *tabelas: str):
+        self.tabelas = tabelas
+
+    async def etag(self, request: Request) -> Optional[str]:
+        versoes_tabelas = [await versoes.obter(t) for t in self.tabelas]
+        if not all(versoes_tabelas):
+            return None
+        # Os parâmetros são ordenados para que '?a=1&b=2' e '?b=2&a=1' tenham o mesmo ETag
+        parametros = sorted(request.query_params.multi_items())
+        identidade = repr((request.url.path, parametros, list(zip(self.tabelas, versoes_tabelas))))
+        return '"' + hashlib.blake2b(identidade.encode(), digest_size=12).hexdigest() + '"'
+
+    async def __call__(self, request: Request, response: Response) -> None:
+        etag = await self.etag(request)
+        if etag is None:
+            return
+        cabecalhos = {"ETag": etag, "Cache-Control": f"public, max-age={settings.HTTP_CACHE_MAX_AGE}"}
+
+        se_diferente = request.headers.get("if-none-match")
+        if se_diferente and (se_diferente.strip() == "*" or etag in _etags(se_diferente)):
+            raise HTTPException(status_code=304, headers=cabecalhos)
+        response.headers.update(cabecalhos)
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional
+
+from config import settings
+from servicos.repositorio import obter_repositorio
+
+# Tabela onde os scripts de ETL registram a versão de cada dataset carregado
+TABELA_VERSOES = "versoes_dataset"
+
+
+## CONTROLE DAS VERSÕES DOS DATASETS (LADO DA API) ##
+class VersoesDataset:
+    """Versões dos datasets lidas do Supabase, revalidadas no máximo a cada N segundos."""
+
+    def __init__(self, intervalo_verificacao: float):
+        self._intervalo = intervalo_verificacao
+        self._versoes: Dict[str, int] = {}
+        self._ultima_verificacao = 0.0
+        self._lock = asyncio.Lock()
+        self._ouvintes: List[Callable[[str, int], None]] = []
+
+    def ao_mudar(self, ouvinte: Callable[[str, int], None]) -> None:
+        # Registra uma função chamada com (tabela, nova_versao) quando um ETL publicar nova versão
+        self._ouvintes.append(ouvinte)
+
+    async def atualizar(self) -> None:
+        try:
+            resultado = await obter_repositorio().selecionar(TABELA_VERSOES, colunas="tabela,versao")
+        except Exception as e:
+            # Mantém as últimas versões conhecidas se o Supabase estiver indisponível
+            print(f"Aviso: não foi possível verificar as versões dos datasets: {e}")
+            self._ultima_verificacao = time.monotonic()
+            return
+
+        novas = {linha["tabela"]: int(linha["versao"]) for linha in resultado.dados}
+        alteradas = [t for t, v in novas.items() if self._versoes.get(t) != v]
+        self._versoes = novas
+        self._ultima_verificacao = time.monotonic()
+
+        for tabela in alteradas:
+            for ouvinte in self._ouvintes:
+                ouvinte(tabela, novas[tabela])
+
+    async def _revalidar_se_necessario(self) -> None:
+        if time.monotonic() - self._ultima_verificacao < self._intervalo:
+            return
+        async with self._lock:
+            # Outra requisição pode ter revalidado enquanto esperávamos o lock
+            if time.monotonic() - self._ultima_verificacao >= self._intervalo:
+                await self.atualizar()
+
+    async def obter(self, tabela: str) -> int:
+        await self._revalidar_se_necessario()
+        return self._versoes.get(tabela, 0)
+
+    async def obter_todas(self) -> Dict[str, int]:
+        await self._revalidar_se_necessario()
+        return dict(self._versoes)
+
+
+versoes = VersoesDataset(settings.VERSAO_INTERVALO_VERIFICACAO)
+
+
+## REGISTRO DE NOVA VERSÃO (LADO DO ETL, CLIENTE SÍNCRONO DO SUPABASE) ##
+def nova_versao() -> int:
+    # Usa o instante da carga em milissegundos como versão: é crescente e dispensa leitura prévia
+    return int(time.time() * 1000)
+
+
+def registrar_nova_versao(supabase, tabela: str, versao: Optional[int] = None) -> int:
+    # A versão pode ser escolhida antes, quando há dados derivados gravados com ela (ex.: estatísticas)
+    versao = versao or nova_versao()
+    supabase.table(TABELA_VERSOES).upsert(
+        {"tabela": tabela, "versao": versao}, on_conflict="tabela"
+    ).execute()
+    return versao
@@ -0,0 +1,66 @@
+"""Fixtures compartilhadas: a API e os serviços rodando contra o PostgREST em memória dos benchmarks.
+
+Os índices em memória (glossário, BM25, municípios...) são objetos únicos do processo e só recarregam
+quando a versão do dataset muda; por isso cada teste publica versões novas em 'versoes_dataset'.
+"""
+import asyncio
+import itertools
+import os
+
+os.environ.setdefault("SUPABASE_URL", "http://supabase.teste")
+os.environ.setdefault("SUPABASE_KEY", "teste")
+os.environ.setdefault("EMBEDDING_CODIFICADOR", "hash")
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from benchmarks import dados_sinteticos, postgrest_falso  # noqa: E402
+from config import settings  # noqa: E402
+from servicos.cache import cache_consultas  # noqa: E402
+from servicos.repositorio import obter_repositorio  # noqa: E402
+from servicos.versoes import versoes  # noqa: E402
+
+_proxima_versao = itertools.count(1_000)
+
+
+def publicar_versao(dados, *tabelas: str) -> None:
+    """Simula o ETL registrando uma nova versão das tabelas (todas, se nenhuma for indicada)."""
+    versao = next(_proxima_versao)
+    for linha in dados.tabelas["versoes_dataset"]:
+        if not tabelas or linha["tabela"] in tabelas:
+            linha["versao"] = versao
+
+
+@pytest.fixture
+def dados():
+    sinteticos = dados_sinteticos.gerar(400, semente=7)
+    publicar_versao(sinteticos)
+    return sinteticos
+
+
+@pytest.fixture
+def postgrest(dados, monkeypatch, tmp_path):
+    # Sem índice de documentos gravado: as consultas por documento sempre vão ao PostgREST
+    monkeypatch.setattr(settings, "INDICE_DOCUMENTOS_DIR", str(tmp_path / "indices"))
+    versoes._ultima_verificacao = 0.0
+    cache_consultas.limpar()
+    transporte = postgrest_falso.instalar(dados.tabelas)
+    yield transporte
+    obter_repositorio().usar_transporte(None)
+
+
+@pytest.fixture
+def api(postgrest):
+    """Executa `cenario(cliente)` com a API no ar (lifespan) e devolve o seu resultado."""
+    import main
+
+    def executar(cenario):
+        async def principal():
+            async with main.app.router.lifespan_context(main.app):
+                transporte = httpx.ASGITransport(app=main.app)
+                async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+                    return await cenario(cliente)
+
+        return asyncio.run(principal())
+
+    return executar
@@ -0,0 +1,76 @@
+"""Controle de admissão (503 com Retry-After) e prazo por requisição (504, com a vaga liberada)."""
+import asyncio
+
+import pytest
+
+from config import settings
+from servicos.admissao import consultas_pontuais, consultas_varredura
+from servicos.repositorio import obter_repositorio
+
+URL_VARREDURA = "/api/ctf/situacao/Ativa"
+
+
+@pytest.fixture
+def varredura_com_uma_vaga(monkeypatch):
+    def configurar(fila_maxima, espera_maxima):
+        monkeypatch.setattr(consultas_varredura, "limite", 1)
+        monkeypatch.setattr(consultas_varredura, "fila_maxima", fila_maxima)
+        monkeypatch.setattr(consultas_varredura, "espera_maxima", espera_maxima)
+        monkeypatch.setattr(consultas_varredura, "_semaforo", asyncio.Semaphore(1))
+
+    return configurar
+
+
+def _simultaneas(api, postgrest, quantidade, latencia):
+    async def cenario(cliente):
+        postgrest.latencia = latencia
+        respostas = await asyncio.gather(*(
+            cliente.get(URL_VARREDURA, params={"limite": 1 + i}) for i in range(quantidade)
+        ))
+        return respostas, consultas_varredura.em_uso, consultas_varredura.aguardando
+
+    return api(cenario)
+
+
+def test_fila_cheia_responde_503_com_retry_after(api, postgrest, varredura_com_uma_vaga):
+    varredura_com_uma_vaga(fila_maxima=0, espera_maxima=1.0)
+
+    respostas, em_uso, aguardando = _simultaneas(api, postgrest, 2, latencia=0.2)
+
+    assert sorted(r.status_code for r in respostas) == [200, 503]
+    recusada = next(r for r in respostas if r.status_code == 503)
+    assert recusada.headers["Retry-After"] == str(settings.ADMISSAO_RETRY_AFTER)
+    assert (em_uso, aguardando) == (0, 0)
+
+
+def test_espera_na_fila_limitada_pelo_tempo(api, postgrest, varredura_com_uma_vaga):
+    varredura_com_uma_vaga(fila_maxima=4, espera_maxima=0.05)
+
+    respostas, em_uso, aguardando = _simultaneas(api, postgrest, 2, latencia=0.3)
+
+    assert sorted(r.status_code for r in respostas) == [200, 503]
+    assert (em_uso, aguardando) == (0, 0)
+
+
+def test_fila_atendida_dentro_da_espera(api, postgrest, varredura_com_uma_vaga):
+    varredura_com_uma_vaga(fila_maxima=4, espera_maxima=2.0)
+
+    respostas, _, _ = _simultaneas(api, postgrest, 3, latencia=0.05)
+
+    assert [r.status_code for r in respostas] == [200, 200, 200]
+
+
+def test_prazo_esgotado_responde_504_e_libera_a_vaga(api, postgrest, dados, monkeypatch):
+    monkeypatch.setattr(settings, "API_PRAZO_REQUISICAO", 0.1)
+    documento = dados.tabelas["autuacoes_ibama"][0]["cpf_cnpj"]
+
+    async def cenario(cliente):
+        postgrest.latencia = 1.0
+        resposta = await cliente.get(f"/api/autuacoes/documento/{documento}")
+        return resposta, consultas_pontuais.em_uso, dict(obter_repositorio()._em_andamento)
+
+    resposta, em_uso, em_andamento = api(cenario)
+    assert resposta.status_code == 504
+    # A vaga de admissão e a chamada ao banco foram liberadas com o cancelamento
+    assert em_uso == 0
+    assert em_andamento == {}
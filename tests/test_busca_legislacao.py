@@ -0,0 +1,77 @@
+"""Ranking BM25 da legislação e reindexação incremental quando o catálogo muda."""
+import asyncio
+
+from servicos.busca_legislacao import IndiceBM25, busca_legislacao, tokenizar
+from servicos.versoes import versoes
+from tests.conftest import publicar_versao
+
+
+def _norma(id_norma, titulo, resumo="", palavras_chave=()):
+    return {"id": id_norma, "titulo": titulo, "resumo": resumo, "tipo_norma": "Lei",
+            "link_oficial": None, "palavras_chave": list(palavras_chave)}
+
+
+NORMAS = [
+    _norma(1, "Lei de Crimes Ambientais", "Sanções penais e administrativas", ["infração", "sanção"]),
+    _norma(2, "Código Florestal", "Proteção da vegetação nativa e das queimadas", ["desmatamento", "reserva legal"]),
+    _norma(3, "Política Nacional de Recursos Hídricos", "Gestão das águas e controle do desmatamento"),
+]
+
+
+def _ids(resultados):
+    return [norma["id"] for norma, _ in resultados]
+
+
+def test_tokenizacao_ignora_acentos_stopwords_e_flexoes():
+    assert tokenizar("As Queimadas") == tokenizar("queimada")
+    assert tokenizar("de da dos") == []
+
+
+def test_palavra_chave_pesa_mais_que_o_resumo():
+    indice = IndiceBM25()
+    indice.sincronizar(NORMAS)
+
+    resultados = indice.buscar("desmatamento")
+    assert _ids(resultados) == [2, 3]
+    assert resultados[0][1] > resultados[1][1]
+
+
+def test_termo_raro_decide_o_ranking():
+    indice = IndiceBM25()
+    indice.sincronizar(NORMAS)
+
+    assert _ids(indice.buscar("sanções desmatamento"))[0] == 1
+    assert indice.buscar("mineração") == []
+
+
+def test_sincronizar_reindexa_so_o_que_mudou():
+    indice = IndiceBM25()
+    assert indice.sincronizar(NORMAS) == (3, 0)
+    assert indice.sincronizar(NORMAS) == (0, 0)
+
+    alteradas = [NORMAS[0], _norma(2, "Código Florestal", "Proteção da vegetação nativa", ["mineração"])]
+    assert indice.sincronizar(alteradas) == (1, 1)
+    assert len(indice) == 2
+    assert _ids(indice.buscar("mineração")) == [2]
+    # Norma removida e termo que saiu da norma alterada não aparecem mais
+    assert indice.buscar("hídricos") == []
+    assert indice.buscar("queimadas") == []
+
+
+def test_nova_versao_do_catalogo_reindexa_o_servico(postgrest, dados):
+    dados.tabelas["legislacao_ambiental"] = [dict(n) for n in NORMAS]
+
+    async def cenario():
+        antes = _ids(await busca_legislacao.buscar("desmatamento"))
+        dados.tabelas["legislacao_ambiental"].append(_norma(4, "Lei do Desmatamento Zero", palavras_chave=["desmatamento"]))
+        postgrest.recarregar()
+        # Sem nova versão o índice não é recarregado
+        sem_versao = _ids(await busca_legislacao.buscar("desmatamento"))
+        publicar_versao(dados, "legislacao_ambiental")
+        await versoes.atualizar()
+        depois = _ids(await busca_legislacao.buscar("desmatamento"))
+        return antes, sem_versao, depois
+
+    antes, sem_versao, depois = asyncio.run(cenario())
+    assert antes == sem_versao == [2, 3]
+    assert depois[0] == 4 and set(depois) == {2, 3, 4}
@@ -0,0 +1,66 @@
+"""Cache das consultas por documento: acertos sem ida ao banco e descarte quando o ETL publica nova versão."""
+import asyncio
+
+from servicos.cache import cache_consultas
+from servicos.consultas import buscar_autuacoes, buscar_embargos
+from servicos.versoes import versoes
+from tests.conftest import publicar_versao
+
+
+def _chaves_da_tabela(tabela):
+    return [chave for chave in cache_consultas._cache if chave[0] == tabela]
+
+
+def test_segunda_consulta_vem_do_cache(postgrest, dados):
+    documento = dados.tabelas["autuacoes_ibama"][0]["cpf_cnpj"]
+
+    async def cenario():
+        primeira = await buscar_autuacoes(documento)
+        requisicoes = postgrest.requisicoes
+        segunda = await buscar_autuacoes(documento)
+        return primeira, segunda, postgrest.requisicoes - requisicoes
+
+    primeira, segunda, novas_requisicoes = asyncio.run(cenario())
+    assert primeira and segunda == primeira
+    assert novas_requisicoes == 0
+
+
+def test_documento_sem_registros_tambem_fica_no_cache(postgrest, dados):
+    documento = dados.documentos_ausentes[0]
+
+    async def cenario():
+        assert await buscar_autuacoes(documento) == []
+        requisicoes = postgrest.requisicoes
+        assert await buscar_autuacoes(documento) == []
+        return postgrest.requisicoes - requisicoes
+
+    assert asyncio.run(cenario()) == 0
+
+
+def test_nova_versao_descarta_so_a_tabela_alterada(postgrest, dados):
+    autuacao = dados.tabelas["autuacoes_ibama"][0]
+    documento = autuacao["cpf_cnpj"]
+    embargado = dados.tabelas["termos_embargo"][0]["cpf_cnpj"]
+
+    async def cenario():
+        antes = await buscar_autuacoes(documento)
+        await buscar_embargos(embargado)
+
+        # O ETL carrega uma autuação nova do mesmo documento e publica a versão
+        dados.tabelas["autuacoes_ibama"].append(dict(autuacao, id=10**6, valor_multa=1.0))
+        postgrest.recarregar()
+        publicar_versao(dados, "autuacoes_ibama")
+        await versoes.atualizar()
+        assert _chaves_da_tabela("autuacoes_ibama") == []
+        assert _chaves_da_tabela("termos_embargo")
+
+        requisicoes = postgrest.requisicoes
+        await buscar_embargos(embargado)
+        embargos_do_cache = postgrest.requisicoes == requisicoes
+        depois = await buscar_autuacoes(documento)
+        return antes, depois, embargos_do_cache
+
+    antes, depois, embargos_do_cache = asyncio.run(cenario())
+    assert len(depois) == len(antes) + 1
+    assert 10**6 in [linha["id"] for linha in depois]
+    assert embargos_do_cache
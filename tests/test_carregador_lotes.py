@@ -0,0 +1,123 @@
+"""Carga em lotes do ETL contra um PostgREST falso (httpx.MockTransport): divisão dos lotes com
+erro de dados, dead letter, novas tentativas e interrupção por erro de esquema."""
+import json
+import threading
+
+import httpx
+import pytest
+from postgrest import SyncPostgrestClient
+
+from config import settings
+from scripts_etl.carregador_lotes import CargaInterrompida, CarregadorLotes, reprocessar_dead_letter
+
+
+class PostgrestGravacao:
+    """Recebe os inserts/upserts; `recusar(registros)` devolve o código de erro do lote, ou None."""
+
+    def __init__(self, recusar=lambda registros: None):
+        self.recusar = recusar
+        self.gravados = []
+        self.requisicoes = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        registros = json.loads(request.content)
+        with self._lock:
+            self.requisicoes += 1
+            codigo = self.recusar(registros)
+            if codigo is None:
+                self.gravados.extend(registros)
+        if codigo is None:
+            return httpx.Response(201, json=registros)
+        status = 503 if codigo == "503" else 400
+        return httpx.Response(status, json={"code": codigo, "message": f"erro {codigo}", "details": None, "hint": None})
+
+    def cliente(self) -> SyncPostgrestClient:
+        return SyncPostgrestClient("http://supabase.teste/rest/v1", http_client=httpx.Client(transport=httpx.MockTransport(self)))
+
+
+@pytest.fixture(autouse=True)
+def etl_sem_espera(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "ETL_ESPERA_BASE", 0.0)
+    monkeypatch.setattr(settings, "ETL_LOTE_MINIMO", 1)
+    monkeypatch.setattr(settings, "ETL_DEAD_LETTER_DIR", str(tmp_path / "dead_letter"))
+
+
+def _registros(quantidade):
+    return [{"chave_origem": str(i), "valor": i} for i in range(quantidade)]
+
+
+def _dead_letter(relatorio):
+    with open(relatorio.arquivo_dead_letter, encoding="utf-8") as arquivo:
+        return [json.loads(linha) for linha in arquivo]
+
+
+def test_lote_com_erro_de_dados_e_dividido_ate_isolar_os_registros():
+    invalidos = {"13", "77"}
+    servidor = PostgrestGravacao(lambda lote: "22P02" if any(r["chave_origem"] in invalidos for r in lote) else None)
+    carregador = CarregadorLotes(servidor.cliente(), "autuacoes_ibama", workers=2, lote_inicial=32)
+
+    carregador.enviar(_registros(100))
+    relatorio = carregador.finalizar()
+
+    assert sorted(int(r["chave_origem"]) for r in servidor.gravados) == [i for i in range(100) if str(i) not in invalidos]
+    assert relatorio.registros_enviados == 98
+    assert relatorio.registros_falhos == 2
+    assert relatorio.interrompida_por is None
+    # O dead letter tem só os registros recusados, um por lote, com o erro do PostgREST
+    falhas = _dead_letter(relatorio)
+    assert sorted(r["chave_origem"] for falha in falhas for r in falha["registros"]) == sorted(invalidos)
+    assert all(falha["tabela"] == "autuacoes_ibama" and "22P02" in falha["erro"] for falha in falhas)
+
+
+def test_dead_letter_e_reprocessado_com_o_mesmo_upsert():
+    servidor = PostgrestGravacao(lambda lote: "23502" if any(r["valor"] == 5 for r in lote) else None)
+    carregador = CarregadorLotes(servidor.cliente(), "autuacoes_ibama", workers=1, lote_inicial=8,
+                                 on_conflict="chave_origem")
+    carregador.enviar(_registros(8))
+    relatorio = carregador.finalizar()
+    assert _dead_letter(relatorio)[0]["on_conflict"] == "chave_origem"
+
+    # Corrigido o problema no banco, o arquivo é reenviado
+    servidor.recusar = lambda lote: None
+    reenvio, = reprocessar_dead_letter(servidor.cliente(), relatorio.arquivo_dead_letter)
+
+    assert reenvio.registros_enviados == 1
+    assert sorted(r["valor"] for r in servidor.gravados) == list(range(8))
+
+
+def test_erro_transitorio_e_repetido_sem_perder_registros():
+    falhas_restantes = [2]
+
+    def recusar(lote):
+        if falhas_restantes[0]:
+            falhas_restantes[0] -= 1
+            return "503"
+        return None
+
+    servidor = PostgrestGravacao(recusar)
+    carregador = CarregadorLotes(servidor.cliente(), "termos_embargo", workers=1, lote_inicial=10)
+
+    carregador.enviar(_registros(10))
+    relatorio = carregador.finalizar()
+
+    assert relatorio.registros_enviados == 10
+    assert relatorio.tentativas_extras == 2
+    assert relatorio.arquivo_dead_letter is None
+
+
+def test_erro_de_esquema_interrompe_a_carga_sem_dividir():
+    # Coluna inexistente (SQLSTATE 42703): qualquer lote da tabela falharia
+    servidor = PostgrestGravacao(lambda lote: "42703")
+    carregador = CarregadorLotes(servidor.cliente(), "cadastro_tecnico_federal", workers=1, lote_inicial=50)
+
+    carregador.enviar(_registros(50))
+    relatorio = carregador.finalizar()
+
+    assert servidor.requisicoes == 1
+    assert relatorio.registros_enviados == 0
+    assert relatorio.registros_falhos == 50
+    assert "42703" in relatorio.interrompida_por
+    assert len(_dead_letter(relatorio)) == 1
+    with pytest.raises(CargaInterrompida):
+        carregador.enviar(_registros(1))
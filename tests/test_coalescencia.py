@@ -0,0 +1,65 @@
+"""Consultas idênticas simultâneas compartilham uma única chamada ao PostgREST."""
+import asyncio
+
+from config import settings
+from servicos.repositorio import eq, obter_repositorio
+
+
+def _consulta(cnpj):
+    return obter_repositorio().selecionar("cadastro_tecnico_federal", colunas="id,cnpj", filtros=[eq("cnpj", cnpj)])
+
+
+def test_consultas_identicas_simultaneas_fazem_uma_chamada(postgrest, dados):
+    postgrest.latencia = 0.05
+    cnpj = dados.cnpjs_ctf[0]
+    repositorio = obter_repositorio()
+
+    async def cenario():
+        coalescidas = repositorio.coalescidas
+        resultados = await asyncio.gather(*(_consulta(cnpj) for _ in range(10)))
+        return resultados, repositorio.coalescidas - coalescidas
+
+    resultados, coalescidas = asyncio.run(cenario())
+    assert postgrest.requisicoes == 1
+    assert coalescidas == 9
+    assert all(r.dados == resultados[0].dados for r in resultados) and resultados[0].dados
+    assert repositorio._em_andamento == {}
+
+
+def test_consultas_diferentes_nao_sao_coalescidas(postgrest, dados):
+    postgrest.latencia = 0.02
+
+    async def cenario():
+        await asyncio.gather(*(_consulta(cnpj) for cnpj in dados.cnpjs_ctf[:3]))
+
+    asyncio.run(cenario())
+    assert postgrest.requisicoes == 3
+
+
+def test_cancelar_quem_disparou_nao_cancela_os_demais(postgrest, dados):
+    postgrest.latencia = 0.05
+    cnpj = dados.cnpjs_ctf[0]
+
+    async def cenario():
+        primeira = asyncio.ensure_future(_consulta(cnpj))
+        await asyncio.sleep(0)
+        segunda = asyncio.ensure_future(_consulta(cnpj))
+        await asyncio.sleep(0.01)
+        primeira.cancel()
+        return primeira, await segunda
+
+    primeira, segunda = asyncio.run(cenario())
+    assert primeira.cancelled()
+    assert segunda.dados and segunda.dados[0]["cnpj"] == cnpj
+    assert postgrest.requisicoes == 1
+
+
+def test_coalescencia_desligada(postgrest, dados, monkeypatch):
+    monkeypatch.setattr(settings, "DB_COALESCER_CONSULTAS", False)
+    postgrest.latencia = 0.02
+
+    async def cenario():
+        await asyncio.gather(*(_consulta(dados.cnpjs_ctf[0]) for _ in range(4)))
+
+    asyncio.run(cenario())
+    assert postgrest.requisicoes == 4
@@ -0,0 +1,78 @@
+"""Consultas espaciais: índice dos retângulos, geometria buscada sob demanda e teste exato de interseção."""
+import asyncio
+
+import pytest
+
+shapely = pytest.importorskip("shapely")
+
+from servicos.espacial import busca_espacial  # noqa: E402
+from servicos.versoes import versoes  # noqa: E402
+from tests.conftest import publicar_versao  # noqa: E402
+
+
+def _wkb(wkt):
+    return "\\x" + shapely.to_wkb(shapely.from_wkt(wkt), hex=True)
+
+
+@pytest.fixture
+def embargos(dados):
+    # Triângulos no canto inferior esquerdo do retângulo: o centro do retângulo fica fora da geometria.
+    # Os embargos pares ficam sem WKB (geometria inválida na origem)
+    linhas = dados.tabelas["termos_embargo"]
+    for linha in linhas:
+        x, y = linha["bbox_xmin"], linha["bbox_ymin"]
+        linha["wkt_geometria"] = f"POLYGON(({x} {y},{x + 0.01} {y},{x} {y + 0.01},{x} {y}))"
+        linha["wkb_geometria"] = _wkb(linha["wkt_geometria"]) if linha["id"] % 2 else None
+    return linhas
+
+
+def test_ponto_dentro_da_geometria_e_so_no_retangulo(postgrest, embargos):
+    embargo = next(l for l in embargos if l["id"] % 2)
+    x, y = embargo["bbox_xmin"], embargo["bbox_ymin"]
+
+    async def cenario():
+        dentro = await busca_espacial.embargos_no_ponto(x + 0.002, y + 0.002)
+        so_no_retangulo = await busca_espacial.embargos_no_ponto(x + 0.008, y + 0.008)
+        return dentro, so_no_retangulo
+
+    dentro, so_no_retangulo = asyncio.run(cenario())
+    assert embargo["id"] in dentro
+    assert embargo["id"] not in so_no_retangulo
+
+
+def test_area_busca_geometrias_uma_vez_por_versao(postgrest, dados, embargos):
+    esperados = sorted(l["id"] for l in embargos if l["wkb_geometria"] is not None)
+
+    async def cenario():
+        primeira = await busca_espacial.embargos_na_area(-60, -12, -44, 1)
+        requisicoes = postgrest.requisicoes
+        segunda = await busca_espacial.embargos_na_area(-60, -12, -44, 1)
+        do_cache = postgrest.requisicoes == requisicoes
+
+        # Nova versão: índice e cache de geometrias são trocados juntos
+        embargos.pop()
+        postgrest.recarregar()
+        publicar_versao(dados, "termos_embargo")
+        await versoes.atualizar()
+        requisicoes = postgrest.requisicoes
+        terceira = await busca_espacial.embargos_na_area(-60, -12, -44, 1)
+        return primeira, segunda, do_cache, terceira, postgrest.requisicoes - requisicoes
+
+    primeira, segunda, do_cache, terceira, requisicoes_nova_versao = asyncio.run(cenario())
+    assert primeira == segunda == esperados
+    assert do_cache
+    assert terceira == sorted(l["id"] for l in embargos if l["wkb_geometria"] is not None)
+    assert requisicoes_nova_versao > 0
+
+
+def test_rota_do_ponto_devolve_os_embargos(api, embargos):
+    embargo = next(l for l in embargos if l["id"] % 2)
+
+    async def cenario(cliente):
+        return await cliente.get("/api/embargos/ponto", params={
+            "longitude": embargo["bbox_xmin"] + 0.001, "latitude": embargo["bbox_ymin"] + 0.001,
+        })
+
+    resposta = api(cenario)
+    assert resposta.status_code == 200
+    assert embargo["id"] in [item["id"] for item in resposta.json()["itens"]]
@@ -0,0 +1,58 @@
+"""Glossário em memória: busca sem acentos/maiúsculas, tolerância a erros de digitação, 404 e autocompletar."""
+import pytest
+
+TERMOS = [
+    {"id": 1, "termo": "APP", "definicao": "Área de Preservação Permanente", "categoria": "Sigla"},
+    {"id": 2, "termo": "APA", "definicao": "Área de Proteção Ambiental", "categoria": "Sigla"},
+    {"id": 6, "termo": "CAR", "definicao": "Cadastro Ambiental Rural", "categoria": "Sigla"},
+    {"id": 3, "termo": "Reserva Legal", "definicao": "Área do imóvel rural com vegetação nativa", "categoria": "Geral"},
+    {"id": 4, "termo": "Licenciamento Ambiental", "definicao": "Procedimento administrativo", "categoria": "Geral"},
+    {"id": 5, "termo": "Licença Prévia", "definicao": "Primeira etapa do licenciamento", "categoria": "Geral"},
+]
+
+
+@pytest.fixture
+def glossario_api(api, dados):
+    dados.tabelas["termos_glossario"] = [dict(t) for t in TERMOS]
+    return api
+
+
+def _get(api, url, **parametros):
+    async def cenario(cliente):
+        return await cliente.get(url, params=parametros)
+
+    return api(cenario)
+
+
+@pytest.mark.parametrize("busca, termo", [
+    ("Reserva Legal", "Reserva Legal"),
+    ("reserva legal", "Reserva Legal"),
+    ("licenca previa", "Licença Prévia"),
+    # Um erro de digitação em termo longo, e numa sigla curta
+    ("Reserva Legl", "Reserva Legal"),
+    ("CAT", "CAR"),
+])
+def test_encontra_o_termo(glossario_api, busca, termo):
+    resposta = _get(glossario_api, f"/api/glossario/{busca}")
+    assert resposta.status_code == 200
+    assert resposta.json()["termo"] == termo
+
+
+def test_termo_desconhecido_responde_404_com_sugestoes(glossario_api):
+    resposta = _get(glossario_api, "/api/glossario/Licenciamento")
+    assert resposta.status_code == 404
+    assert resposta.json()["detail"]["sugestoes"] == ["Licenciamento Ambiental"]
+
+
+def test_aproximacao_empatada_nao_escolhe_um_termo(glossario_api):
+    # 'APR' está a um erro de 'APP' e de 'APA': nenhum dos dois é devolvido como resposta
+    resposta = _get(glossario_api, "/api/glossario/APR")
+    assert resposta.status_code == 404
+    assert resposta.json()["detail"]["sugestoes"] == ["APA", "APP"]
+
+
+def test_autocompletar_pelo_prefixo(glossario_api):
+    resposta = _get(glossario_api, "/api/glossario/sugestoes", prefix="lic")
+    assert resposta.status_code == 200
+    # Em ordem alfabética do termo normalizado ('LICENCA...' antes de 'LICENCIAMENTO...')
+    assert resposta.json() == ["Licença Prévia", "Licenciamento Ambiental"]
@@ -0,0 +1,68 @@
+"""Resolução do município digitado para as chaves exatas de 'municipio_chave'."""
+import pytest
+
+from servicos.municipios import DicionarioMunicipios
+from servicos.normalizacao import chave_municipio
+
+MUNICIPIOS = [
+    ("Belém", "PA"), ("Belém", "PB"), ("Marabá", "PA"), ("São Félix do Xingu", "PA"),
+    ("São Paulo", "SP"), ("Cuiabá", "MT"),
+]
+
+
+@pytest.fixture
+def dicionario():
+    dicionario = DicionarioMunicipios()
+    dicionario._carregar([
+        {"municipio_chave": chave_municipio(nome, uf), "municipio": nome, "uf": uf} for nome, uf in MUNICIPIOS
+    ])
+    return dicionario
+
+
+@pytest.mark.parametrize("texto, uf, chaves", [
+    ("maraba", None, ["MARABA/PA"]),
+    ("MARABÁ", None, ["MARABA/PA"]),
+    # Nome homônimo sem UF: todas as UFs; com UF (no parâmetro ou no texto), só a indicada
+    ("Belém", None, ["BELEM/PA", "BELEM/PB"]),
+    ("Belém", "pb", ["BELEM/PB"]),
+    ("Belém - PA", None, ["BELEM/PA"]),
+    ("belem/pb", None, ["BELEM/PB"]),
+    # Prefixo que leva a um único município
+    ("Sao Felix", None, ["SAO FELIX DO XINGU/PA"]),
+    # Erro de digitação
+    ("Cuiabba", None, ["CUIABA/MT"]),
+])
+def test_resolve_para_as_chaves_exatas(dicionario, texto, uf, chaves):
+    resolucao = dicionario.resolver(texto, uf)
+    assert sorted(resolucao.chaves) == chaves
+    assert resolucao.sugestoes == []
+
+
+def test_prefixo_ambiguo_devolve_sugestoes(dicionario):
+    resolucao = dicionario.resolver("Sao")
+    assert resolucao.chaves == []
+    assert sorted(resolucao.sugestoes) == ["São Félix do Xingu - PA", "São Paulo - SP"]
+
+
+def test_uf_sem_o_municipio_nao_resolve(dicionario):
+    assert dicionario.resolver("Marabá", "SP").chaves == []
+
+
+def test_rota_responde_404_com_sugestoes(api):
+    async def cenario(cliente):
+        return await cliente.get("/api/autuacoes/municipio/Sao")
+
+    resposta = api(cenario)
+    assert resposta.status_code == 404
+    assert "São Paulo - SP" in resposta.json()["detail"]["sugestoes"]
+
+
+def test_rota_filtra_pela_uf_do_texto(api, dados):
+    async def cenario(cliente):
+        return await cliente.get("/api/autuacoes/municipio/Belém - PB", params={"limite": 500})
+
+    resposta = api(cenario)
+    assert resposta.status_code == 200
+    esperados = sorted(l["id"] for l in dados.tabelas["autuacoes_ibama"] if l["municipio_chave"] == "BELEM/PB")
+    assert [item["id"] for item in resposta.json()["itens"]] == esperados
+    assert {item["uf"] for item in resposta.json()["itens"]} == {"PB"}
@@ -0,0 +1,71 @@
+"""Paginação por chave ('id' > cursor): as páginas cobrem o resultado inteiro, sem repetir nem pular linhas."""
+from servicos.normalizacao import chave_municipio
+
+
+def _ids_esperados(dados, tabela, filtro):
+    return sorted(linha["id"] for linha in dados.tabelas[tabela] if filtro(linha))
+
+
+def _percorrer(api, url, limite):
+    async def cenario(cliente):
+        paginas, cursor = [], None
+        while True:
+            parametros = {"limite": limite, **({"cursor": cursor} if cursor is not None else {})}
+            resposta = await cliente.get(url, params=parametros)
+            assert resposta.status_code == 200, resposta.text
+            pagina = resposta.json()
+            paginas.append(pagina)
+            cursor = pagina.get("next_cursor")
+            if cursor is None:
+                return paginas
+
+    return api(cenario)
+
+
+def test_paginas_de_um_municipio_cobrem_todas_as_autuacoes(api, dados):
+    chave = chave_municipio("Marabá", "PA")
+    esperados = _ids_esperados(dados, "autuacoes_ibama", lambda l: l["municipio_chave"] == chave)
+    assert len(esperados) > 7
+
+    paginas = _percorrer(api, "/api/autuacoes/municipio/Marabá", limite=7)
+
+    ids = [item["id"] for pagina in paginas for item in pagina["itens"]]
+    assert ids == esperados
+    assert all(len(pagina["itens"]) == 7 for pagina in paginas[:-1])
+    # O cursor é o 'id' do último item da página
+    assert all(pagina["next_cursor"] == pagina["itens"][-1]["id"] for pagina in paginas[:-1])
+
+
+def test_paginas_da_situacao_do_ctf(api, dados):
+    # A situação é buscada por substring: 'Ativa' também encontra 'Inativa'
+    esperados = _ids_esperados(dados, "cadastro_tecnico_federal", lambda l: "ativa" in l["situacao_cadastro"].lower())
+
+    paginas = _percorrer(api, "/api/ctf/situacao/Ativa", limite=5)
+
+    assert [item["id"] for pagina in paginas for item in pagina["itens"]] == esperados
+
+
+def test_contagem_ignora_o_cursor(api, dados):
+    chave = chave_municipio("Marabá", "PA")
+    esperados = _ids_esperados(dados, "autuacoes_ibama", lambda l: l["municipio_chave"] == chave)
+
+    async def cenario(cliente):
+        url = "/api/autuacoes/municipio/Marabá"
+        return await cliente.get(url, params={"limite": 3, "cursor": esperados[2], "contar": "true"})
+
+    pagina = api(cenario).json()
+    assert [item["id"] for item in pagina["itens"]] == esperados[3:6]
+    assert pagina["total"] == len(esperados)
+
+
+def test_cursor_depois_do_ultimo_id_devolve_pagina_vazia(api, dados):
+    chave = chave_municipio("Marabá", "PA")
+    ultimo = _ids_esperados(dados, "autuacoes_ibama", lambda l: l["municipio_chave"] == chave)[-1]
+
+    async def cenario(cliente):
+        return await cliente.get("/api/autuacoes/municipio/Marabá", params={"cursor": ultimo})
+
+    resposta = api(cenario)
+    assert resposta.status_code == 200
+    assert resposta.json()["itens"] == []
+    assert resposta.json()["next_cursor"] is None
@@ -0,0 +1,44 @@
+"""Parâmetro ?fields=: só as colunas pedidas (mais as obrigatórias) e 400 para campos desconhecidos."""
+
+
+def _consultar(api, postgrest, url, **parametros):
+    async def cenario(cliente):
+        requisicoes = postgrest.requisicoes
+        resposta = await cliente.get(url, params=parametros)
+        return resposta, postgrest.requisicoes - requisicoes
+
+    return api(cenario)
+
+
+def test_fields_limita_as_colunas_da_resposta(api, postgrest, dados):
+    documento = dados.tabelas["autuacoes_ibama"][0]["cpf_cnpj"]
+
+    resposta, _ = _consultar(api, postgrest, f"/api/autuacoes/documento/{documento}", fields="valor_multa, uf")
+
+    assert resposta.status_code == 200
+    autuacoes = resposta.json()["autuacoes"]
+    assert autuacoes
+    # 'id' é obrigatório no schema e vem sempre
+    assert all(set(autuacao) == {"id", "valor_multa", "uf"} for autuacao in autuacoes)
+
+
+def test_sem_fields_usa_as_colunas_do_schema(api, postgrest, dados):
+    embargado = dados.tabelas["termos_embargo"][0]["cpf_cnpj"]
+
+    resposta, _ = _consultar(api, postgrest, f"/api/embargos/documento/{embargado}")
+
+    assert resposta.status_code == 200
+    # A geometria fica de fora por padrão
+    assert all("wkt_geometria" not in embargo for embargo in resposta.json()["embargos"])
+
+
+def test_campo_desconhecido_responde_400_sem_consultar_o_banco(api, postgrest, dados):
+    documento = dados.tabelas["autuacoes_ibama"][0]["cpf_cnpj"]
+
+    resposta, requisicoes = _consultar(api, postgrest, f"/api/autuacoes/documento/{documento}", fields="valor_multa,senha")
+
+    assert resposta.status_code == 400
+    detalhe = resposta.json()["detail"]
+    assert "senha" in detalhe["mensagem"]
+    assert "valor_multa" in detalhe["campos_disponiveis"]
+    assert requisicoes == 0
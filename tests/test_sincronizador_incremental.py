@@ -0,0 +1,95 @@
+"""Carga incremental: só as linhas novas ou alteradas vão ao carregador e as que sumiram da fonte
+são removidas. A tabela fica no PostgREST em memória, acessado pelo cliente síncrono do ETL."""
+import httpx
+import pandas as pd
+import pytest
+from postgrest import SyncPostgrestClient
+
+from benchmarks.postgrest_falso import PostgrestFalso
+from scripts_etl.controle_execucao import SincronizadorIncremental, adicionar_chave_e_hash
+
+TABELA = "autuacoes_ibama"
+COLUNAS_DADOS = ["nome", "valor"]
+
+
+class PostgrestSincrono:
+    """Leituras respondidas pelo PostgrestFalso dos benchmarks; DELETE remove as linhas filtradas."""
+
+    def __init__(self, linhas):
+        self.falso = PostgrestFalso({TABELA: linhas})
+        self.leituras = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        parametros = list(request.url.params.multi_items())
+        linhas, _ = self.falso.consultar(TABELA, parametros, False)
+        if request.method == "DELETE":
+            removidas = {id(linha) for linha in linhas}
+            self.falso.tabelas[TABELA] = [l for l in self.falso.tabelas[TABELA] if id(l) not in removidas]
+            self.falso.recarregar()
+        else:
+            self.leituras += 1
+        return httpx.Response(200, json=linhas)
+
+    def cliente(self) -> SyncPostgrestClient:
+        return SyncPostgrestClient("http://supabase.teste/rest/v1", http_client=httpx.Client(transport=httpx.MockTransport(self)))
+
+    def chaves(self):
+        return sorted(l["chave_origem"] for l in self.falso.tabelas[TABELA] if l["chave_origem"] is not None)
+
+
+class CarregadorFalso:
+    def __init__(self):
+        self.registros = []
+
+    def enviar(self, registros):
+        self.registros.extend(registros)
+
+
+def _fonte(linhas):
+    df = pd.DataFrame(linhas, columns=["chave", "nome", "valor"])
+    return adicionar_chave_e_hash(df, COLUNAS_DADOS, chave=df["chave"])
+
+
+@pytest.fixture
+def servidor():
+    anterior = _fonte([(f"k{i:02d}", f"Autuado {i}", str(i * 100)) for i in range(1, 6)])
+    linhas = [
+        {"id": i, "chave_origem": linha["chave_origem"], "hash_linha": linha["hash_linha"]}
+        for i, linha in enumerate(anterior.to_dict(orient="records"), start=1)
+    ]
+    # Linha cadastrada antes da chave natural existir
+    linhas.append({"id": 99, "chave_origem": None, "hash_linha": None})
+    return PostgrestSincrono(linhas)
+
+
+def test_envia_so_o_delta_e_remove_as_ausentes(servidor):
+    carregador = CarregadorFalso()
+    sincronizador = SincronizadorIncremental(servidor.cliente(), TABELA, carregador, tamanho_pagina=2)
+
+    assert sincronizador.carregar_estado_atual() == 5
+    # Cinco chaves em páginas de duas, paginadas pela própria chave
+    assert servidor.leituras == 3
+
+    # k01 igual, k02 alterada, k06 nova; k04 igual em outro pedaço; k03 e k05 saíram da fonte
+    enviados = sincronizador.processar(_fonte([
+        ("k01", "Autuado 1", "100"), ("k02", "Autuado 2", "250"), ("k06", "Autuado 6", "600"),
+    ]))
+    enviados += sincronizador.processar(_fonte([("k04", "Autuado 4", "400")]))
+    removidos = sincronizador.remover_ausentes()
+    sincronizador.fechar()
+
+    assert enviados == sincronizador.alteradas == 2
+    assert sorted(r["chave_origem"] for r in carregador.registros) == ["k02", "k06"]
+    assert removidos == 2
+    assert servidor.chaves() == ["k01", "k02", "k04"]
+    assert len(servidor.falso.tabelas[TABELA]) == 4
+
+
+def test_remove_linhas_sem_chave_quando_pedido(servidor):
+    sincronizador = SincronizadorIncremental(servidor.cliente(), TABELA, CarregadorFalso())
+    sincronizador.carregar_estado_atual()
+    sincronizador.processar(_fonte([(f"k{i:02d}", f"Autuado {i}", str(i * 100)) for i in range(1, 6)]))
+
+    assert sincronizador.alteradas == 0
+    assert sincronizador.remover_ausentes(remover_sem_chave=True) == 1
+    assert [l["id"] for l in servidor.falso.tabelas[TABELA]] == [1, 2, 3, 4, 5]
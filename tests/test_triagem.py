@@ -0,0 +1,48 @@
+"""Triagem em lote: contagens por documento em lotes in.(...), modo resumo e limites da lista."""
+from config import settings
+
+
+def _triagem(api, corpo):
+    async def cenario(cliente):
+        return await cliente.post("/api/triagem", json=corpo)
+
+    return api(cenario)
+
+
+def _esperado(dados, documento):
+    autuacoes = [l for l in dados.tabelas["autuacoes_ibama"] if l["cpf_cnpj"] == documento]
+    embargos = [l for l in dados.tabelas["termos_embargo"] if l["cpf_cnpj"] == documento]
+    return len(autuacoes), round(sum(l["valor_multa"] for l in autuacoes), 2), len(embargos)
+
+
+def test_contagens_batem_com_os_registros_em_varios_lotes(api, dados, monkeypatch):
+    monkeypatch.setattr(settings, "CONSULTA_LOTE_DOCUMENTOS", 7)
+    documentos = dados.documentos[:30] + dados.documentos_ausentes[:5]
+
+    resposta = _triagem(api, {"documentos": documentos + documentos[:3] + ["123"]})
+
+    assert resposta.status_code == 200
+    corpo = resposta.json()
+    assert corpo["total_documentos"] == len(documentos)
+    assert corpo["documentos_invalidos"] == ["123"]
+    for documento in documentos:
+        resultado = corpo["resultados"][documento]
+        total_autuacoes, valor_total, total_embargos = _esperado(dados, documento)
+        assert resultado["resumo"]["total_autuacoes"] == total_autuacoes == len(resultado["autuacoes"])
+        assert resultado["resumo"]["valor_total_multas"] == valor_total
+        assert resultado["resumo"]["total_embargos"] == total_embargos == len(resultado["embargos"])
+
+
+def test_apenas_resumo_omite_os_registros(api, dados):
+    documento = dados.tabelas["autuacoes_ibama"][0]["cpf_cnpj"]
+
+    resposta = _triagem(api, {"documentos": [documento], "apenas_resumo": True})
+
+    resultado = resposta.json()["resultados"][documento]
+    assert set(resultado) == {"tipo_documento", "resumo"}
+    assert resultado["resumo"]["total_autuacoes"] == _esperado(dados, documento)[0]
+
+
+def test_lista_bruta_grande_demais_e_recusada_na_validacao(api, postgrest):
+    resposta = _triagem(api, {"documentos": ["1"] * (2 * settings.TRIAGEM_MAXIMO_DOCUMENTOS + 1)})
+    assert resposta.status_code == 422
@@ -0,0 +1,55 @@
+"""ETag pela versão dos datasets: 304 sem consultar o banco enquanto a versão não muda."""
+from config import settings
+from servicos.versoes import versoes
+from tests.conftest import publicar_versao
+
+
+def test_304_enquanto_a_versao_nao_muda(api, postgrest, dados):
+    documento = dados.tabelas["autuacoes_ibama"][0]["cpf_cnpj"]
+    url = f"/api/autuacoes/documento/{documento}"
+
+    async def cenario(cliente):
+        primeira = await cliente.get(url)
+        etag = primeira.headers["ETag"]
+        requisicoes = postgrest.requisicoes
+        condicional = await cliente.get(url, headers={"If-None-Match": etag})
+        fraca = await cliente.get(url, headers={"If-None-Match": f'"outro", W/{etag}'})
+        requisicoes_304 = postgrest.requisicoes - requisicoes
+
+        publicar_versao(dados, "autuacoes_ibama")
+        await versoes.atualizar()
+        nova_versao = await cliente.get(url, headers={"If-None-Match": etag})
+        return primeira, condicional, fraca, requisicoes_304, nova_versao
+
+    primeira, condicional, fraca, requisicoes_304, nova_versao = api(cenario)
+    assert primeira.status_code == 200
+    assert primeira.headers["Cache-Control"] == f"public, max-age={settings.HTTP_CACHE_MAX_AGE}"
+    assert condicional.status_code == 304 and condicional.content == b""
+    assert condicional.headers["ETag"] == primeira.headers["ETag"]
+    assert fraca.status_code == 304
+    assert requisicoes_304 == 0
+    assert nova_versao.status_code == 200
+    assert nova_versao.headers["ETag"] != primeira.headers["ETag"]
+
+
+def test_etag_depende_dos_parametros_e_nao_da_ordem(api):
+    async def cenario(cliente):
+        a = await cliente.get("/api/glossario/sugestoes", params=[("prefix", "a"), ("limite", "5")])
+        b = await cliente.get("/api/glossario/sugestoes", params=[("limite", "5"), ("prefix", "a")])
+        c = await cliente.get("/api/glossario/sugestoes", params=[("prefix", "b"), ("limite", "5")])
+        return a.headers["ETag"], b.headers["ETag"], c.headers["ETag"]
+
+    a, b, c = api(cenario)
+    assert a == b
+    assert a != c
+
+
+def test_tabela_sem_versao_nao_recebe_etag(api, dados):
+    dados.tabelas["versoes_dataset"] = [l for l in dados.tabelas["versoes_dataset"] if l["tabela"] != "termos_glossario"]
+
+    async def cenario(cliente):
+        return await cliente.get("/api/glossario/sugestoes", params={"prefix": "a"})
+
+    resposta = api(cenario)
+    assert resposta.status_code == 200
+    assert "ETag" not in resposta.headers